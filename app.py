@@ -1,23 +1,218 @@
 import streamlit as st
-import os
-import pandas as pd
 import polars as pl
-import zipfile
-import plotly.graph_objects as go
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+from functools import partial
+from datetime import date
 
 # Importações dos módulos locais
-from src.config import PESOS
-from src.utils import normalizar_texto
-from src.processor import processar_dados_com_filtro
+from src.config import LIMIAR_SIMILARIDADE_NOMES, LIMIAR_MINIMO_NOMES, TOP_K_MODO_GRANDE, TOP_K_HOVER_MODO_GRANDE, DIAGNOSTICO_ATIVO
+from src.cache import cache_resultados, cache_figuras, hash_conteudo
+from src.qualis import indices_qualis
+from src.busca import obter_indice_nomes
+from src.catalogo import CATALOGO, fontes_do_catalogo
+from src.dados_compartilhados import dados_compartilhados, SessaoDados
+from src.render import modo_grande, tamanho_payload
+from src.analytics import totais_por_ano, contagem_estratos, proporcoes_abc, totais_grupos
+from src.exclusoes import filtrar_exclusoes, resumo_exclusoes, exportar_exclusoes, FORMATOS
+from src.diagnostico import etapa, iniciar_execucao, finalizar_execucao
+# src.figuras (Plotly) e src.clustering são importados só nas seções de análise: a primeira tela
+# aparece antes de a pilha de gráficos ser carregada
 
 # ==========================================
 # CONFIGURAÇÃO DA PÁGINA
 # ==========================================
 st.set_page_config(page_title="Dashboard Pesquisadores + Filtro Qualis", layout="wide")
 
+def exibir_figura(fig, grande=False):
+    """Renderiza a figura; no modo grande, informa o tamanho do payload enviado ao navegador."""
+    with etapa("plotly_chart") as e:
+        e.info(titulo=fig.layout.title.text)
+        st.plotly_chart(fig, width="stretch")
+    if grande:
+        st.caption(f"📦 Payload do gráfico: {tamanho_payload(fig) / 1024:,.0f} KB")
+
+TAMANHO_PAGINA_EXCLUSOES = 100
+
+@st.fragment
+def painel_exclusoes(excluidos):
+    """Relatório de exclusões filtrável e paginado; os arquivos só são gerados ao clicar em baixar."""
+    st.dataframe(resumo_exclusoes(excluidos), hide_index=True)
+
+    c1, c2, c3 = st.columns([2, 2, 3])
+    programas = c1.multiselect("Programa", excluidos["programa"].unique(maintain_order=True).to_list(), key="excl_programas")
+    motivos = c2.multiselect("Motivo", excluidos["motivo"].unique().sort().to_list(), key="excl_motivos")
+    termo = c3.text_input("Buscar (pesquisador, título ou ISSN)", key="excl_termo")
+    filtrado = filtrar_exclusoes(excluidos, programas, motivos, termo)
+
+    n_paginas = max(1, -(-len(filtrado) // TAMANHO_PAGINA_EXCLUSOES))
+    pagina = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, key="excl_pagina")
+    inicio = (pagina - 1) * TAMANHO_PAGINA_EXCLUSOES
+    st.dataframe(filtrado.slice(inicio, TAMANHO_PAGINA_EXCLUSOES), hide_index=True, width="stretch")
+    st.caption(f"{len(filtrado)} de {len(excluidos)} exclusões")
+
+    colunas_download = st.columns(len(FORMATOS))
+    for col, (formato, (mime, nome_arquivo)) in zip(colunas_download, FORMATOS.items()):
+        col.download_button(f"Baixar (.{formato})", partial(exportar_exclusoes, filtrado, formato), file_name=nome_arquivo,
+                            mime=mime, on_click="ignore", key=f"excl_download_{formato}")
+
+
+# ==========================================
+# SEÇÕES DE ANÁLISE (calculadas sob demanda)
+# ==========================================
+def secao_individual(cubo, contexto, filtrado):
+    from src.figuras import figura_linha_tempo, figura_radar, figura_ternario, figura_calor, figura_cluster
+    from src.clustering import referencia
+    st.subheader("Performance Individual")
+    
+    # Todas as figuras partem das células pesquisador x ano x estrato do cubo de contagens
+    celulas = cubo.pesquisadores
+    total = totais_por_ano(celulas, "pesquisador")
+
+    # Modo grande: WebGL, Top-K + "Outros" e hovers enxutos acima do limiar de pesquisadores
+    grande = modo_grande(total["pesquisador"].n_unique())
+    if grande:
+        st.info(f"Modo de renderização para muitos pesquisadores ativo: exibindo os {TOP_K_MODO_GRANDE} maiores e o agregado 'Outros'.")
+
+    # As figuras são montadas por construtores puros (src/figuras.py) e memorizadas em
+    # cache_figuras pela impressão digital dos agregados + parâmetros de visualização
+    exibir_figura(cache_figuras.obter(figura_linha_tempo, total, entidade="pesquisador", titulo="Linha do Tempo (Individual)", grande=grande,
+                                      top_k_hover=TOP_K_HOVER_MODO_GRANDE if grande else 50, top_k_series=TOP_K_MODO_GRANDE if grande else None), grande)
+
+    # Contagem pesquisador x estrato: usada pelo radar e pelo cluster
+    c_data = contagem_estratos(celulas, "pesquisador")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Um polígono por pesquisador não escala: no modo grande, apenas os Top-K da linha do tempo
+        exibir_figura(cache_figuras.obter(figura_radar, c_data, total, entidade="pesquisador", titulo="Perfil Qualis (Individual)",
+                                          top_k=TOP_K_MODO_GRANDE if grande else None), grande)
+
+    with col2:
+        exibir_figura(cache_figuras.obter(figura_ternario, proporcoes_abc(celulas, "pesquisador"), entidade="pesquisador", grande=grande), grande)
+
+    exibir_figura(cache_figuras.obter(figura_calor, total, entidade="pesquisador"), grande)
+
+    if len(c_data) > 1:
+        exibir_figura(cache_figuras.obter(figura_cluster, c_data, entidade="pesquisador", titulo="Cluster de Similaridade (Individual)", grande=grande,
+                                          contexto=contexto + ("pesquisador",), subconjunto=filtrado,
+                                          referencia=referencia(contexto + ("pesquisador",)) if filtrado else None), grande)
+    else:
+        st.warning("Dados insuficientes para gerar o Cluster de Similaridade. É necessário haver pelo menos 2 pesquisadores para comparação.")
+    st.info("Visualização dos gráficos individuais carregada.")
+
+
+MODOS_PONTUACAO = {"autor": "Por autor", "unicas": "Publicações únicas"}
+
+def secao_grupos(cubo, comparacao_programas, contexto, filtrado):
+    from src.figuras import figura_linha_tempo, figura_cluster, figura_eficiencia, figura_bolhas
+    from src.clustering import referencia
+    st.subheader(f"Performance por {'Programa' if comparacao_programas else 'Linha de Pesquisa'}")
+
+    if not cubo.grupos.is_empty():
+        modo = st.radio(
+            "Pontuação", list(MODOS_PONTUACAO), format_func=MODOS_PONTUACAO.get, horizontal=True, key="modo_pontuacao",
+            help="Por autor: cada coautor soma a publicação. Publicações únicas: um artigo em coautoria "
+                 "de membros do mesmo grupo/programa conta uma vez (mesmo DOI, ou título + ISSN + ano, tolerando pequenas diferenças no título)."
+        )
+        unicas = modo == "unicas"
+        # No modo de publicações únicas, as repetições de coautoria são descontadas das células
+        celulas = cubo.grupos_unicos() if unicas else cubo.grupos
+        total_g = totais_grupos(celulas, membros=cubo.grupos)
+
+        exibir_figura(cache_figuras.obter(figura_linha_tempo, total_g, entidade="linha_pesquisa", titulo="Volume Total de Produção", rotulo_ranking=" (Volume)"))
+
+        st.divider()
+        st.subheader("Análise de Eficiência (Média e Tamanho)")
+
+        col_ef1, col_ef2 = st.columns(2)
+
+        with col_ef1:
+            exibir_figura(cache_figuras.obter(figura_eficiencia, total_g, entidade="linha_pesquisa"))
+
+        with col_ef2:
+            exibir_figura(cache_figuras.obter(figura_bolhas, total_g, entidade="linha_pesquisa"))
+
+        st.divider()
+        c_data_g = contagem_estratos(celulas, "linha_pesquisa")
+        if len(c_data_g) > 1:
+            contexto_g = contexto + (("linha_pesquisa", "unicas") if unicas else ("linha_pesquisa",))
+            exibir_figura(cache_figuras.obter(figura_cluster, c_data_g, entidade="linha_pesquisa", titulo="Cluster de Similaridade (Grupos)", altura=600,
+                                              contexto=contexto_g, subconjunto=filtrado, referencia=referencia(contexto_g) if filtrado else None))
+        else:
+            st.warning("Dados insuficientes para gerar o Cluster de Similaridade de Grupos. É necessário haver pelo menos 2 grupos/programas para comparação.")
+    else:
+        st.warning("Não há dados suficientes para gerar a análise de grupos.")
+    st.info("Visualização dos gráficos de grupos carregada.")
+
+
+def secao_auditoria(cubo, comparacao_programas, grupos_pesquisa, casamentos):
+    if comparacao_programas:
+        st.info("A auditoria de grupos está desativada no modo de Comparação entre Programas.")
+    else:
+        st.subheader("Conferência de Integridade dos Grupos")
+        pesquisadores_no_df = set(cubo.pesquisadores["pesquisador"].unique().to_list())
+        # Casamentos aproximados: grafias dos dados associadas a cada nome da lista, com a confiança
+        aproximados = {}
+        if casamentos is not None:
+            for nome, canonico, confianca in casamentos.filter(pl.col("confianca") < 1).iter_rows():
+                if canonico in pesquisadores_no_df:
+                    aproximados.setdefault(canonico, []).append(f"{nome} ({confianca:.0%})")
+        if aproximados:
+            st.caption(f"≈ {len(aproximados)} pesquisador(es) encontrado(s) por casamento aproximado de nomes (confiança entre parênteses).")
+        
+        for nome_grupo, lista_teorica in grupos_pesquisa.items():
+            encontrados = sorted([p for p in lista_teorica if p in pesquisadores_no_df])
+            faltando = sorted([p for p in lista_teorica if p not in pesquisadores_no_df])
+            
+            status_icon = "✅" if not faltando else "⚠️"
+            with st.expander(f"{status_icon} {nome_grupo} (Encontrados: {len(encontrados)}/{len(lista_teorica)})"):
+                c1, c2 = st.columns(2)
+                c1.write("**Encontrados:**"); 
+                for p in encontrados:
+                    if p in aproximados:
+                        c1.warning(f"- {p} ≈ {', '.join(aproximados[p])}")
+                    else:
+                        c1.success(f"- {p}")
+                c2.write("**Faltando:**"); 
+                for p in faltando: c2.error(f"- {p}")
+
+
+@st.fragment
+def painel_analises(cubo, comparacao_programas, grupos_pesquisa, contexto, filtrado, casamentos=None):
+    """
+    Seletor de seção + a seção ativa. Ao contrário de st.tabs (que calcula todas as abas e
+    apenas as esconde no navegador), só a seção escolhida é calculada; por ser um fragmento,
+    trocar de seção não reexecuta o script inteiro (processamento, matching de grupos).
+    contexto/filtrado permitem ao cluster reaproveitar o modelo ajustado sem filtros.
+    """
+    secoes = {
+        "individual": "👤 Análise Individual",
+        "grupos": "🏢 Análise por Programas" if comparacao_programas else "👥 Análise por Grupos",
+        "auditoria": "📋 Auditoria e Grupos",
+    }
+    secao = st.segmented_control("Seção", list(secoes), default="individual", required=True,
+                                 format_func=secoes.get, key="secao_ativa", label_visibility="collapsed")
+
+    with etapa(f"secao_{secao}"):
+        if secao == "individual":
+            secao_individual(cubo, contexto, filtrado)
+        elif secao == "grupos":
+            secao_grupos(cubo, comparacao_programas, contexto, filtrado)
+        else:
+            secao_auditoria(cubo, comparacao_programas, grupos_pesquisa, casamentos)
+
+
+def exibir_diagnostico():
+    """Encerra a execução instrumentada: linha JSON no log + painel na barra lateral."""
+    resumo = finalizar_execucao()
+    if resumo is None:
+        return
+    with st.sidebar.expander("🩺 Diagnóstico", expanded=True):
+        st.caption(f"Execução {resumo['id']}: {resumo['duracao_s']:.2f}s, pico de memória {resumo['rss_max_mb']:.0f} MB")
+        if resumo["etapas"]:
+            st.dataframe(pl.from_dicts(resumo["etapas"], infer_schema_length=None), hide_index=True)
+
+
 st.title("📊 Dashboard de Produção Científica (Com Filtro Qualis 2017-2020)")
 st.markdown("""
 1. Faça upload da **Lista Qualis (Excel)** no menu lateral.
@@ -38,35 +233,17 @@ modo_dados = st.sidebar.radio(
 
 st.sidebar.divider()
 
+ANO_MINIMO, ANO_MAXIMO = 1970, date.today().year
+
 fontes_para_processar = []
-data_raw = None
-log_texto = ""
+cubo = None
+excluidos = None
 filtro_padrao = ""
 
 if modo_dados == "Repositório (Comparativo)":
     st.sidebar.info("⚠️ Modo Repositório Ativo")
     
-    # Catálogo de Programas (Simulação de dados remotos/locais)
-    CATALOGO = {
-        "PPGE (Educação)": {
-            "qualis": os.path.join(os.path.dirname(__file__), "assets", "lista_qualis_educacao.parquet"),
-            "path": os.path.join(os.path.dirname(__file__), "assets", "ppge.parquet"),
-            "tipo": "parquet"
-        },
-        "PPGCI (Ciência da Informação)": {
-            "qualis": os.path.join(os.path.dirname(__file__), "assets", "lista_qualis_comunicacao.parquet"),
-            "path": os.path.join(os.path.dirname(__file__), "assets", "ppgci.parquet"),
-            "tipo": "parquet"
-        },
-        "MDCC (Ciência da Computação)": {
-            "qualis": os.path.join(os.path.dirname(__file__), "assets", "lista_qualis_computacao.parquet"),
-            "path": os.path.join(os.path.dirname(__file__), "assets", "mdcc.parquet"),
-            "tipo": "parquet"
-        },
-        # Adicione outros programas aqui conforme disponibilidade
-    }
-    
-    # --- BUSCA GLOBAL (SCAN DE ARQUIVOS) ---
+    # --- BUSCA GLOBAL (ÍNDICE DE NOMES) ---
     st.sidebar.markdown("### 🔍 Busca Global")
     termo_global = st.sidebar.text_input("Localizar Pesquisador (Scan)", help="Busca em todos os programas sem carregar os dados.")
     
@@ -74,23 +251,9 @@ if modo_dados == "Repositório (Comparativo)":
     
     if termo_global:
         filtro_padrao = termo_global
-        encontrados = []
-        termo_norm = normalizar_texto(termo_global)
-        
-        # Itera sobre os arquivos físicos sem carregar CSVs (Alta Performance)
-        for prog, caminhos in CATALOGO.items():
-            f_path = caminhos["path"]
-            if os.path.exists(f_path) and caminhos["tipo"] == "parquet":
-                try:
-                    # Scan Lazy do Parquet: Verifica se existe algum pesquisador que contém o termo
-                    # Isso não carrega o arquivo todo na memória
-                    lf = pl.scan_parquet(f_path)
-                    # Filtra e verifica se retorna algo (limit 1 para ser rápido)
-                    existe = lf.filter(pl.col("pesquisador").str.to_lowercase().str.contains(termo_norm)).head(1).collect()
-                    if not existe.is_empty():
-                        encontrados.append(prog)
-                except:
-                    pass
+        # Índice de nomes (sem acentos) construído uma vez por versão dos arquivos:
+        # a busca não precisa varrer os Parquets a cada tecla digitada
+        encontrados = obter_indice_nomes(CATALOGO).buscar(termo_global)
         
         if encontrados:
             st.sidebar.success(f"Encontrado em: {len(encontrados)} programa(s).")
@@ -104,12 +267,14 @@ if modo_dados == "Repositório (Comparativo)":
         default=programas_sugeridos
     )
     
-    for item in selecao:
-        caminhos = CATALOGO[item]
-        if os.path.exists(caminhos["qualis"]) and os.path.exists(caminhos["path"]):
-            fontes_para_processar.append({"nome": item, "qualis": caminhos["qualis"], "path": caminhos["path"], "tipo": caminhos["tipo"]})
-        else:
-            st.sidebar.warning(f"Arquivos não encontrados para: {item}")
+    fontes_para_processar = fontes_do_catalogo(selecao, CATALOGO)
+    for item in [p for p in selecao if p not in {f["nome"] for f in fontes_para_processar}]:
+        st.sidebar.warning(f"Arquivos não encontrados para: {item}")
+    # Metadados do repositório: informados sem ler os dados
+    for fonte in fontes_para_processar:
+        meta = CATALOGO[fonte["nome"]]
+        periodo_meta = f", {meta['anos'][0]}–{meta['anos'][1]}" if meta.get("anos") else ""
+        st.sidebar.caption(f"{fonte['nome']}: {meta['linhas']} registros, {len(meta['pesquisadores'])} pesquisadores{periodo_meta}")
 
 else:
     # --- MODO UPLOAD MANUAL ---
@@ -145,11 +310,11 @@ elif tipo_grupo == "Upload Arquivo (Excel/CSV)":
     f_grupos = st.sidebar.file_uploader("Arquivo (colunas: Pesquisador, Grupo)", type=["xlsx", "csv"])
     if f_grupos:
         try:
+            import pandas as pd
             df_g = pd.read_csv(f_grupos) if f_grupos.name.endswith(".csv") else pd.read_excel(f_grupos)
             df_g.columns = [c.lower().strip() for c in df_g.columns]
             if "pesquisador" in df_g.columns and "grupo" in df_g.columns:
-                for _, row in df_g.iterrows():
-                    g, p = str(row["grupo"]).strip(), str(row["pesquisador"]).strip()
+                for g, p in zip(df_g["grupo"].astype(str).str.strip(), df_g["pesquisador"].astype(str).str.strip()):
                     GRUPOS_PESQUISA.setdefault(g, []).append(p)
                 st.sidebar.success(f"{len(GRUPOS_PESQUISA)} grupos carregados.")
             else:
@@ -166,6 +331,14 @@ elif tipo_grupo == "Edição Manual":
                 p, g = linha.split(",", 1)
                 GRUPOS_PESQUISA.setdefault(g.strip(), []).append(p.strip())
 
+limiar_nomes = LIMIAR_SIMILARIDADE_NOMES
+if GRUPOS_PESQUISA:
+    limiar_nomes = st.sidebar.slider(
+        "Similaridade mínima de nomes", min_value=LIMIAR_MINIMO_NOMES, max_value=1.0, value=LIMIAR_SIMILARIDADE_NOMES, step=0.01,
+        help="Nomes dos dados sem correspondência exata na lista de grupos (ex: nome do meio a mais) "
+             "são casados com o nome mais parecido da lista se a similaridade atingir este valor. 1.0 = só exatos."
+    )
+
 # ==========================================
 # FILTRO ADICIONAL
 # ==========================================
@@ -176,6 +349,22 @@ filtro_pesquisador = st.sidebar.text_input(
     value=filtro_padrao,
     help="Digite parte do nome para filtrar os dashboards."
 )
+periodo = st.sidebar.slider(
+    "Período (ano de publicação)",
+    min_value=ANO_MINIMO, max_value=ANO_MAXIMO, value=(ANO_MINIMO, ANO_MAXIMO),
+    help="Restringe as publicações ao intervalo de anos selecionado."
+)
+# Intervalo completo = sem filtro (mantém publicações sem ano informado)
+filtro_anos = None if periodo == (ANO_MINIMO, ANO_MAXIMO) else periodo
+
+st.sidebar.divider()
+diagnostico = st.sidebar.toggle(
+    "🩺 Diagnóstico", value=DIAGNOSTICO_ATIVO,
+    help="Mede tempo, linhas e memória de cada etapa e registra uma linha JSON por execução no log do servidor."
+)
+if diagnostico:
+    iniciar_execucao(modo=modo_dados, fontes=[f["nome"] for f in fontes_para_processar],
+                     filtro_pesquisador=filtro_pesquisador or None, anos=filtro_anos)
 
 
 # ==========================================
@@ -184,368 +373,67 @@ filtro_pesquisador = st.sidebar.text_input(
 
 if fontes_para_processar:
     with st.spinner('Processando dados...'):
-        dfs = []
-        logs = []
-        for fonte in fontes_para_processar:
-            try:
-                # Lê Qualis (Parquet ou Excel/Upload)
-                if str(fonte["qualis"]).endswith(".parquet"):
-                    df_ref = pl.read_parquet(fonte["qualis"])
-                else:
-                    df_ref = pd.read_excel(fonte["qualis"])
-                
-                is_pq = (fonte["tipo"] == "parquet")
-                d, l = processar_dados_com_filtro(fonte["path"], df_ref, is_parquet=is_pq)
-                
-                if d is not None:
-                    d = d.with_columns(pl.lit(fonte["nome"]).alias("programa_origem"))
-                    dfs.append(d)
-                    logs.append(f"=== LOG: {fonte['nome']} ===\n{l}\n")
-            except Exception as e:
-                st.error(f"Erro ao processar {fonte['nome']}: {e}")
+        # Programas processados em paralelo uma única vez por seleção (programas + grupos) e
+        # compartilhados, imutáveis, entre as sessões; período, similaridade de nomes e filtro de
+        # pesquisador viram uma visão da sessão sobre o cubo
+        versao = dados_compartilhados.obter(fontes_para_processar, grupos_pesquisa=GRUPOS_PESQUISA)
+        for nome, erro in versao.erros:
+            st.error(f"Erro ao processar {nome}: {erro}")
+        with etapa("visao_sessao") as e:
+            sessao_dados = st.session_state.setdefault("sessao_dados", SessaoDados())
+            visao = sessao_dados.usar(versao, pesquisador=filtro_pesquisador or None, anos=filtro_anos,
+                                      limiar_nomes=limiar_nomes)
+            e.info(**visao.memoria())
+        cubo, excluidos = visao.cubo, visao.excluidos
+
+    # Contadores do cache de processamento (para dimensionamento em produção)
+    with st.sidebar.expander("⚙️ Cache de Processamento", expanded=False):
+        st.json(cache_resultados.estatisticas())
+        st.caption("Figuras")
+        st.json(cache_figuras.estatisticas())
+        st.caption("Índices Qualis")
+        st.json(indices_qualis.estatisticas())
+        st.caption("Dados compartilhados (processo) e memória desta sessão")
+        st.json(dados_compartilhados.estatisticas())
+        st.json(visao.memoria())
+
+    if cubo is not None:
+        st.success(f"Processamento concluído! {cubo.registros} registros pontuáveis (estratos A1–B4) carregados.")
         
-        if dfs:
-            data_raw = pl.concat(dfs, how="diagonal")
-            log_texto = "\n".join(logs)
+        with st.expander(f"📄 Ver Relatório de Exclusões (Filtragem) — {len(excluidos)} publicações", expanded=False):
+            painel_exclusoes(excluidos)
 
-    if data_raw is not None:
-        st.success(f"Processamento concluído! {len(data_raw)} registros válidos carregados.")
-        
-        with st.expander("📄 Ver Relatório de Exclusões (Filtragem)", expanded=False):
-            st.text_area("Log de Filtragem", log_texto, height=300)
-            st.download_button("Baixar Relatório (.txt)", log_texto, file_name="relatorio_filtragem.txt")
-
-        # --- APLICAR FILTRO DE PESQUISADOR (SE HOUVER) ---
+        # --- FILTRO DE PESQUISADOR (VISÃO DA SESSÃO SOBRE OS DADOS COMPARTILHADOS) ---
         if filtro_pesquisador:
-            termo_busca_norm = normalizar_texto(filtro_pesquisador)
-            
-            # Filtro Polars
-            data_raw = data_raw.filter(
-                pl.col("pesquisador").str.to_lowercase().str.contains(termo_busca_norm)
-            )
-            
-            if data_raw.is_empty():
+            if cubo.is_empty():
                 st.warning(f"Nenhum pesquisador encontrado com o termo '{filtro_pesquisador}'.")
+                exibir_diagnostico()
                 st.stop() # Interrompe a execução para não gerar gráficos vazios
             else:
                 st.success(f"Filtro aplicado. Exibindo dados para pesquisadores contendo '{filtro_pesquisador}'.")
 
+        # Cubo de contagens já casado com os grupos (ou programas, no modo comparação)
+        comparacao_programas = versao.comparacao_programas
 
-        # --- PROCESSAMENTO DOS DADOS PARA VISUALIZAÇÃO ---
-        # Converter para Pandas apenas o necessário ou trabalhar com Polars até o fim
-        # Vamos manter Polars para as transformações
-        data = data_raw.with_columns(
-            pl.col("qualis").cast(pl.Utf8).str.to_uppercase().str.strip_chars().alias("qualis_norm")
-        )
-        data = data.filter(pl.col("qualis_norm").is_in(list(PESOS.keys())))
-        
-        # Map de pesos (Polars replace/map_dict)
-        data = data.with_columns(pl.col("qualis_norm").replace_strict(PESOS, default=0).alias("peso"))
-        data = data.sort("ano_publicacao")
+        if not comparacao_programas and cubo.grupos.is_empty():
+            st.warning("Nenhum pesquisador correspondeu à lista de Grupos de Pesquisa configurada.")
 
-        # --- MATCHING DE GRUPOS OU PROGRAMAS ---
-        comparacao_programas = len(fontes_para_processar) > 1
-        
-        if comparacao_programas:
-            # Modo Comparação de Programas: O "Grupo" vira o "Programa"
-            df_grupos = data.with_columns([
-                pl.col("programa_origem").alias("linha_pesquisa"),
-                pl.col("pesquisador").str.to_titlecase()
-            ])
-            data = data.with_columns(pl.col("pesquisador").str.to_titlecase())
-        else:
-            # Modo Análise de Grupos (Interno)
-            # Como o matching de grupos é complexo (dicionário python), é mais fácil converter para Pandas aqui
-            # ou usar map_elements, mas para manter compatibilidade com a lógica de "contains", vamos iterar.
-            # Para performance, idealmente GRUPOS_PESQUISA seria um DataFrame de join.
-            
-            # Convertendo para Pandas para realizar o matching de grupos (lógica iterativa complexa)
-            data_pd = data.to_pandas()
-            records_grupos = []
-            correcao_nomes = {}
-            
-            for idx, row in data_pd.iterrows():
-                nome_no_csv = row["pesquisador"]
-                nome_csv_norm = normalizar_texto(nome_no_csv)
-                
-                for nome_grupo, membros in GRUPOS_PESQUISA.items():
-                    for membro_com_acento in membros:
-                        if nome_csv_norm == normalizar_texto(membro_com_acento):
-                            new_row = row.copy()
-                            new_row["linha_pesquisa"] = nome_grupo
-                            new_row["pesquisador"] = membro_com_acento
-                            correcao_nomes[nome_no_csv] = membro_com_acento
-                            records_grupos.append(new_row)
-
-            data_pd["pesquisador"] = data_pd["pesquisador"].map(lambda x: correcao_nomes.get(x, x.title()))
-            
-            # Volta para Polars ou mantém Pandas? Como o resto do código de plotagem usa Pandas (implícito no código original),
-            # vamos manter df_grupos como Pandas para facilitar a integração com o código legado de plotagem abaixo.
-            
-            if records_grupos:
-                df_grupos = pd.DataFrame(records_grupos)
-            else:
-                df_grupos = pd.DataFrame(columns=data_pd.columns.tolist() + ["linha_pesquisa"])
-                st.warning("Nenhum pesquisador correspondeu à lista de Grupos de Pesquisa configurada.")
-            
-            # Atualiza data principal também como Pandas para os gráficos individuais
-            data = data_pd
-        
-        # Se estivermos no modo comparação, data e df_grupos ainda são Polars.
-        # Para garantir compatibilidade com o código de plotagem (que usa sintaxe Pandas .groupby),
-        # vamos converter tudo para Pandas neste ponto final.
-        if isinstance(data, pl.DataFrame):
-            data = data.to_pandas()
-        if isinstance(df_grupos, pl.DataFrame):
-            df_grupos = df_grupos.to_pandas()
-
-        # --- ABAS DA DASHBOARD ---
-        titulo_tab2 = "🏢 Análise por Programas" if comparacao_programas else "👥 Análise por Grupos"
-        tab1, tab2, tab3 = st.tabs(["👤 Análise Individual", titulo_tab2, "📋 Auditoria e Grupos"])
-
-        # =======================================================
-        # TAB 1: INDIVIDUAL
-        # =======================================================
-        with tab1:
-            st.subheader("Performance Individual")
-            
-            total = data.groupby(["ano_publicacao", "pesquisador"], as_index=False)["peso"].sum()
-            total["acumulado"] = total.groupby("pesquisador")["peso"].cumsum()
-            
-            total_global = total.groupby("pesquisador", as_index=False)["peso"].sum()
-            soma_global = total_global["peso"].sum()
-            
-            map_perc_global = dict(zip(total_global["pesquisador"], 100 * total_global["peso"] / soma_global))
-
-            ranking_anual = {}
-            for ano in sorted(total["ano_publicacao"].unique()):
-                df_ano = total[total["ano_publicacao"] == ano].copy()
-                soma_ano = df_ano["peso"].sum()
-                df_ano["perc"] = (100 * df_ano["peso"] / soma_ano) if soma_ano > 0 else 0
-                df_ano = df_ano.sort_values("perc", ascending=False)
-                ranking_anual[ano] = "<br>".join(f"{i}. {row['pesquisador']} — {row['perc']:.1f}% (global: {map_perc_global[row['pesquisador']]:.1f}%)" for i, (idx, row) in enumerate(df_ano.head(50).iterrows(), start=1))
-
-            ranking_acumulado = {}
-            for ano in sorted(total["ano_publicacao"].unique()):
-                df_acc = total[total["ano_publicacao"] <= ano].groupby("pesquisador", as_index=False)["peso"].sum()
-                df_acc["perc_rel"] = (100 * df_acc["peso"] / soma_global)
-                df_acc = df_acc.sort_values("perc_rel", ascending=False)
-                ranking_acumulado[ano] = "<br>".join(f"{i}. {row['pesquisador']} — {row['perc_rel']:.1f}% (global: {map_perc_global[row['pesquisador']]:.1f}%)" for i, (idx, row) in enumerate(df_acc.head(50).iterrows(), start=1))
-
-            fig_timeline = go.Figure()
-            pesquisadores = sorted(total["pesquisador"].unique())
-            n_p = len(pesquisadores)
-            for p in pesquisadores:
-                d = total[total["pesquisador"] == p]
-                fig_timeline.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["peso"], mode="lines+markers", name=p, hoverinfo="skip", visible=True))
-            for p in pesquisadores:
-                d = total[total["pesquisador"] == p]
-                fig_timeline.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["acumulado"], mode="lines", name=f"{p} (Acumulado)", hoverinfo="skip", visible=False))
-
-            anos = sorted(total["ano_publicacao"].unique())
-            fig_timeline.add_trace(go.Scatter(x=anos, y=[0]*len(anos), mode="markers", marker=dict(opacity=0), customdata=[ranking_anual[a] for a in anos], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Anual</b><br>%{customdata}<extra></extra>", showlegend=False))
-            fig_timeline.add_trace(go.Scatter(x=anos, y=[0]*len(anos), mode="markers", marker=dict(opacity=0), customdata=[ranking_acumulado[a] for a in anos], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Acumulado</b><br>%{customdata}<extra></extra>", showlegend=False, visible=False))
-
-            fig_timeline.update_layout(title="Linha do Tempo (Individual)", height=800, hovermode="x unified", updatemenus=[dict(buttons=[dict(label="Total Anual", method="update", args=[{"visible": [True]*n_p + [False]*n_p + [True, False]}]), dict(label="Acumulado", method="update", args=[{"visible": [False]*n_p + [True]*n_p + [False, True]}])], direction="down", x=0.01, y=1.12)])
-            st.plotly_chart(fig_timeline, width="stretch")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                estratos = list(PESOS.keys())
-                radar_df = data.groupby(["pesquisador", "qualis_norm"]).size().reset_index(name="qtd")
-                fig_radar = go.Figure()
-                for p in sorted(radar_df["pesquisador"].unique()):
-                    d = radar_df[radar_df["pesquisador"] == p]
-                    vals = [d.loc[d["qualis_norm"]==e, "qtd"].sum() for e in estratos]
-                    fig_radar.add_trace(go.Scatterpolar(r=vals+[vals[0]], theta=estratos+[estratos[0]], name=p, fill='toself', opacity=0.35))
-                fig_radar.update_layout(title="Perfil Qualis (Individual)", polar=dict(radialaxis=dict(visible=True)))
-                st.plotly_chart(fig_radar, width="stretch")
-
-            with col2:
-                map_abc = {"A1":"A","A2":"A","A3":"B","A4":"B","B1":"C","B2":"C","B3":"C","B4":"C"}
-                df_tern = data.copy()
-                df_tern["grupo_abc"] = df_tern["qualis_norm"].map(map_abc)
-                tern_cts = df_tern.groupby(["pesquisador", "grupo_abc"]).size().unstack(fill_value=0)
-                for c in "ABC":
-                    if c not in tern_cts: tern_cts[c] = 0
-                tern_cts["sum"] = tern_cts.sum(axis=1)
-                fig_ternary = go.Figure()
-                for p in sorted(tern_cts.index):
-                    r = tern_cts.loc[p]
-                    if r["sum"] == 0: continue
-                    fig_ternary.add_trace(go.Scatterternary(a=[r["A"]/r["sum"]], b=[r["B"]/r["sum"]], c=[r["C"]/r["sum"]], mode="markers", name=p, marker=dict(size=14, line=dict(width=1, color='DarkSlateGrey')), hovertemplate=f"<b>{p}</b><br>A: %{{a:.1%}}<br>B: %{{b:.1%}}<br>C: %{{c:.1%}}<extra></extra>"))
-                fig_ternary.update_layout(title="Distribuição Proporcional", ternary=dict(aaxis=dict(title="A"), baxis=dict(title="B"), caxis=dict(title="C")))
-                st.plotly_chart(fig_ternary, width="stretch")
-
-            hm_data = total.pivot(index="pesquisador", columns="ano_publicacao", values="peso").fillna(0).sort_index()
-            fig_heatmap = go.Figure(data=go.Heatmap(z=hm_data.values, x=hm_data.columns, y=hm_data.index, colorscale="Viridis", colorbar=dict(title="Pontos")))
-            fig_heatmap.update_layout(title="Mapa de Calor (Intensidade)", height=max(400, len(hm_data)*30))
-            st.plotly_chart(fig_heatmap, width="stretch")
-
-            c_data = data.groupby(["pesquisador", "qualis_norm"]).size().unstack(fill_value=0)
-            for k in PESOS:
-                if k not in c_data: c_data[k] = 0
-            c_data = c_data[list(PESOS.keys())]
-            if len(c_data) > 1:
-                scaler = StandardScaler()
-                scaled = scaler.fit_transform(c_data)
-                n_clusters_i = min(3, len(c_data))
-                kmeans = KMeans(n_clusters=n_clusters_i, random_state=42, n_init=10)
-                clusters = kmeans.fit_predict(scaled)
-                pca = PCA(n_components=2)
-                coords = pca.fit_transform(scaled)
-                df_vis_c = pd.DataFrame({"pesquisador": c_data.index, "x": coords[:,0], "y": coords[:,1], "cluster": clusters.astype(str)})
-                fig_cluster = go.Figure()
-                for c in sorted(df_vis_c.cluster.unique()):
-                    d = df_vis_c[df_vis_c.cluster == c]
-                    fig_cluster.add_trace(go.Scatter(x=d.x, y=d.y, mode="markers+text", text=d.pesquisador, name=f"Grupo {int(c)+1}", marker=dict(size=12, line=dict(width=1, color='DarkSlateGrey')), hovertemplate="<b>%{text}</b><br>Grupo: %{name}<extra></extra>"))
-                fig_cluster.update_layout(title="Cluster de Similaridade (Individual)")
-                st.plotly_chart(fig_cluster, width="stretch")
-            else:
-                st.warning("Dados insuficientes para gerar o Cluster de Similaridade. É necessário haver pelo menos 2 pesquisadores para comparação.")
-            st.info("Visualização dos gráficos individuais carregada.")
-
-        # =======================================================
-        # TAB 2: GRUPOS
-        # =======================================================
-        with tab2:
-            st.subheader(f"Performance por {'Programa' if comparacao_programas else 'Linha de Pesquisa'}")
-
-            if not df_grupos.empty:
-                group_counts = df_grupos.groupby("linha_pesquisa")["pesquisador"].nunique().reset_index(name="n_membros")
-                total_g = df_grupos.groupby(["ano_publicacao", "linha_pesquisa"], as_index=False)["peso"].sum()
-                total_g = pd.merge(total_g, group_counts, on="linha_pesquisa")
-                total_g["acumulado"] = total_g.groupby("linha_pesquisa")["peso"].cumsum()
-                total_g["peso_medio"] = total_g["peso"] / total_g["n_membros"]
-                total_g["acumulado_medio"] = total_g.groupby("linha_pesquisa")["peso_medio"].cumsum()
-
-                total_global_g = total_g.groupby("linha_pesquisa", as_index=False)["peso"].sum()
-                soma_global_g = total_global_g["peso"].sum()
-                map_perc_global_g = dict(zip(total_global_g["linha_pesquisa"], 100 * total_global_g["peso"] / soma_global_g))
-
-                ranking_anual_g = {}
-                for ano in sorted(total_g["ano_publicacao"].unique()):
-                    df_ano = total_g[total_g["ano_publicacao"] == ano].copy()
-                    soma_ano = df_ano["peso"].sum()
-                    df_ano["perc"] = (100 * df_ano["peso"] / soma_ano) if soma_ano > 0 else 0
-                    df_ano = df_ano.sort_values("perc", ascending=False)
-                    ranking_anual_g[ano] = "<br>".join(f"{i}. {row['linha_pesquisa']} — {row['perc']:.1f}% (global: {map_perc_global_g[row['linha_pesquisa']]:.1f}%)" for i, (idx, row) in enumerate(df_ano.iterrows(), start=1))
-
-                ranking_acc_g = {}
-                for ano in sorted(total_g["ano_publicacao"].unique()):
-                    df_acc = total_g[total_g["ano_publicacao"] <= ano].groupby("linha_pesquisa", as_index=False)["peso"].sum()
-                    df_acc["perc_rel"] = (100 * df_acc["peso"] / soma_global_g)
-                    df_acc = df_acc.sort_values("perc_rel", ascending=False)
-                    ranking_acc_g[ano] = "<br>".join(f"{i}. {row['linha_pesquisa']} — {row['perc_rel']:.1f}% (global: {map_perc_global_g[row['linha_pesquisa']]:.1f}%)" for i, (idx, row) in enumerate(df_acc.iterrows(), start=1))
-
-                ranking_avg_anual = {}
-                for ano in sorted(total_g["ano_publicacao"].unique()):
-                    df_ano = total_g[total_g["ano_publicacao"] == ano].sort_values("peso_medio", ascending=False)
-                    ranking_avg_anual[ano] = "<br>".join(f"{i}. {row['linha_pesquisa']} — {row['peso_medio']:.1f} pts/pesq" for i, (idx, row) in enumerate(df_ano.iterrows(), start=1))
-
-                ranking_avg_acc = {}
-                for ano in sorted(total_g["ano_publicacao"].unique()):
-                    df_ate = total_g[total_g["ano_publicacao"] <= ano].groupby("linha_pesquisa", as_index=False)["peso_medio"].sum().sort_values("peso_medio", ascending=False)
-                    ranking_avg_acc[ano] = "<br>".join(f"{i}. {row['linha_pesquisa']} — {row['peso_medio']:.1f} pts/pesq (acum)" for i, (idx, row) in enumerate(df_ate.iterrows(), start=1))
-
-                fig_time_g = go.Figure()
-                grupos = sorted(total_g["linha_pesquisa"].unique())
-                n_g = len(grupos)
-                for g in grupos:
-                    d = total_g[total_g["linha_pesquisa"] == g]
-                    fig_time_g.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["peso"], mode="lines+markers", name=g, hoverinfo="skip", visible=True))
-                for g in grupos:
-                    d = total_g[total_g["linha_pesquisa"] == g]
-                    fig_time_g.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["acumulado"], mode="lines", name=f"{g} (Acumulado)", hoverinfo="skip", visible=False))
-
-                anos_g = sorted(total_g["ano_publicacao"].unique())
-                fig_time_g.add_trace(go.Scatter(x=anos_g, y=[0]*len(anos_g), mode="markers", marker=dict(opacity=0), customdata=[ranking_anual_g.get(a,"") for a in anos_g], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Anual (Volume)</b><br>%{customdata}<extra></extra>", showlegend=False))
-                fig_time_g.add_trace(go.Scatter(x=anos_g, y=[0]*len(anos_g), mode="markers", marker=dict(opacity=0), customdata=[ranking_acc_g.get(a,"") for a in anos_g], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Acumulado (Volume)</b><br>%{customdata}<extra></extra>", showlegend=False, visible=False))
-
-                fig_time_g.update_layout(title="Volume Total de Produção", height=800, hovermode="x unified", updatemenus=[dict(buttons=[dict(label="Total Anual", method="update", args=[{"visible": [True]*n_g + [False]*n_g + [True, False]}]), dict(label="Acumulado", method="update", args=[{"visible": [False]*n_g + [True]*n_g + [False, True]}])], direction="down", x=0.01, y=1.12)])
-                st.plotly_chart(fig_time_g, width="stretch")
-
-                st.divider()
-                st.subheader("Análise de Eficiência (Média e Tamanho)")
-
-                col_ef1, col_ef2 = st.columns(2)
-
-                with col_ef1:
-                    fig_time_avg = go.Figure()
-                    for g in grupos:
-                        d = total_g[total_g["linha_pesquisa"] == g]
-                        fig_time_avg.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["peso_medio"], mode="lines+markers", name=f"{g} (n={d['n_membros'].iloc[0]})", hoverinfo="skip", visible=True))
-                    for g in grupos:
-                        d = total_g[total_g["linha_pesquisa"] == g]
-                        fig_time_avg.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["acumulado_medio"], mode="lines", name=f"{g} (Acumulado)", hoverinfo="skip", visible=False))
-
-                    fig_time_avg.add_trace(go.Scatter(x=anos_g, y=[0]*len(anos_g), mode="markers", marker=dict(opacity=0), customdata=[ranking_avg_anual.get(a,"") for a in anos_g], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Eficiência</b><br>%{customdata}<extra></extra>", showlegend=False))
-                    fig_time_avg.add_trace(go.Scatter(x=anos_g, y=[0]*len(anos_g), mode="markers", marker=dict(opacity=0), customdata=[ranking_avg_acc.get(a,"") for a in anos_g], hovertemplate="<b>Ano %{x}</b><br><br><b>Ranking Eficiência Acum.</b><br>%{customdata}<extra></extra>", showlegend=False, visible=False))
-                    fig_time_avg.update_layout(title="Eficiência (Pontos por Membro)", height=600, hovermode="x unified", yaxis_title="Pontos/Membro", updatemenus=[dict(buttons=[dict(label="Média Anual", method="update", args=[{"visible": [True]*n_g + [False]*n_g + [True, False]}]), dict(label="Média Acumulada", method="update", args=[{"visible": [False]*n_g + [True]*n_g + [False, True]}])], direction="down", x=0.01, y=1.12)])
-                    st.plotly_chart(fig_time_avg, width="stretch")
-
-                with col_ef2:
-                    fig_bubble = go.Figure()
-                    for g in grupos:
-                        d = total_g[total_g["linha_pesquisa"] == g]
-                        bubble_size = d["n_membros"].iloc[0] * 3
-                        fig_bubble.add_trace(go.Scatter(x=d["ano_publicacao"], y=d["peso"], mode="lines+markers", name=f"{g} (n={d['n_membros'].iloc[0]})",
-                                                            marker=dict(size=bubble_size, line=dict(width=1, color='DarkSlateGrey')),
-                                                            hovertemplate=f"<b>{g}</b><br>Ano: %{{x}}<br>Pontos: %{{y}}<br>Membros: {d['n_membros'].iloc[0]}<extra></extra>"))
-                    fig_bubble.update_layout(title="Volume Total (Tamanho da bolha = Tamanho do Grupo)", height=600, yaxis_title="Pontuação Total")
-                    st.plotly_chart(fig_bubble, width="stretch")
-
-                st.divider()
-                c_data_g = df_grupos.groupby(["linha_pesquisa", "qualis_norm"]).size().unstack(fill_value=0)
-                for k in PESOS:
-                    if k not in c_data_g: c_data_g[k] = 0
-                c_data_g = c_data_g[list(PESOS.keys())]
-                if len(c_data_g) > 1:
-                    scaler_g = StandardScaler()
-                    scaled_g = scaler_g.fit_transform(c_data_g)
-                    n_clusters_g = min(3, len(c_data_g))
-                    kmeans_g = KMeans(n_clusters=n_clusters_g, random_state=42, n_init=10)
-                    clusters_g = kmeans_g.fit_predict(scaled_g)
-                    pca_g = PCA(n_components=2)
-                    coords_g = pca_g.fit_transform(scaled_g)
-                    df_vis_cg = pd.DataFrame({"grupo": c_data_g.index, "x": coords_g[:,0], "y": coords_g[:,1], "cluster": clusters_g.astype(str)})
-                    fig_cluster_g = go.Figure()
-                    for c in sorted(df_vis_cg.cluster.unique()):
-                        d = df_vis_cg[df_vis_cg.cluster == c]
-                        fig_cluster_g.add_trace(go.Scatter(x=d.x, y=d.y, mode="markers+text", text=d.grupo, name=f"Grupo {int(c)+1}", marker=dict(size=12, line=dict(width=1, color='DarkSlateGrey')), hovertemplate="<b>%{text}</b><br>Grupo: %{name}<extra></extra>"))
-                    fig_cluster_g.update_layout(title="Cluster de Similaridade (Grupos)", height=600)
-                    st.plotly_chart(fig_cluster_g, width="stretch")
-                else:
-                    st.warning("Dados insuficientes para gerar o Cluster de Similaridade de Grupos. É necessário haver pelo menos 2 grupos/programas para comparação.")
-            else:
-                st.warning("Não há dados suficientes para gerar a análise de grupos.")
-            st.info("Visualização dos gráficos de grupos carregada.")
-
-        # =======================================================
-        # TAB 3: AUDITORIA
-        # =======================================================
-        with tab3:
-            if comparacao_programas:
-                st.info("A auditoria de grupos está desativada no modo de Comparação entre Programas.")
-            else:
-                st.subheader("Conferência de Integridade dos Grupos")
-                pesquisadores_no_df = set(data["pesquisador"].unique())
-                
-                for nome_grupo, lista_teorica in GRUPOS_PESQUISA.items():
-                    encontrados = sorted([p for p in lista_teorica if p in pesquisadores_no_df])
-                    faltando = sorted([p for p in lista_teorica if p not in pesquisadores_no_df])
-                    
-                    status_icon = "✅" if not faltando else "⚠️"
-                    with st.expander(f"{status_icon} {nome_grupo} (Encontrados: {len(encontrados)}/{len(lista_teorica)})"):
-                        c1, c2 = st.columns(2)
-                        c1.write("**Encontrados:**"); 
-                        for p in encontrados: c1.success(f"- {p}")
-                        c2.write("**Faltando:**"); 
-                        for p in faltando: c2.error(f"- {p}")
+        # Daqui em diante, as figuras saem do cubo (src/cubo.py): as agregações são feitas em
+        # src/analytics.py sobre as células e apenas os resultados compactos seguem para o Plotly.
+
+        # --- SEÇÕES DA DASHBOARD ---
+        # Apenas a seção selecionada é calculada; trocar de seção reexecuta só o fragmento
+        # Contexto do cluster: fontes + definição de grupos; com filtro ativo, os dados são um
+        # subconjunto e o modelo ajustado sem filtros (mesmo contexto) é reaproveitado
+        contexto_cluster = (tuple(hash_conteudo(f["path"]) for f in fontes_para_processar), repr(sorted(GRUPOS_PESQUISA.items())), limiar_nomes)
+        filtrado = bool(filtro_pesquisador) or filtro_anos is not None
+        painel_analises(cubo, comparacao_programas, GRUPOS_PESQUISA, contexto_cluster, filtrado,
+                        visao.casamentos)
 
 else:
     if modo_dados == "Upload Manual":
         st.info("Aguardando upload dos arquivos (Qualis e ZIP) para gerar o dashboard.")
     else:
         st.info("Selecione pelo menos um programa no menu lateral para visualizar os dados.")
+
+exibir_diagnostico()
@@ -0,0 +1,119 @@
+# benchmarks/dados_sinteticos.py
+"""
+Gerador de programas sintéticos no formato do Lattes (um CSV por pesquisador dentro de um ZIP,
+ou o Parquet equivalente gerado pelo converter_dados.py).
+
+Uso:
+    python -m benchmarks.dados_sinteticos --pesquisadores 200 --publicacoes 50 --saida /tmp/prog.zip
+    python -m benchmarks.dados_sinteticos --pesquisadores 200 --publicacoes 50 --saida /tmp/prog.parquet
+"""
+import argparse
+import csv
+import io
+import os
+import zipfile
+import numpy as np
+import polars as pl
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+QUALIS_PADRAO = os.path.join(ASSETS, "lista_qualis_educacao.parquet")
+
+COLUNAS_CSV = ["nome", "lattes_url", "ano_publicacao", "titulo_publicacao", "periodico", "issn", "qualis", "pontos", "area", "ano_base"]
+
+# Nomes com acentos e partículas, como nos currículos reais
+PRENOMES = ["José", "João", "Maria", "Ana", "Antônio", "Conceição", "Fátima", "Márcia", "Sérgio", "Inês",
+            "Luís", "Cláudia", "Flávio", "Lúcia", "Íris", "Otávio", "Simone", "Raimundo", "Vitória", "Ângela"]
+SOBRENOMES = ["Araújo", "Conceição", "Gonçalves", "Magalhães", "Falcão", "Brandão", "Simões", "Lustosa",
+              "Peixoto", "Assunção", "Guimarães", "Camões", "Sá", "Damasceno", "Nóbrega", "Jucá"]
+PARTICULAS = ["", "", "de ", "da ", "dos "]
+PALAVRAS = ["educação", "formação", "docente", "currículo", "políticas", "ensino", "avaliação", "práticas",
+            "pedagógicas", "escola", "pública", "análise", "estudo", "ciência", "informação", "tecnologia"]
+ESTRATOS_ORIGINAIS = ["A1", "A2", "A3", "A4", "B1", "B2", "B3", "B4", "C", "N"]
+
+
+def gerar_nomes(n, rng):
+    """n nomes distintos de pesquisadores (com acentos)."""
+    nomes, vistos = [], set()
+    while len(nomes) < n:
+        partes = [rng.choice(PRENOMES), rng.choice(PARTICULAS) + rng.choice(SOBRENOMES), rng.choice(SOBRENOMES)]
+        nome = " ".join(partes)
+        if nome in vistos:
+            nome = f"{nome} {len(nomes)}"
+        vistos.add(nome)
+        nomes.append(nome)
+    return nomes
+
+
+def gerar_publicacoes(nome, n_publicacoes, issns_qualis, rng, taxa_acerto=0.7, taxa_sem_issn=0.03, anos=(2000, 2025)):
+    """
+    Publicações de um pesquisador. taxa_acerto: fração de ISSNs presentes na lista Qualis;
+    taxa_sem_issn: fração sem ISSN; os demais recebem ISSNs inexistentes na lista.
+    """
+    sorteio = rng.random(n_publicacoes)
+    linhas = []
+    for i in range(n_publicacoes):
+        if sorteio[i] < taxa_sem_issn:
+            issn = ""
+        elif sorteio[i] < taxa_sem_issn + taxa_acerto:
+            issn = issns_qualis[rng.integers(len(issns_qualis))]
+        else:
+            issn = f"9{rng.integers(100, 999)}-{rng.integers(1000, 9999)}"
+        titulo = " ".join(rng.choice(PALAVRAS, size=rng.integers(4, 10))).capitalize()
+        linhas.append([
+            nome, f"http://lattes.cnpq.br/{rng.integers(10**15, 10**16)}", int(rng.integers(anos[0], anos[1] + 1)),
+            titulo, f"REVISTA DE {rng.choice(PALAVRAS).upper()}", issn, rng.choice(ESTRATOS_ORIGINAIS), "", "Educação", "2017-2020",
+        ])
+    return linhas
+
+
+def _csv(linhas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUNAS_CSV)
+    escritor.writerows(linhas)
+    return buffer.getvalue().encode("utf-8")
+
+
+def grupos_sinteticos(nomes, n_grupos=4):
+    """Definição de grupos de pesquisa (como GRUPOS_PESQUISA) dividindo os pesquisadores em linhas."""
+    return {f"Linha {g + 1}": nomes[g::n_grupos] for g in range(n_grupos)}
+
+
+def gerar_programa(saida, n_pesquisadores, n_publicacoes, qualis=QUALIS_PADRAO, taxa_acerto=0.7, semente=42):
+    """
+    Gera o programa sintético em `saida` (.zip ou .parquet) e retorna os nomes dos pesquisadores.
+    O Parquet passa pelo mesmo caminho de conversão do repositório (converter_dados.py).
+    """
+    rng = np.random.default_rng(semente)
+    issns_qualis = pl.read_parquet(qualis, columns=["issn"])["issn"].drop_nulls().to_list()
+    nomes = gerar_nomes(n_pesquisadores, rng)
+
+    zip_path = saida if saida.endswith(".zip") else saida + ".zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for nome in nomes:
+            linhas = gerar_publicacoes(nome, n_publicacoes, issns_qualis, rng, taxa_acerto=taxa_acerto)
+            z.writestr(nome.lower().replace(" ", "_") + ".csv", _csv(linhas))
+
+    if saida.endswith(".parquet"):
+        from converter_dados import converter_zip_para_parquet
+        converter_zip_para_parquet(zip_path, saida)
+        os.remove(zip_path)
+    return nomes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um programa sintético (ZIP de CSVs ou Parquet) no formato do Lattes.")
+    parser.add_argument("--pesquisadores", type=int, default=100)
+    parser.add_argument("--publicacoes", type=int, default=50, help="Publicações por pesquisador.")
+    parser.add_argument("--taxa-acerto", type=float, default=0.7, help="Fração de ISSNs presentes na lista Qualis.")
+    parser.add_argument("--qualis", default=QUALIS_PADRAO, help="Lista Qualis (Parquet) usada para sortear ISSNs válidos.")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", required=True, help="Arquivo de destino (.zip ou .parquet).")
+    args = parser.parse_args(argv)
+    gerar_programa(args.saida, args.pesquisadores, args.publicacoes, qualis=args.qualis,
+                   taxa_acerto=args.taxa_acerto, semente=args.semente)
+    print(f"Sucesso: {args.saida} gerado ({args.pesquisadores} pesquisadores x {args.publicacoes} publicações).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# benchmarks/executar.py
+"""
+Benchmark das etapas principais do pipeline sobre programas sintéticos em várias escalas.
+Não é um teste: mede tempo (mediana e mínimo de várias repetições) e memória de cada etapa
+e grava o resultado em JSON, para comparar versões.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.executar
+    python -m benchmarks.executar --escalas 50x30,500x60 --repeticoes 5 --saida resultados.json
+    python -m benchmarks.executar --comparar benchmarks/resultados/anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import polars as pl
+
+from benchmarks.dados_sinteticos import gerar_programa, grupos_sinteticos, QUALIS_PADRAO
+from src import clustering
+from src.config import PESOS, COLUNAS_ANALISE
+from src.processor import _processar_dados_com_filtro
+from src.qualis import ler_qualis
+from src.grupos import _compilar_grupos_cache, compilar_grupos, aplicar_grupos
+from src.cubo import construir_cubo
+from src.analytics import totais_por_ano, contagem_estratos, proporcoes_abc
+from src.ranking import rankings_participacao
+from src.figuras import figura_linha_tempo, figura_radar, figura_ternario, figura_calor, figura_cluster
+
+ESCALAS_PADRAO = "50x30,200x50,1000x60"
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+
+def _rss_max_mb():
+    # ru_maxrss: KB no Linux, bytes no macOS
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == "darwin" else maximo / 1024
+
+
+def medir(funcao, repeticoes):
+    """
+    Executa `funcao` várias vezes. Tempo: mediana e mínimo. Memória: pico do heap Python
+    (tracemalloc, não inclui buffers do Polars/Arrow) e pico de RSS do processo até aqui.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, {
+        "tempo_mediano_s": round(statistics.median(tempos), 6),
+        "tempo_min_s": round(min(tempos), 6),
+        "repeticoes": repeticoes,
+        "pico_python_mb": round(pico / (1024 * 1024), 3),
+        "rss_max_mb": round(_rss_max_mb(), 1),
+    }
+
+
+def executar_escala(n_pesquisadores, n_publicacoes, repeticoes, diretorio, qualis=QUALIS_PADRAO):
+    """Gera o programa sintético (ZIP e Parquet) e mede cada etapa do pipeline."""
+    caminho_zip = os.path.join(diretorio, f"prog_{n_pesquisadores}x{n_publicacoes}.zip")
+    caminho_parquet = os.path.join(diretorio, f"prog_{n_pesquisadores}x{n_publicacoes}.parquet")
+    nomes = gerar_programa(caminho_zip, n_pesquisadores, n_publicacoes, qualis=qualis)
+    gerar_programa(caminho_parquet, n_pesquisadores, n_publicacoes, qualis=qualis)
+    df_qualis = ler_qualis(qualis)
+    filtros = dict(pesos=PESOS, colunas=COLUNAS_ANALISE)
+    etapas = {}
+
+    # Processamento sem o cache de resultados (a função interna é chamada diretamente)
+    _, etapas["processar_zip"] = medir(lambda: _processar_dados_com_filtro(caminho_zip, df_qualis, False, **filtros), repeticoes)
+    (data, _), etapas["processar_parquet"] = medir(lambda: _processar_dados_com_filtro(caminho_parquet, df_qualis, True, **filtros), repeticoes)
+    data = data.sort("ano_publicacao")
+
+    grupos = grupos_sinteticos(nomes)
+
+    def matching():
+        _compilar_grupos_cache.cache_clear()
+        return aplicar_grupos(data, compilar_grupos(grupos))
+    (data_g, df_grupos), etapas["matching_grupos"] = medir(matching, repeticoes)
+
+    # Cubo de contagens: rankings e figuras partem das células, como no app
+    cubo, etapas["cubo_contagens"] = medir(lambda: construir_cubo(data_g, df_grupos), repeticoes)
+    celulas = cubo.pesquisadores
+
+    def rankings():
+        return rankings_participacao(totais_por_ano(celulas, "pesquisador"), "pesquisador", top_k=50)
+    _, etapas["rankings"] = medir(rankings, repeticoes)
+
+    total = totais_por_ano(celulas, "pesquisador")
+    contagem = contagem_estratos(celulas, "pesquisador")
+    matriz = contagem.select(PESOS.keys()).to_numpy()
+    _, etapas["clustering"] = medir(lambda: clustering.ajustar_modelo(matriz), repeticoes)
+
+    def figuras():
+        # Sem cache de figuras e de modelos: mede a construção completa
+        clustering._modelos.clear()
+        return [
+            figura_linha_tempo(total, "pesquisador", "Linha do Tempo", top_k_hover=50),
+            figura_radar(contagem, total, "pesquisador", "Perfil Qualis"),
+            figura_ternario(proporcoes_abc(celulas, "pesquisador"), "pesquisador"),
+            figura_calor(total, "pesquisador"),
+            figura_cluster(contagem, "pesquisador", "Cluster") if len(contagem) > 1 else None,
+        ]
+    _, etapas["figuras"] = medir(figuras, repeticoes)
+
+    return {
+        "pesquisadores": n_pesquisadores,
+        "publicacoes_por_pesquisador": n_publicacoes,
+        "linhas_brutas": n_pesquisadores * n_publicacoes,
+        "linhas_validas": len(data),
+        "linhas_grupos": len(df_grupos),
+        "celulas_cubo": len(celulas) + len(cubo.grupos),
+        "etapas": etapas,
+    }
+
+
+def _versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """Imprime a razão de tempo (atual / anterior) por escala e etapa."""
+    chave = lambda e: (e["pesquisadores"], e["publicacoes_por_pesquisador"])
+    anteriores = {chave(e): e for e in anterior["escalas"]}
+    for escala in atual["escalas"]:
+        base = anteriores.get(chave(escala))
+        if base is None:
+            continue
+        print(f"\n{escala['pesquisadores']}x{escala['publicacoes_por_pesquisador']} (vs {anterior.get('versao')}):")
+        for etapa, m in escala["etapas"].items():
+            if etapa in base["etapas"] and base["etapas"][etapa]["tempo_mediano_s"] > 0:
+                razao = m["tempo_mediano_s"] / base["etapas"][etapa]["tempo_mediano_s"]
+                alerta = "  <-- regressão" if razao > 1.2 else ""
+                print(f"  {etapa:<20} {razao:6.2f}x{alerta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline (processamento, grupos, rankings, cluster, figuras).")
+    parser.add_argument("--escalas", default=ESCALAS_PADRAO, help="Lista 'pesquisadoresxpublicacoes' separada por vírgulas.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--qualis", default=QUALIS_PADRAO)
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: benchmarks/resultados/<data>.json).")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar os tempos.")
+    args = parser.parse_args(argv)
+
+    escalas = [tuple(int(v) for v in e.lower().split("x")) for e in args.escalas.split(",") if e.strip()]
+    resultado = {
+        "versao": _versao_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "cpus": os.cpu_count(),
+        "escalas": [],
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n_pesq, n_pub in escalas:
+            print(f"Escala {n_pesq} pesquisadores x {n_pub} publicações...")
+            resultado["escalas"].append(executar_escala(n_pesq, n_pub, args.repeticoes, diretorio, qualis=args.qualis))
+            for etapa, m in resultado["escalas"][-1]["etapas"].items():
+                print(f"  {etapa:<20} {m['tempo_mediano_s']:.4f}s  (python {m['pico_python_mb']:.1f} MB, rss {m['rss_max_mb']:.0f} MB)")
+
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/importacao.py
+"""
+Orçamento de tempo de importação do núcleo de processamento.
+Cada grupo de módulos é importado num interpretador novo (várias vezes, vale a mediana);
+o comando falha (código 1) se o tempo passar do orçamento ou se algum módulo pesado
+(Streamlit, scikit-learn, Plotly, Pandas) for carregado onde não deveria.
+O grupo "app" mede o app.py até a primeira tela (o trecho antes de st.set_page_config).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.importacao
+    python -m benchmarks.importacao --repeticoes 7 --fator 1.5 --detalhar
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# grupo -> (módulos importados juntos, orçamento em segundos, módulos pesados proibidos)
+ORCAMENTOS = {
+    "nucleo": (
+        ["src.processor", "src.cache", "src.analytics", "src.ranking", "src.grupos", "src.exclusoes",
+         "src.catalogo", "src.busca", "src.diagnostico", "src.qualis", "src.dados_compartilhados", "src.nomes", "src.deduplicacao", "src.cubo"],
+        0.6,
+        ["streamlit", "sklearn", "plotly", "pandas"],
+    ),
+    "figuras": (
+        ["src.figuras", "src.render", "src.clustering"],
+        0.8,
+        ["streamlit", "sklearn", "pandas"],
+    ),
+    # o próprio Streamlit já importa o Plotly (tema dos gráficos); o que a primeira tela não pode
+    # carregar é o Pandas e o scikit-learn
+    "app": (
+        ["app.py"],
+        1.0,
+        ["sklearn", "pandas"],
+    ),
+}
+PESADOS = ["streamlit", "sklearn", "plotly", "pandas", "pyarrow", "numpy"]
+
+_CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+{importacoes}
+tempo = time.perf_counter() - inicio
+print(json.dumps({{"tempo_s": tempo, "carregados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def _importacoes(modulos):
+    """Código que importa os módulos; um script (.py) é executado até o st.set_page_config."""
+    linhas = []
+    for modulo in modulos:
+        if modulo.endswith(".py"):
+            linhas.append(f"fonte = open({modulo!r}, encoding='utf-8').read()\n"
+                          f"exec(compile(fonte[:fonte.index('st.set_page_config')], {modulo!r}, 'exec'), "
+                          f"{{'__name__': {modulo[:-3]!r}}})")
+        else:
+            linhas.append(f"import {modulo}")
+    return "\n".join(linhas)
+
+
+def medir_grupo(modulos, repeticoes):
+    """Mediana do tempo de importação (interpretador novo a cada repetição) e módulos pesados carregados."""
+    tempos, carregados = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", _CODIGO.format(importacoes=_importacoes(modulos), pesados=PESADOS)],
+                               capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(resultado["tempo_s"])
+        carregados = resultado["carregados"]
+    return statistics.median(tempos), carregados
+
+
+def detalhar(modulos, n=8):
+    """Os n módulos com maior tempo próprio de importação (python -X importtime)."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", _importacoes(modulos)],
+                            capture_output=True, text=True, check=True).stderr
+    linhas = []
+    for linha in stderr.splitlines():
+        partes = linha.split("|")
+        if len(partes) == 3 and partes[0].split(":")[-1].strip().isdigit():
+            linhas.append((int(partes[0].split(":")[-1]), partes[2].strip()))
+    return sorted(linhas, reverse=True)[:n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de tempo de importação do núcleo.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--fator", type=float, default=1.0, help="Multiplica os orçamentos (máquinas mais lentas, CI).")
+    parser.add_argument("--detalhar", action="store_true", help="Lista os módulos mais lentos de cada grupo.")
+    args = parser.parse_args(argv)
+
+    falhou = False
+    for grupo, (modulos, orcamento, proibidos) in ORCAMENTOS.items():
+        tempo, carregados = medir_grupo(modulos, args.repeticoes)
+        limite = orcamento * args.fator
+        indevidos = [m for m in carregados if m in proibidos]
+        ok = tempo <= limite and not indevidos
+        falhou |= not ok
+        print(f"{grupo:<10} {tempo:.3f}s (orçamento {limite:.2f}s)  carregados: {', '.join(carregados) or '-'}"
+              f"  {'OK' if ok else 'ESTOUROU'}")
+        if indevidos:
+            print(f"  módulos pesados carregados indevidamente: {', '.join(indevidos)}")
+        if args.detalhar:
+            for micros, modulo in detalhar(modulos):
+                print(f"  {micros / 1000:8.1f} ms  {modulo}")
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
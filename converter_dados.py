@@ -1,27 +1,133 @@
 # converter_dados.py
+import argparse
+import csv
+import io
+import os
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-import os
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.processor import ler_csv_zip, normalizar_dados_brutos
+from src.ingestao import ingerir_incremental
+from src.catalogo import publicar_programa, REPOSITORIO
+
+# Tamanho dos row groups: grande o bastante para boa compressão/estatísticas,
+# pequeno o bastante para manter a memória limitada durante a conversão
+LINHAS_POR_ROW_GROUP = 64_000
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# Conversões padrão (origem -> destino)
+PROGRAMAS = {
+    os.path.join(ASSETS, "pesquisadores_ppge.zip"): os.path.join(ASSETS, "ppge.parquet"),
+    os.path.join(ASSETS, "pesquisadores_ppgci.zip"): os.path.join(ASSETS, "ppgci.parquet"),
+    os.path.join(ASSETS, "pesquisadores_mdcc.zip"): os.path.join(ASSETS, "mdcc.parquet"),
+}
+QUALIS = {
+    os.path.join(ASSETS, "lista_qualis_educacao.xlsx"): os.path.join(ASSETS, "lista_qualis_educacao.parquet"),
+    os.path.join(ASSETS, "lista_qualis_computacao.xlsx"): os.path.join(ASSETS, "lista_qualis_computacao.parquet"),
+    os.path.join(ASSETS, "lista_qualis_comunicacao.xlsx"): os.path.join(ASSETS, "lista_qualis_comunicacao.parquet"),
+}
+# Programas publicados no repositório particionado (nome exibido, Parquet, lista Qualis), nesta ordem
+PUBLICACOES = [
+    ("PPGE (Educação)", os.path.join(ASSETS, "ppge.parquet"), os.path.join(ASSETS, "lista_qualis_educacao.parquet")),
+    ("PPGCI (Ciência da Informação)", os.path.join(ASSETS, "ppgci.parquet"), os.path.join(ASSETS, "lista_qualis_comunicacao.parquet")),
+    ("MDCC (Ciência da Computação)", os.path.join(ASSETS, "mdcc.parquet"), os.path.join(ASSETS, "lista_qualis_computacao.parquet")),
+]
+
+
+def _membros_csv(z):
+    return [a for a in z.namelist() if a.lower().endswith(".csv") and not a.startswith("__MACOSX")]
+
 
-def converter_zip_para_parquet(zip_path, output_path):
-    dfs = []
+def _colunas_cabecalho(z, arquivo):
+    """Lê apenas a primeira linha do CSV para montar o esquema (sem carregar o arquivo)."""
+    with z.open(arquivo) as f:
+        primeira = io.TextIOWrapper(f, encoding="utf-8", errors="replace").readline()
+    return [c.lstrip("\ufeff").lower().strip() for c in next(csv.reader([primeira]), [])]
+
+
+def _esquema_canonico(colunas):
+    """Esquema Arrow do processor: ano_publicacao Int64 e as demais colunas como texto."""
+    return pa.schema([(c, pa.int64() if c == "ano_publicacao" else pa.string()) for c in colunas])
+
+
+def converter_zip_para_parquet(zip_path, output_path, linhas_por_row_group=LINHAS_POR_ROW_GROUP):
+    """
+    Converte o ZIP de CSVs dos pesquisadores em um Parquet com o esquema canônico do processor
+    (colunas em minúsculas, ano_publicacao Int64, issn_limpo pré-calculado).
+    Os CSVs são lidos um a um e gravados em row groups, mantendo a memória limitada.
+    """
     with zipfile.ZipFile(zip_path) as z:
-        for arquivo in z.namelist():
-            if arquivo.endswith(".csv") and not arquivo.startswith("__MACOSX"):
-                with z.open(arquivo) as f:
-                    df = pd.read_csv(f, on_bad_lines='skip')
-                    # O nome do arquivo vira uma coluna
-                    nome_pesquisador = os.path.splitext(os.path.basename(arquivo))[0].replace("_", " ")
-                    df["pesquisador"] = nome_pesquisador
-                    dfs.append(df)
-    
-    if dfs:
-        full_df = pd.concat(dfs, ignore_index=True)
-        # Normalizar colunas para garantir compatibilidade
-        full_df.columns = [c.lower().strip() for c in full_df.columns]
-        # Salvar como Parquet
-        full_df.to_parquet(output_path, index=False)
-        print(f"Sucesso: {output_path} gerado com {len(full_df)} registros.")
+        arquivos = _membros_csv(z)
+
+        # Esquema: união dos cabeçalhos + colunas derivadas
+        colunas = []
+        for arquivo in arquivos:
+            for c in _colunas_cabecalho(z, arquivo):
+                if c and c not in colunas:
+                    colunas.append(c)
+        if any("issn" in c for c in colunas):
+            colunas.append("issn_limpo")
+        colunas.append("pesquisador")
+        esquema = _esquema_canonico(colunas)
+
+        total = 0
+        buffer, linhas_buffer = [], 0
+        tmp_path = output_path + ".tmp"
+        with pq.ParquetWriter(tmp_path, esquema, compression="zstd", write_statistics=True) as writer:
+            for arquivo in arquivos:
+                _, df, erro = ler_csv_zip(arquivo, z.read(arquivo))
+                if erro is not None:
+                    print(f"ERRO ao ler {arquivo}: {erro}")
+                    continue
+
+                df = normalizar_dados_brutos(df)
+                df = df.select([
+                    pl.col(c) if c in df.columns else pl.lit(None).alias(c) for c in colunas
+                ]).cast({c: (pl.Int64 if c == "ano_publicacao" else pl.Utf8) for c in colunas})
+                buffer.append(df)
+                linhas_buffer += df.height
+
+                if linhas_buffer >= linhas_por_row_group:
+                    writer.write_table(pl.concat(buffer).to_arrow().cast(esquema), row_group_size=linhas_por_row_group)
+                    total += linhas_buffer
+                    buffer, linhas_buffer = [], 0
+
+            if buffer:
+                writer.write_table(pl.concat(buffer).to_arrow().cast(esquema), row_group_size=linhas_por_row_group)
+                total += linhas_buffer
+
+    os.replace(tmp_path, output_path)
+    print(f"Sucesso: {output_path} gerado com {total} registros.")
+    return total
+
+
+def atualizar_parquet_incremental(origem, output_path):
+    """Atualiza o Parquet relendo só os CSVs novos/alterados desde a última ingestão (src/ingestao.py)."""
+    resumo = ingerir_incremental(origem, output_path)
+    for erro in resumo["erros"]:
+        print(f"ERRO ao ler {erro}")
+    print(f"Sucesso: {output_path} atualizado ({resumo['adicionados']} adicionados, {resumo['alterados']} alterados, "
+          f"{resumo['removidos']} removidos, {resumo['inalterados']} inalterados; {resumo['linhas']} registros).")
+    return resumo
+
+
+def publicar_no_repositorio(parquet_path, nome, qualis_path, ordem=None, diretorio=REPOSITORIO):
+    """Publica o Parquet de um programa no repositório particionado por ano, com os metadados do catálogo."""
+    metadados = publicar_programa(parquet_path, nome, qualis_path, diretorio=diretorio, ordem=ordem)
+    print(f"Sucesso: {nome} publicado em {diretorio} ({metadados['linhas']} registros, "
+          f"{len(metadados['pesquisadores'])} pesquisadores, {len(metadados['linhas_por_ano'])} partições).")
+    return metadados
+
+
+def publicar_padroes(diretorio=REPOSITORIO):
+    for ordem, (nome, parquet_path, qualis_path) in enumerate(PUBLICACOES):
+        if os.path.exists(parquet_path) and os.path.exists(qualis_path):
+            publicar_no_repositorio(parquet_path, nome, qualis_path, ordem=ordem, diretorio=diretorio)
+
 
 def converter_qualis_para_parquet(xlsx_path, output_path):
     try:
@@ -33,10 +139,52 @@ def converter_qualis_para_parquet(xlsx_path, output_path):
     except Exception as e:
         print(f"Erro ao converter {xlsx_path}: {e}")
 
-# Exemplo de uso:
-#converter_zip_para_parquet("assets/pesquisadores_ppge.zip", "assets/ppge.parquet")
-#converter_zip_para_parquet("assets/pesquisadores_ppgci.zip", "assets/ppgci.parquet")
-#converter_zip_para_parquet("assets/pesquisadores_mdcc.zip", "assets/mdcc.parquet")
-converter_qualis_para_parquet("assets/lista_qualis_educacao.xlsx", "assets/lista_qualis_educacao.parquet")
-converter_qualis_para_parquet("assets/lista_qualis_computacao.xlsx", "assets/lista_qualis_computacao.parquet")
-converter_qualis_para_parquet("assets/lista_qualis_comunicacao.xlsx", "assets/lista_qualis_comunicacao.parquet")
\ No newline at end of file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte ZIPs de pesquisadores e listas Qualis (Excel) para Parquet.")
+    parser.add_argument("--zip", help="ZIP (ou diretório) de CSVs de um programa (sem argumentos: converte todos os padrões).")
+    parser.add_argument("--qualis", help="Lista Qualis em Excel.")
+    parser.add_argument("--saida", help="Arquivo Parquet de destino (obrigatório com --zip ou --qualis).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Relê só os CSVs de pesquisadores novos ou alterados (manifesto de hashes ao lado do Parquet).")
+    parser.add_argument("--publicar", metavar="PARQUET", help="Publica o Parquet de um programa no repositório particionado.")
+    parser.add_argument("--nome", help="Nome do programa exibido no app (com --publicar).")
+    parser.add_argument("--lista-qualis", help="Lista Qualis em Parquet do programa (com --publicar).")
+    parser.add_argument("--repositorio", action="store_true", help="Apenas republica os programas padrão no repositório.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Número de processos em paralelo.")
+    args = parser.parse_args(argv)
+
+    if args.publicar:
+        if not (args.nome and args.lista_qualis):
+            parser.error("--nome e --lista-qualis são obrigatórios com --publicar")
+        publicar_no_repositorio(args.publicar, args.nome, args.lista_qualis)
+        return
+    if args.repositorio:
+        publicar_padroes()
+        return
+
+    if args.zip or args.qualis:
+        if not args.saida:
+            parser.error("--saida é obrigatório com --zip ou --qualis")
+        if args.zip:
+            (atualizar_parquet_incremental if args.incremental else converter_zip_para_parquet)(args.zip, args.saida)
+        else:
+            converter_qualis_para_parquet(args.qualis, args.saida)
+        return
+
+    converter_programa = atualizar_parquet_incremental if args.incremental else converter_zip_para_parquet
+    tarefas = [(converter_programa, o, d) for o, d in PROGRAMAS.items() if os.path.exists(o)]
+    tarefas += [(converter_qualis_para_parquet, o, d) for o, d in QUALIS.items() if os.path.exists(o)]
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers or 1)) as executor:
+        futuros = {executor.submit(f, o, d): o for f, o, d in tarefas}
+        for futuro in as_completed(futuros):
+            try:
+                futuro.result()
+            except Exception as e:
+                print(f"Erro ao converter {futuros[futuro]}: {e}")
+    publicar_padroes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# gerar_relatorios.py
+"""
+Gera, sem abrir o dashboard, as tabelas de resultados (Parquet) e os relatórios HTML estáticos
+de todos os programas do catálogo, um processo por programa.
+
+Uso:
+    python gerar_relatorios.py
+    python gerar_relatorios.py --programas "PPGE (Educação)" "MDCC (Ciência da Computação)" --saida /tmp/relatorios
+"""
+import argparse
+from src.catalogo import CATALOGO
+from src.relatorios import gerar_relatorios, DIRETORIO_PADRAO
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera tabelas Parquet e relatórios HTML de todos os programas do catálogo.")
+    parser.add_argument("--saida", default=DIRETORIO_PADRAO, help="Diretório de destino (padrão: relatorios/).")
+    parser.add_argument("--programas", nargs="+", choices=list(CATALOGO), help="Programas a processar (padrão: todos).")
+    parser.add_argument("--workers", type=int, default=None, help="Processos em paralelo (padrão: um por programa, até o nº de CPUs).")
+    args = parser.parse_args(argv)
+
+    indice = gerar_relatorios(args.saida, programas=args.programas, max_workers=args.workers)
+    for p in indice["programas"]:
+        if "erro" in p:
+            print(f"Erro: {p['programa']}: {p['erro']}")
+        else:
+            print(f"Sucesso: {p['programa']} ({p['registros']} registros, {p['pesquisadores']} pesquisadores) -> {p['diretorio']}/")
+    print(f"Índice: {args.saida}/index.html")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import polars as pl
+from .config import PESOS
+
+ESTRATOS = list(PESOS.keys())
+MAPA_ABC = {"A1": "A", "A2": "A", "A3": "B", "A4": "B", "B1": "C", "B2": "C", "B3": "C", "B4": "C"}
+ANO = "ano_publicacao"
+
+
+# As funções recebem tabelas do cubo de contagens (src/cubo.py): uma linha por célula,
+# com a quantidade de publicações em 'n' e a pontuação somada em 'peso'.
+
+
+def totais_por_ano(df, entidade):
+    """Pontuação por ano x entidade, com o acumulado por entidade (ordenado por ano e entidade)."""
+    return (
+        df.group_by([ANO, entidade])
+        .agg(pl.col("peso").sum())
+        .sort([ANO, entidade])
+        .with_columns(pl.col("peso").cum_sum().over(entidade).alias("acumulado"))
+    )
+
+
+def contagem_estratos(df, entidade):
+    """Quantidade de publicações por entidade x estrato (colunas na ordem de PESOS, ordenado por entidade)."""
+    contagem = df.group_by([entidade, "qualis_norm"]).agg(pl.col("n").sum().alias("len"))
+    largo = contagem.pivot(on="qualis_norm", index=entidade, values="len")
+    return largo.select(
+        pl.col(entidade),
+        *[pl.col(e).fill_null(0) if e in largo.columns else pl.lit(0, dtype=pl.UInt32).alias(e) for e in ESTRATOS],
+    ).sort(entidade)
+
+
+def proporcoes_abc(df, entidade):
+    """Contagens por faixa A/B/C (A1-A2, A3-A4, B1-B4) e o total de cada entidade."""
+    contagem = (
+        df.with_columns(pl.col("qualis_norm").replace_strict(MAPA_ABC, default=None).alias("grupo_abc"))
+        .drop_nulls("grupo_abc")
+        .group_by([entidade, "grupo_abc"])
+        .agg(pl.col("n").sum().alias("len"))
+    )
+    largo = contagem.pivot(on="grupo_abc", index=entidade, values="len")
+    return largo.select(
+        pl.col(entidade),
+        *[pl.col(c).fill_null(0) if c in largo.columns else pl.lit(0, dtype=pl.UInt32).alias(c) for c in "ABC"],
+    ).with_columns((pl.col("A") + pl.col("B") + pl.col("C")).alias("sum")).sort(entidade)
+
+
+def matriz_calor(total, entidade):
+    """
+    Matriz entidade x ano da pontuação (0 onde não houve publicação).
+    Retorna (nomes, anos, matriz numpy float).
+    """
+    anos = total[ANO].unique().sort().to_list()
+    largo = total.pivot(on=ANO, index=entidade, values="peso").sort(entidade)
+    matriz = largo.select([pl.col(str(a)).cast(pl.Float64).fill_null(0.0) for a in anos]).to_numpy()
+    return largo[entidade].to_list(), anos, matriz
+
+
+def totais_grupos(df_grupos, membros=None):
+    """
+    Pontuação por ano x linha de pesquisa com tamanho do grupo (n_membros), acumulado,
+    média por membro (peso_medio) e média acumulada. `membros`: tabela de onde contar os
+    membros, quando df_grupos não traz todos (ex: publicações únicas); padrão, a própria df_grupos.
+    """
+    membros = df_grupos if membros is None else membros
+    n_membros = membros.group_by("linha_pesquisa").agg(pl.col("pesquisador").n_unique().alias("n_membros"))
+    return (
+        totais_por_ano(df_grupos, "linha_pesquisa")
+        .join(n_membros, on="linha_pesquisa", how="inner", maintain_order="left")
+        .with_columns((pl.col("peso") / pl.col("n_membros")).alias("peso_medio"))
+        .with_columns(pl.col("peso_medio").cum_sum().over("linha_pesquisa").alias("acumulado_medio"))
+    )
+
+
+def por_entidade(df, entidade):
+    """Divide uma tabela pequena por entidade: {nome: sub-tabela}, em ordem alfabética."""
+    partes = df.partition_by(entidade, as_dict=True, maintain_order=True)
+    return {chave[0]: partes[chave] for chave in sorted(partes)}
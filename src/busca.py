@@ -0,0 +1,131 @@
+import os
+import hashlib
+import threading
+from collections import defaultdict, OrderedDict
+import polars as pl
+from .cache import hash_conteudo
+from .catalogo import scan_dados
+from .config import CACHE_DIR, INDICES_BUSCA_MAX_ITENS
+from .utils import normalizar_texto, normalizar_texto_expr
+
+TAMANHO_NGRAMA = 3
+
+
+def _ngramas(texto, n=TAMANHO_NGRAMA):
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+
+class IndiceBusca:
+    """
+    Índice de nomes de pesquisadores (normalizados, sem acento) -> programas.
+    Buscas por substring usam listas invertidas de trigramas; termos curtos (< 3 letras)
+    caem numa varredura simples da lista de nomes distintos, que é pequena.
+    """
+
+    def __init__(self, tabela, ordem_programas=None):
+        # tabela: colunas nome_norm, programa (uma linha por nome x programa)
+        agrupado = tabela.group_by("nome_norm", maintain_order=True).agg(pl.col("programa").unique(maintain_order=True))
+        self.nomes = agrupado["nome_norm"].to_list()
+        self.programas = agrupado["programa"].to_list()
+        ordem = ordem_programas or tabela["programa"].unique(maintain_order=True).to_list()
+        self.ordem_programas = {p: i for i, p in enumerate(ordem)}
+        self._ngramas = defaultdict(set)
+        for i, nome in enumerate(self.nomes):
+            for g in _ngramas(nome):
+                self._ngramas[g].add(i)
+
+    def buscar_nomes(self, termo):
+        """Índices dos nomes que contêm o termo (comparação sem acentos/maiúsculas)."""
+        termo_norm = normalizar_texto(termo)
+        if not termo_norm:
+            return []
+        grams = _ngramas(termo_norm)
+        if grams:
+            candidatos = set.intersection(*(self._ngramas.get(g, set()) for g in grams))
+        else:
+            candidatos = range(len(self.nomes))
+        return sorted(i for i in candidatos if termo_norm in self.nomes[i])
+
+    def buscar(self, termo):
+        """Programas (na ordem do catálogo) que possuem algum pesquisador contendo o termo."""
+        encontrados = {p for i in self.buscar_nomes(termo) for p in self.programas[i]}
+        return sorted(encontrados, key=lambda p: self.ordem_programas.get(p, len(self.ordem_programas)))
+
+
+def _versao_catalogo(catalogo):
+    # Com a lista de pesquisadores nos metadados do repositório, ela própria define a versão
+    partes = [f"{prog}={c['pesquisadores'] if 'pesquisadores' in c else hash_conteudo(c['path'])}"
+              for prog, c in catalogo.items() if c.get("tipo") == "parquet" and os.path.exists(c["path"])]
+    return hashlib.blake2b("|".join(partes).encode(), digest_size=16).hexdigest()
+
+
+def construir_tabela_nomes(catalogo):
+    """
+    Nomes distintos (normalizados) de cada programa do catálogo: dos metadados do repositório,
+    quando houver, ou lidos só da coluna 'pesquisador'.
+    """
+    tabelas = []
+    for prog, caminhos in catalogo.items():
+        if caminhos.get("tipo") != "parquet" or not os.path.exists(caminhos["path"]):
+            continue
+        try:
+            if "pesquisadores" in caminhos:
+                origem = pl.LazyFrame({"pesquisador": caminhos["pesquisadores"]}, schema={"pesquisador": pl.Utf8})
+            else:
+                origem = scan_dados(caminhos["path"])
+            nomes = (
+                origem
+                .select(normalizar_texto_expr("pesquisador").alias("nome_norm"))
+                .unique()
+                .collect()
+                .with_columns(pl.lit(prog).alias("programa"))
+            )
+            tabelas.append(nomes)
+        except Exception:
+            pass
+    if not tabelas:
+        return pl.DataFrame(schema={"nome_norm": pl.Utf8, "programa": pl.Utf8})
+    return pl.concat(tabelas).drop_nulls("nome_norm")
+
+
+# Índices por versão do catálogo, em ordem LRU (republicações criam versões novas)
+_indices = OrderedDict()
+_lock = threading.Lock()
+
+
+def obter_indice_nomes(catalogo, diretorio=CACHE_DIR):
+    """
+    Índice de nomes para a versão atual dos arquivos do catálogo.
+    Fica em memória (compartilhado entre sessões) e persistido em disco por versão,
+    então só é reconstruído quando algum Parquet muda.
+    """
+    versao = _versao_catalogo(catalogo)
+    with _lock:
+        if versao in _indices:
+            _indices.move_to_end(versao)
+            return _indices[versao]
+
+    caminho = os.path.join(diretorio, f"indice_nomes_{versao}.parquet") if diretorio else None
+    tabela = None
+    if caminho and os.path.exists(caminho):
+        try:
+            tabela = pl.read_parquet(caminho)
+        except Exception:
+            tabela = None
+    if tabela is None:
+        tabela = construir_tabela_nomes(catalogo)
+        if caminho:
+            try:
+                os.makedirs(diretorio, exist_ok=True)
+                tabela.write_parquet(caminho + ".tmp")
+                os.replace(caminho + ".tmp", caminho)
+            except OSError:
+                pass
+
+    indice = IndiceBusca(tabela, ordem_programas=list(catalogo))
+    with _lock:
+        _indices[versao] = indice
+        _indices.move_to_end(versao)
+        while len(_indices) > INDICES_BUSCA_MAX_ITENS:
+            _indices.popitem(last=False)
+    return indice
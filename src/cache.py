@@ -0,0 +1,219 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import polars as pl
+from .diagnostico import etapa
+from .utils import para_polars
+from .config import CACHE_DIR, CACHE_MEMORIA_BYTES, CACHE_FIGURAS_MAX_ITENS, HASH_ARQUIVOS_MAX_ITENS
+
+# Incrementar quando a lógica de processamento mudar (invalida o cache em disco)
+VERSAO_PROCESSAMENTO = "7"
+
+# Hashes de arquivos por (caminho, tamanho, mtime), em ordem LRU; consultado por várias sessões
+_hash_arquivos = OrderedDict()
+_lock_hash = threading.Lock()
+
+
+def hash_conteudo(obj):
+    """
+    Hash do conteúdo de uma fonte de dados: caminho de arquivo ou diretório (repositório
+    particionado), BytesIO/upload ou DataFrame.
+    Para arquivos em disco, o hash é memorizado por (caminho, tamanho, mtime).
+    """
+    h = hashlib.blake2b(digest_size=16)
+
+    if isinstance(obj, (str, os.PathLike)) and os.path.isdir(obj):
+        # Diretório: caminhos relativos + hash de cada Parquet (os metadados não entram)
+        raiz = os.fspath(obj)
+        for pasta, _, arquivos in sorted(os.walk(raiz)):
+            for nome in sorted(a for a in arquivos if a.endswith(".parquet")):
+                caminho = os.path.join(pasta, nome)
+                h.update(f"{os.path.relpath(caminho, raiz)}={hash_conteudo(caminho)}|".encode())
+        return h.hexdigest()
+
+    if isinstance(obj, (str, os.PathLike)):
+        caminho = os.fspath(obj)
+        st_ = os.stat(caminho)
+        chave = (caminho, st_.st_size, st_.st_mtime_ns)
+        with _lock_hash:
+            if chave in _hash_arquivos:
+                _hash_arquivos.move_to_end(chave)
+                return _hash_arquivos[chave]
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        with _lock_hash:
+            _hash_arquivos[chave] = h.hexdigest()
+            while len(_hash_arquivos) > HASH_ARQUIVOS_MAX_ITENS:
+                _hash_arquivos.popitem(last=False)
+        return h.hexdigest()
+
+    obj = para_polars(obj)
+    if isinstance(obj, pl.DataFrame):
+        h.update(",".join(f"{c}:{t}" for c, t in obj.schema.items()).encode())
+        h.update(obj.hash_rows(seed=0).to_numpy().tobytes())
+        return h.hexdigest()
+
+    if hasattr(obj, "getvalue"):
+        h.update(obj.getvalue())
+        return h.hexdigest()
+
+    if isinstance(obj, bytes):
+        h.update(obj)
+        return h.hexdigest()
+
+    raise TypeError(f"Tipo de fonte não suportado para hash: {type(obj).__name__}")
+
+
+class CacheResultados:
+    """
+    Cache em dois níveis para os resultados de processar_dados_com_filtro:
+      1. Memória: LRU limitado por orçamento de bytes.
+      2. Disco: Parquet (DataFrame filtrado) + Parquet (tabela de exclusões), sobrevive a reinícios.
+    """
+
+    def __init__(self, diretorio=CACHE_DIR, max_bytes=CACHE_MEMORIA_BYTES):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self._memoria = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def chave(self, origem_dados, df_ref_qualis, is_parquet, *extras, hash_origem=None):
+        """hash_origem: hash de uma versão anterior da fonte (ingestão incremental), no lugar do atual."""
+        partes = [VERSAO_PROCESSAMENTO, hash_origem or hash_conteudo(origem_dados), hash_conteudo(df_ref_qualis), str(bool(is_parquet))]
+        partes += [str(e) for e in extras]
+        return hashlib.blake2b("|".join(partes).encode(), digest_size=16).hexdigest()
+
+    def _caminhos(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.parquet"), os.path.join(self.diretorio, f"{chave}.excluidos.parquet")
+
+    def obter(self, chave):
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.hits_memoria += 1
+                df, excluidos, _ = self._memoria[chave]
+                return df, excluidos
+
+        caminho_df, caminho_excluidos = self._caminhos(chave)
+        if self.diretorio and os.path.exists(caminho_df) and os.path.exists(caminho_excluidos):
+            try:
+                df = pl.read_parquet(caminho_df)
+                excluidos = pl.read_parquet(caminho_excluidos)
+            except Exception:
+                df = None
+            if df is not None:
+                with self._lock:
+                    self.hits_disco += 1
+                self._guardar_memoria(chave, df, excluidos)
+                return df, excluidos
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def guardar(self, chave, df, excluidos, em_disco=True):
+        self._guardar_memoria(chave, df, excluidos)
+        if not self.diretorio or not em_disco:
+            return
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            caminho_df, caminho_excluidos = self._caminhos(chave)
+            # Escrita atômica: grava em arquivo temporário e renomeia
+            df.write_parquet(caminho_df + ".tmp")
+            excluidos.write_parquet(caminho_excluidos + ".tmp")
+            os.replace(caminho_excluidos + ".tmp", caminho_excluidos)
+            os.replace(caminho_df + ".tmp", caminho_df)
+        except OSError:
+            # Cache em disco é opcional (ex: sistema de arquivos somente leitura)
+            pass
+
+    def _guardar_memoria(self, chave, df, excluidos):
+        tamanho = df.estimated_size() + excluidos.estimated_size()
+        if tamanho > self.max_bytes:
+            return
+        with self._lock:
+            if chave in self._memoria:
+                self._bytes -= self._memoria.pop(chave)[2]
+            self._memoria[chave] = (df, excluidos, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.max_bytes:
+                _, (_, _, t) = self._memoria.popitem(last=False)
+                self._bytes -= t
+                self.evictions += 1
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "hits_memoria": self.hits_memoria,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "itens_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class CacheFiguras:
+    """
+    Cache LRU (limitado por número de itens) das figuras Plotly.
+    A chave combina o nome do construtor, a impressão digital dos agregados de entrada
+    e os parâmetros de visualização: um rerun com os mesmos dados reaproveita a figura pronta.
+    """
+
+    def __init__(self, max_itens=CACHE_FIGURAS_MAX_ITENS):
+        self.max_itens = max_itens
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def chave(self, construtor, dados, parametros):
+        partes = [construtor.__module__, construtor.__qualname__]
+        partes += [hash_conteudo(d) for d in dados]
+        partes += [f"{k}={parametros[k]!r}" for k in sorted(parametros)]
+        return hashlib.blake2b("|".join(partes).encode(), digest_size=16).hexdigest()
+
+    def obter(self, construtor, *dados, **parametros):
+        """Retorna construtor(*dados, **parametros), reaproveitando a figura se já estiver em cache."""
+        with etapa("construir_figura") as e:
+            e.info(figura=construtor.__name__)
+            chave = self.chave(construtor, dados, parametros)
+            with self._lock:
+                if chave in self._figuras:
+                    self._figuras.move_to_end(chave)
+                    self.hits += 1
+                    e.info(hit=True)
+                    return self._figuras[chave]
+                self.misses += 1
+
+            e.info(hit=False)
+            fig = construtor(*dados, **parametros)
+            with self._lock:
+                self._figuras[chave] = fig
+                while len(self._figuras) > self.max_itens:
+                    self._figuras.popitem(last=False)
+                    self.evictions += 1
+            return fig
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "itens": len(self._figuras),
+                "max_itens": self.max_itens,
+            }
+
+
+cache_resultados = CacheResultados()
+cache_figuras = CacheFiguras()
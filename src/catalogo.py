@@ -0,0 +1,185 @@
+import os
+import re
+import json
+import shutil
+from datetime import datetime
+import polars as pl
+from .utils import normalizar_texto
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# Repositório particionado: um diretório por programa e, dentro dele, uma partição por ano
+# (hive: <programa>/ano_publicacao=2020/*.parquet) + _metadados.json. O catálogo do app é
+# descoberto a partir desses metadados: publicar um programa novo não exige mudar código.
+REPOSITORIO = os.environ.get("DASHBOARD_REPOSITORIO", os.path.join(ASSETS, "repositorio"))
+ARQUIVO_METADADOS = "_metadados.json"
+VERSAO_METADADOS = 1
+
+
+def slug(nome):
+    """Nome de diretório seguro para um programa (ex: 'PPGE (Educação)' -> 'ppge_educacao')."""
+    return re.sub(r"[^a-z0-9]+", "_", normalizar_texto(nome)).strip("_") or "programa"
+
+
+def scan_dados(caminho):
+    """LazyFrame de um Parquet ou de um programa do repositório particionado (poda por ano no scan)."""
+    if os.path.isdir(caminho):
+        return pl.scan_parquet(os.path.join(caminho, "**", "*.parquet"), hive_partitioning=True)
+    return pl.scan_parquet(caminho)
+
+
+def metadados_programa(df, nome, qualis, ordem=None):
+    """Metadados descritivos de um programa: linhas, pesquisadores e anos (total e por ano)."""
+    por_ano = df.group_by("ano_publicacao").len().sort("ano_publicacao")
+    anos = [a for a in por_ano["ano_publicacao"].to_list() if a]
+    return {
+        "versao": VERSAO_METADADOS,
+        "nome": nome,
+        "ordem": ordem,
+        "qualis": qualis,
+        "linhas": len(df),
+        "pesquisadores": df["pesquisador"].drop_nulls().unique().sort().to_list(),
+        "anos": [min(anos), max(anos)] if anos else None,
+        "linhas_por_ano": {str(a): n for a, n in por_ano.iter_rows()},
+        "publicado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def _assinaturas_pesquisadores(df):
+    """{pesquisador: {hash, anos}}: hash das linhas de cada pesquisador e os anos em que ele publicou."""
+    resumo = (
+        df.with_columns(pl.struct(pl.all()).hash().alias("_h"), pl.col("pesquisador").fill_null(""))
+        .group_by("pesquisador", maintain_order=True)
+        .agg(pl.col("_h"), pl.col("ano_publicacao").unique().sort().alias("anos"))
+        .with_columns(pl.col("_h").hash())
+    )
+    return {p: {"hash": h, "anos": anos} for p, h, anos in resumo.select("pesquisador", "_h", "anos").iter_rows()}
+
+
+def _gravar_metadados(caminho, metadados):
+    with open(os.path.join(caminho, ARQUIVO_METADADOS + ".tmp"), "w", encoding="utf-8") as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(os.path.join(caminho, ARQUIVO_METADADOS + ".tmp"), os.path.join(caminho, ARQUIVO_METADADOS))
+
+
+def _regravar_particoes(df, destino, anos):
+    """Substitui só as partições `anos` do programa em `destino` (removendo as que ficaram vazias)."""
+    tmp = destino + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    parte = df.filter(pl.col("ano_publicacao").is_in(anos))
+    if not parte.is_empty():
+        parte.write_parquet(tmp, partition_by="ano_publicacao", compression="zstd", statistics=True)
+    for ano in anos:
+        particao = f"ano_publicacao={ano}"
+        shutil.rmtree(os.path.join(destino, particao), ignore_errors=True)
+        if os.path.isdir(os.path.join(tmp, particao)):
+            os.replace(os.path.join(tmp, particao), os.path.join(destino, particao))
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def publicar_programa(origem, nome, qualis, diretorio=REPOSITORIO, ordem=None):
+    """
+    Grava um programa (Parquet no esquema do processador, ou DataFrame) no repositório,
+    particionado por ano_publicacao, com os metadados. A lista Qualis fica referenciada por
+    caminho relativo ao diretório do programa. Substitui uma publicação anterior do programa.
+    Numa republicação, só as partições (anos) dos pesquisadores que mudaram são regravadas, e o
+    manifesto do diretório registra quem mudou: o processador atualiza o resultado da versão
+    anterior em cache só com esses pesquisadores (ingestao.delta_dataset).
+    """
+    from .cache import hash_conteudo
+    from .ingestao import ler_manifesto, gravar_manifesto, VERSAO_MANIFESTO
+
+    df = pl.read_parquet(origem) if isinstance(origem, (str, os.PathLike)) else origem
+    df = df.with_columns(pl.col("ano_publicacao").fill_null(0))
+    destino = os.path.join(diretorio, slug(nome))
+    colunas = [f"{c}:{t}" for c, t in df.schema.items()]
+    pesquisadores = _assinaturas_pesquisadores(df)
+    metadados = metadados_programa(df, nome, os.path.relpath(os.path.abspath(qualis), os.path.abspath(destino)), ordem)
+
+    manifesto = ler_manifesto(destino) if os.path.isdir(destino) else None
+    # Manifesto de outro esquema, sem assinaturas ou de um diretório alterado por fora: regrava tudo
+    if manifesto is not None and (manifesto.get("colunas") != colunas or "pesquisadores" not in manifesto
+                                  or manifesto.get("hash_dataset") != hash_conteudo(destino)):
+        manifesto = None
+
+    if manifesto is None:
+        tmp = destino + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        df.write_parquet(tmp, partition_by="ano_publicacao", compression="zstd", statistics=True)
+        _gravar_metadados(tmp, metadados)
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(tmp, destino)
+        atualizacao = None
+    else:
+        anteriores = manifesto["pesquisadores"]
+        afetados = sorted(p for p in anteriores.keys() | pesquisadores.keys()
+                          if anteriores.get(p, {}).get("hash") != pesquisadores.get(p, {}).get("hash"))
+        anos = sorted({a for p in afetados for a in anteriores.get(p, {}).get("anos", []) + pesquisadores.get(p, {}).get("anos", [])})
+        _regravar_particoes(df, destino, anos)
+        _gravar_metadados(destino, metadados)
+        if not afetados:
+            atualizacao = manifesto.get("atualizacao")
+        elif "" in afetados:
+            # Linhas sem pesquisador não têm como ser atualizadas isoladamente
+            atualizacao = None
+        else:
+            atualizacao = {"hash_anterior": manifesto["hash_dataset"], "pesquisadores": afetados}
+
+    gravar_manifesto(destino, {
+        "versao": VERSAO_MANIFESTO,
+        "atualizado_em": metadados["publicado_em"],
+        "colunas": colunas,
+        "hash_dataset": hash_conteudo(destino),
+        "atualizacao": atualizacao,
+        "pesquisadores": pesquisadores,
+    })
+    return metadados
+
+
+def descobrir_catalogo(diretorio=REPOSITORIO):
+    """
+    Catálogo {nome: {qualis, path, tipo, linhas, pesquisadores, anos}} a partir dos metadados
+    dos programas publicados em `diretorio`, na ordem definida na publicação (depois, por nome).
+    """
+    encontrados = []
+    if os.path.isdir(diretorio):
+        for entrada in sorted(os.listdir(diretorio)):
+            caminho = os.path.join(diretorio, entrada)
+            try:
+                with open(os.path.join(caminho, ARQUIVO_METADADOS), encoding="utf-8") as f:
+                    metadados = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if metadados.get("versao") != VERSAO_METADADOS:
+                continue
+            encontrados.append((metadados, caminho))
+
+    encontrados.sort(key=lambda m: (m[0].get("ordem") is None, m[0].get("ordem") or 0, m[0]["nome"]))
+    return {
+        m["nome"]: {
+            "qualis": os.path.normpath(os.path.join(caminho, m["qualis"])),
+            "path": caminho,
+            "tipo": "parquet",
+            "linhas": m["linhas"],
+            "pesquisadores": m["pesquisadores"],
+            "anos": m["anos"],
+        }
+        for m, caminho in encontrados
+    }
+
+
+# Catálogo de Programas do modo Repositório (descoberto na inicialização)
+CATALOGO = descobrir_catalogo()
+
+
+def fontes_do_catalogo(programas=None, catalogo=CATALOGO):
+    """
+    Fontes no formato de processar_fontes para os programas escolhidos (todos, se None) com arquivos
+    presentes. Uma seleção vazia continua vazia.
+    """
+    fontes = []
+    for nome in programas if programas is not None else list(catalogo):
+        caminhos = catalogo[nome]
+        if os.path.exists(caminhos["qualis"]) and os.path.exists(caminhos["path"]):
+            fontes.append({"nome": nome, "qualis": caminhos["qualis"], "path": caminhos["path"], "tipo": caminhos["tipo"]})
+    return fontes
@@ -0,0 +1,135 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .config import CLUSTER_K_CANDIDATOS, LIMIAR_MINIBATCH, AMOSTRA_SILHUETA, CACHE_MODELOS_MAX_ITENS
+
+
+class ModeloCluster:
+    """Scaler + KMeans + PCA ajustados sobre uma matriz de contagens por estrato."""
+
+    def __init__(self, scaler, kmeans, pca, k, silhueta):
+        self.scaler = scaler
+        self.kmeans = kmeans
+        self.pca = pca
+        self.k = k
+        self.silhueta = silhueta
+
+    def atribuir(self, matriz):
+        """Grupo e coordenadas 2D de cada linha, sem reajustar (vale para subconjuntos filtrados)."""
+        escalada = self.scaler.transform(np.asarray(matriz, dtype=float))
+        return self.kmeans.predict(escalada), self.pca.transform(escalada)
+
+
+# O scikit-learn (~1s de importação) só é carregado quando um cluster é de fato ajustado
+def _kmeans(k, n_linhas, limiar_minibatch):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    if n_linhas > limiar_minibatch:
+        return MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=1024)
+    return KMeans(n_clusters=k, random_state=42, n_init=10)
+
+
+def _avaliar(escalada, k, limiar_minibatch):
+    """Ajusta o KMeans para um k e mede a silhueta (amostrada em matrizes grandes)."""
+    from sklearn.metrics import silhouette_score
+    modelo = _kmeans(k, len(escalada), limiar_minibatch).fit(escalada)
+    try:
+        amostra = AMOSTRA_SILHUETA if len(escalada) > AMOSTRA_SILHUETA else None
+        silhueta = silhouette_score(escalada, modelo.labels_, sample_size=amostra, random_state=42)
+    except ValueError:
+        # Perfis idênticos podem gerar um único grupo efetivo: silhueta indefinida
+        silhueta = -1.0
+    return k, modelo, silhueta
+
+
+def ajustar_modelo(matriz, k_candidatos=CLUSTER_K_CANDIDATOS, limiar_minibatch=LIMIAR_MINIBATCH, max_workers=None):
+    """
+    Ajusta scaler, KMeans e PCA. O k é escolhido pela maior silhueta entre os candidatos
+    válidos (2 <= k < n), avaliados em paralelo; sem candidato válido, usa min(3, n).
+    """
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.decomposition import PCA
+    matriz = np.asarray(matriz, dtype=float)
+    n = len(matriz)
+    scaler = StandardScaler().fit(matriz)
+    escalada = scaler.transform(matriz)
+
+    validos = [k for k in k_candidatos if 2 <= k < n]
+    if validos:
+        workers = max(1, min(len(validos), max_workers or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            avaliados = list(executor.map(lambda k: _avaliar(escalada, k, limiar_minibatch), validos))
+        # Maior silhueta; empates ficam com o menor k
+        k, kmeans, silhueta = max(avaliados, key=lambda r: (r[2], -r[0]))
+    else:
+        k, kmeans, silhueta = min(3, n), _kmeans(min(3, n), n, limiar_minibatch).fit(escalada), None
+
+    pca = PCA(n_components=2).fit(escalada)
+    return ModeloCluster(scaler, kmeans, pca, k, silhueta)
+
+
+def hash_matriz(matriz):
+    matriz = np.ascontiguousarray(matriz, dtype=float)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(matriz.shape).encode())
+    h.update(matriz.tobytes())
+    return h.hexdigest()
+
+
+_modelos = OrderedDict()
+# contexto -> (hash da matriz, modelo) do ajuste sem filtros; LRU como _modelos
+_referencias = OrderedDict()
+_lock = threading.Lock()
+
+
+def obter_modelo(matriz, k_candidatos=CLUSTER_K_CANDIDATOS):
+    """Modelo ajustado para a matriz, memorizado (LRU) pelo hash da matriz de atributos."""
+    chave = (hash_matriz(matriz), tuple(k_candidatos))
+    with _lock:
+        if chave in _modelos:
+            _modelos.move_to_end(chave)
+            return _modelos[chave]
+
+    modelo = ajustar_modelo(matriz, k_candidatos)
+    with _lock:
+        _modelos[chave] = modelo
+        while len(_modelos) > CACHE_MODELOS_MAX_ITENS:
+            _modelos.popitem(last=False)
+    return modelo
+
+
+def referencia(contexto):
+    """Identificador (hash da matriz) do modelo de referência registrado para o contexto, ou None."""
+    with _lock:
+        registro = _referencias.get(contexto)
+    return registro[0] if registro else None
+
+
+def agrupar(matriz, contexto=None, subconjunto=False):
+    """
+    Retorna (grupos, coordenadas 2D, modelo).
+    contexto identifica a base de dados (ex: fontes + entidade): o modelo ajustado sem filtros
+    fica registrado como referência, e um subconjunto filtrado do mesmo contexto é apenas
+    atribuído a ele (scaler/KMeans/PCA reaproveitados), sem novo ajuste.
+    """
+    if subconjunto and contexto is not None:
+        with _lock:
+            registro = _referencias.get(contexto)
+            if registro is not None:
+                _referencias.move_to_end(contexto)
+        if registro is not None:
+            modelo = registro[1]
+            grupos, coords = modelo.atribuir(matriz)
+            return grupos, coords, modelo
+
+    modelo = obter_modelo(matriz)
+    if contexto is not None and not subconjunto:
+        with _lock:
+            _referencias[contexto] = (hash_matriz(matriz), modelo)
+            _referencias.move_to_end(contexto)
+            while len(_referencias) > CACHE_MODELOS_MAX_ITENS:
+                _referencias.popitem(last=False)
+    grupos, coords = modelo.atribuir(matriz)
+    return grupos, coords, modelo
@@ -1,3 +1,5 @@
+import os
+
 PESOS = {
     "A1": 100, "A2": 85, "A3": 75, "A4": 65,
     "B1": 55,  "B2": 40, "B3": 25, "B4": 10
@@ -16,3 +18,49 @@ GRUPOS_RAW = {
 
 # Compreensão de lista para limpar espaços
 GRUPOS_PESQUISA = {k: [p.strip() for p in v] for k, v in GRUPOS_RAW.items()}
+
+# Grupos de pesquisa de cada programa do catálogo (os relatórios em lote só analisam por grupos
+# os programas listados aqui)
+GRUPOS_POR_PROGRAMA = {"PPGE (Educação)": GRUPOS_PESQUISA}
+
+# Casamento aproximado de nomes com a lista de grupos (similaridade mínima, de 0 a 1)
+LIMIAR_SIMILARIDADE_NOMES = float(os.environ.get("DASHBOARD_LIMIAR_NOMES", "0.85"))
+# Menor limiar ajustável no app: os dados compartilhados guardam os casamentos a partir dele
+LIMIAR_MINIMO_NOMES = min(0.5, LIMIAR_SIMILARIDADE_NOMES)
+
+# Colunas usadas pelas análises (as demais não são lidas dos Parquets);
+# título, ISSN e DOI formam a chave de deduplicação de publicações em coautoria
+COLUNAS_ANALISE = ["pesquisador", "ano_publicacao", "qualis", "titulo", "issn_limpo", "doi"]
+# Deduplicação: similaridade mínima (Jaccard estimado por MinHash) entre títulos do mesmo ISSN e ano
+LIMIAR_SIMILARIDADE_TITULOS = float(os.environ.get("DASHBOARD_LIMIAR_TITULOS", "0.7"))
+
+# Cache de resultados do processamento (memória + disco)
+# Pode ser ajustado por variáveis de ambiente em produção
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache"))
+CACHE_MEMORIA_BYTES = int(os.environ.get("DASHBOARD_CACHE_MEMORIA_MB", "512")) * 1024 * 1024
+# Hashes de arquivos memorizados (um por arquivo/partição Parquet em disco)
+HASH_ARQUIVOS_MAX_ITENS = 4096
+# Cache LRU das figuras Plotly (número máximo de figuras em memória)
+CACHE_FIGURAS_MAX_ITENS = int(os.environ.get("DASHBOARD_CACHE_FIGURAS", "64"))
+# Índices Qualis (issn_limpo -> estrato) mantidos em memória pelo processo
+QUALIS_MAX_ITENS = int(os.environ.get("DASHBOARD_QUALIS_MAX_ITENS", "16"))
+# Índices da busca global de pesquisadores (um por versão do catálogo) mantidos em memória
+INDICES_BUSCA_MAX_ITENS = 4
+# Dados processados compartilhados entre as sessões (versões sem sessões ativas saem acima do limite)
+DADOS_COMPARTILHADOS_MAX_BYTES = int(os.environ.get("DASHBOARD_DADOS_COMPARTILHADOS_MB", "1024")) * 1024 * 1024
+
+# Modo de renderização para muitos pesquisadores (WebGL, Top-K + "Outros", hovers enxutos)
+LIMIAR_MODO_GRANDE = int(os.environ.get("DASHBOARD_LIMIAR_MODO_GRANDE", "60"))
+TOP_K_MODO_GRANDE = 20
+TOP_K_HOVER_MODO_GRANDE = 10
+ALTURA_MAXIMA_HEATMAP = 1600
+
+# Cluster de similaridade: k escolhido pela silhueta entre os candidatos;
+# acima de LIMIAR_MINIBATCH linhas usa MiniBatchKMeans
+CLUSTER_K_CANDIDATOS = (2, 3, 4, 5, 6)
+LIMIAR_MINIBATCH = int(os.environ.get("DASHBOARD_LIMIAR_MINIBATCH", "5000"))
+AMOSTRA_SILHUETA = 2000
+CACHE_MODELOS_MAX_ITENS = 32
+
+# Diagnóstico (tempo/memória por etapa + linha JSON por execução); também ativável na barra lateral
+DIAGNOSTICO_ATIVO = os.environ.get("DASHBOARD_DIAGNOSTICO", "0") == "1"
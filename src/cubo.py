@@ -0,0 +1,101 @@
+import polars as pl
+
+# Cubo de contagens materializado uma vez por carga: (programa, pesquisador, linha_pesquisa, ano, estrato)
+# -> quantidade de publicações (n) e pontuação (peso). Todos os gráficos e rankings partem dele,
+# então o custo das figuras depende de pesquisadores x anos x estratos, não do número de publicações.
+
+ANO = "ano_publicacao"
+DIMENSOES_PESQUISADOR = ["programa_origem", "pesquisador", ANO, "qualis_norm"]
+DIMENSOES_GRUPO = ["programa_origem", "pesquisador", "linha_pesquisa", ANO, "qualis_norm"]
+# Presentes quando o casamento de nomes é guardado com a confiança (grupos.aplicar_grupos(confianca=True))
+DIMENSOES_CASAMENTO = ["pesquisador_dados", "confianca"]
+
+
+def agregar(df, dimensoes):
+    """Células do cubo: quantidade (n) e soma dos pesos por combinação das dimensões presentes em df."""
+    dimensoes = [d for d in dimensoes if d in df.columns]
+    return df.group_by(dimensoes, maintain_order=True).agg(pl.len().alias("n"), pl.col("peso").sum())
+
+
+def reagregar(celulas, dimensoes):
+    """Soma as células do cubo sobre as dimensões presentes (as demais são descartadas)."""
+    dimensoes = [d for d in dimensoes if d in celulas.columns]
+    return celulas.group_by(dimensoes, maintain_order=True).agg(pl.col("n").sum(), pl.col("peso").sum())
+
+
+class CuboContagens:
+    """
+    Cubo de contagens de uma carga:
+      - grupos: (programa_origem, pesquisador, linha_pesquisa, ano_publicacao, qualis_norm) -> n, peso
+      - pesquisadores: o mesmo sem linha_pesquisa, com cada publicação uma vez por pesquisador
+        (um pesquisador pode estar em vários grupos ou em nenhum)
+      - coautorias: as linhas (por grupo) das publicações com mais de um coautor no mesmo grupo,
+        usadas no modo "Publicações únicas"
+    """
+
+    def __init__(self, pesquisadores, grupos, coautorias):
+        self.pesquisadores = pesquisadores
+        self.grupos = grupos
+        self.coautorias = coautorias
+
+    @property
+    def registros(self):
+        """Número de publicações (linhas válidas) representadas no cubo."""
+        return int(self.pesquisadores["n"].sum() or 0)
+
+    def is_empty(self):
+        return self.pesquisadores.is_empty()
+
+    def estimated_size(self):
+        return self.pesquisadores.estimated_size() + self.grupos.estimated_size() + self.coautorias.estimated_size()
+
+    def com_limiar(self, limiar):
+        """
+        Cubo para outro limiar de similaridade de nomes: casamentos aproximados abaixo de `limiar`
+        são desfeitos (o pesquisador volta à grafia dos dados e sai dos grupos) e as dimensões de
+        casamento são somadas. Sem essas dimensões (ex: comparação de programas), o próprio cubo.
+        """
+        if "confianca" not in self.pesquisadores.columns:
+            return self
+        aceito = pl.col("confianca") >= limiar
+        pesquisadores = self.pesquisadores.with_columns(
+            pl.when(aceito.not_()).then(pl.col("pesquisador_dados")).otherwise(pl.col("pesquisador")).alias("pesquisador")
+        )
+        coautorias = self.coautorias.filter(aceito).drop(DIMENSOES_CASAMENTO)
+        return CuboContagens(reagregar(pesquisadores, DIMENSOES_PESQUISADOR),
+                             reagregar(self.grupos.filter(aceito), DIMENSOES_GRUPO), coautorias)
+
+    def filtrar(self, predicado):
+        """Cubo restrito às linhas que atendem a `predicado` (ex: filtro de pesquisador)."""
+        return CuboContagens(self.pesquisadores.filter(predicado), self.grupos.filter(predicado), self.coautorias.filter(predicado))
+
+    def grupos_unicos(self):
+        """
+        Células de grupos com cada publicação contada uma vez por linha de pesquisa: as repetições
+        (coautores do mesmo grupo, após a primeira ocorrência) são descontadas das células.
+        """
+        if self.coautorias.is_empty():
+            return self.grupos
+        repetidas = self.coautorias.filter(~pl.struct("linha_pesquisa", "id_publicacao").is_first_distinct())
+        dimensoes = [d for d in DIMENSOES_GRUPO + DIMENSOES_CASAMENTO if d in self.grupos.columns]
+        desconto = agregar(repetidas, dimensoes).rename({"n": "_n", "peso": "_peso"})
+        return (
+            self.grupos.join(desconto, on=dimensoes, how="left", nulls_equal=True, maintain_order="left")
+            .with_columns(pl.col("n") - pl.col("_n").fill_null(0), pl.col("peso") - pl.col("_peso").fill_null(0))
+            .drop(["_n", "_peso"])
+            .filter(pl.col("n") > 0)
+        )
+
+
+def construir_cubo(data, df_grupos):
+    """Cubo a partir das publicações (data) e das publicações x grupo (df_grupos) já casadas."""
+    pesquisadores = agregar(data, DIMENSOES_PESQUISADOR + DIMENSOES_CASAMENTO)
+    grupos = agregar(df_grupos, DIMENSOES_GRUPO + DIMENSOES_CASAMENTO)
+    dimensoes = [d for d in DIMENSOES_GRUPO + DIMENSOES_CASAMENTO if d in df_grupos.columns]
+    if "id_publicacao" in df_grupos.columns:
+        coautorias = df_grupos.filter(pl.len().over(["linha_pesquisa", "id_publicacao"]) > 1).select(
+            *dimensoes, "peso", "id_publicacao"
+        )
+    else:
+        coautorias = df_grupos.select(*dimensoes, "peso").clear().with_columns(pl.lit(None, dtype=pl.UInt64).alias("id_publicacao"))
+    return CuboContagens(pesquisadores, grupos, coautorias)
@@ -0,0 +1,242 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+import polars as pl
+from .cache import hash_conteudo, VERSAO_PROCESSAMENTO
+from .config import PESOS, COLUNAS_ANALISE, DADOS_COMPARTILHADOS_MAX_BYTES, LIMIAR_SIMILARIDADE_NOMES, LIMIAR_MINIMO_NOMES
+from .cubo import construir_cubo
+from .deduplicacao import identificar_publicacoes, COLUNAS_PUBLICACAO
+from .diagnostico import etapa
+from .exclusoes import MOTIVO_ERRO_LEITURA
+from .grupos import compilar_grupos, aplicar_grupos, casamentos_grupos
+from .processor import processar_fontes
+from .utils import normalizar_texto, normalizar_texto_expr
+
+# Plano de dados compartilhado: os dados processados de uma seleção (programas + grupos) existem
+# uma única vez no processo, como DataFrames Polars (memória Arrow) imutáveis. As sessões guardam
+# só uma referência a essa versão e uma visão dela: período, similaridade de nomes e filtro de
+# pesquisador são aplicados sobre o cubo de contagens, sem reprocessar as publicações.
+
+MB = 1024 * 1024
+
+
+def _tamanho(*tabelas):
+    return sum(t.estimated_size() for t in tabelas if t is not None)
+
+
+class VersaoDados:
+    """
+    Resultado de uma seleção: cubo de contagens (src/cubo.py), exclusões e casamentos de nomes.
+    As linhas de publicações não ficam na versão. Não deve ser modificada.
+    """
+
+    def __init__(self, chave, cubo, excluidos, comparacao_programas, erros, casamentos=None):
+        self.chave = chave
+        self.cubo = cubo
+        self.excluidos = excluidos
+        # Grafias dos dados casadas com a lista de grupos e a confiança de cada casamento (Auditoria)
+        self.casamentos = casamentos
+        self.comparacao_programas = comparacao_programas
+        self.erros = erros
+        self.tamanho = _tamanho(cubo, excluidos, casamentos)
+        # Sessões que usam esta versão (somem sozinhas quando a sessão é descartada)
+        self.sessoes = weakref.WeakSet()
+
+
+def chave_versao(fontes, grupos_pesquisa):
+    partes = [VERSAO_PROCESSAMENTO, repr(sorted(grupos_pesquisa.items()))]
+    partes += [f"{f['nome']}|{f['tipo']}|{hash_conteudo(f['path'])}|{hash_conteudo(f['qualis'])}" for f in fontes]
+    return hashlib.blake2b("\n".join(partes).encode(), digest_size=16).hexdigest()
+
+
+def construir_versao(chave, fontes, grupos_pesquisa):
+    """
+    Processa os programas (em paralelo, todos os anos), concatena, ordena por ano, identifica as
+    publicações em coautoria (id_publicacao), faz o matching de grupos/programas e materializa o
+    cubo de contagens. Os casamentos aproximados de nomes vão até LIMIAR_MINIMO_NOMES, com a
+    confiança de cada um no cubo: cada sessão aplica o seu limiar (CuboContagens.com_limiar).
+    """
+    dfs, tabelas_excluidos, erros = [], [], []
+    # Filtro de estratos (PESOS) e a projeção de colunas são empurrados para o scan do Parquet
+    with etapa("processar_fontes"):
+        resultados = processar_fontes(fontes, pesos=PESOS, colunas=COLUNAS_ANALISE)
+    for fonte, d, excl, erro in resultados:
+        if erro is not None:
+            erros.append((fonte["nome"], erro))
+        elif d is not None:
+            dfs.append(d.with_columns(pl.lit(fonte["nome"]).alias("programa_origem")))
+            tabelas_excluidos.append(excl.with_columns(pl.lit(fonte["nome"]).alias("programa")))
+
+    comparacao_programas = len(fontes) > 1
+    if not dfs:
+        return VersaoDados(chave, None, None, comparacao_programas, erros)
+
+    with etapa("concatenar_programas") as e:
+        # qualis_norm e peso já vêm do processamento (apenas estratos pontuáveis)
+        data = pl.concat(dfs, how="diagonal").sort("ano_publicacao")
+        excluidos = pl.concat(tabelas_excluidos)
+        e.linhas(saida=len(data))
+
+    with etapa("deduplicacao") as e:
+        # id_publicacao: mesma publicação em coautoria (CSV de cada autor) -> mesmo id; título,
+        # ISSN e DOI só servem para a chave e não ficam na versão compartilhada
+        data = identificar_publicacoes(data)
+        data = data.drop([c for c in COLUNAS_PUBLICACAO if c in data.columns])
+        e.linhas(entrada=len(data), saida=data["id_publicacao"].n_unique())
+
+    with etapa("matching_grupos") as e:
+        e.linhas(entrada=len(data))
+        casamentos = None
+        if comparacao_programas:
+            # Modo Comparação de Programas: O "Grupo" vira o "Programa"
+            df_grupos = data.with_columns([
+                pl.col("programa_origem").alias("linha_pesquisa"),
+                pl.col("pesquisador").str.to_titlecase()
+            ])
+            data = data.with_columns(pl.col("pesquisador").str.to_titlecase())
+        else:
+            # Modo Análise de Grupos (Interno): join vetorizado com a tabela de grupos compilada,
+            # com casamento aproximado dos nomes sem correspondência exata
+            tabela_grupos = compilar_grupos(grupos_pesquisa)
+            casamentos = casamentos_grupos(data, tabela_grupos, LIMIAR_MINIMO_NOMES)
+            data, df_grupos = aplicar_grupos(data, tabela_grupos, LIMIAR_MINIMO_NOMES, confianca=True)
+            e.info(aproximados=casamentos.filter(pl.col("confianca") < 1).height)
+        e.linhas(saida=len(df_grupos))
+
+    with etapa("cubo_contagens") as e:
+        cubo = construir_cubo(data, df_grupos)
+        e.linhas(entrada=len(data) + len(df_grupos), saida=len(cubo.pesquisadores) + len(cubo.grupos))
+
+    return VersaoDados(chave, cubo, excluidos, comparacao_programas, erros, casamentos)
+
+
+class DadosCompartilhados:
+    """
+    Registro das versões de dados do processo. Cada versão é construída uma única vez, mesmo com
+    sessões pedindo-a ao mesmo tempo; versões sem sessões saem em ordem LRU acima do orçamento.
+    """
+
+    def __init__(self, max_bytes=DADOS_COMPARTILHADOS_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._versoes = OrderedDict()
+        self._construindo = {}
+        self._lock = threading.Lock()
+
+    def obter(self, fontes, grupos_pesquisa=None):
+        grupos_pesquisa = grupos_pesquisa or {}
+        chave = chave_versao(fontes, grupos_pesquisa)
+        with self._lock:
+            if chave in self._versoes:
+                self._versoes.move_to_end(chave)
+                return self._versoes[chave]
+            trava = self._construindo.setdefault(chave, threading.Lock())
+
+        with trava:
+            with self._lock:
+                if chave in self._versoes:
+                    return self._versoes[chave]
+            try:
+                versao = construir_versao(chave, fontes, grupos_pesquisa)
+                with self._lock:
+                    # Com erro em algum programa a versão não é compartilhada (o erro pode ser transitório)
+                    if not versao.erros:
+                        self._versoes[chave] = versao
+                        self._liberar()
+            finally:
+                # Também numa exceção: a trava não fica presa no registro e o próximo pedido reconstrói
+                with self._lock:
+                    self._construindo.pop(chave, None)
+        return versao
+
+    def _liberar(self):
+        total = sum(v.tamanho for v in self._versoes.values())
+        for chave in list(self._versoes):
+            if total <= self.max_bytes:
+                break
+            versao = self._versoes[chave]
+            if len(versao.sessoes) == 0:
+                total -= versao.tamanho
+                del self._versoes[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            versoes = list(self._versoes.values())
+        return {
+            "versoes": len(versoes),
+            "sessoes": sum(len(v.sessoes) for v in versoes),
+            "bytes_compartilhados": sum(v.tamanho for v in versoes),
+        }
+
+
+class VisaoSessao:
+    """
+    Dados vistos por uma sessão sobre a versão compartilhada: limiar de similaridade de nomes,
+    período (anos, inclusivo; None = todos) e filtro por pesquisador, aplicados ao cubo.
+    """
+
+    def __init__(self, versao, pesquisador=None, anos=None, limiar_nomes=LIMIAR_SIMILARIDADE_NOMES):
+        self.versao = versao
+        self.pesquisador = pesquisador
+        self.anos = anos and tuple(anos)
+        self.limiar_nomes = limiar_nomes
+        self.cubo, self.excluidos = versao.cubo, versao.excluidos
+        self.casamentos = versao.casamentos
+        self.bytes_proprios = 0
+        if versao.cubo is None:
+            return
+        filtros = []
+        self.cubo = versao.cubo
+        if self.anos is not None:
+            filtros.append(pl.col("ano_publicacao").is_between(*self.anos))
+            self.cubo = self.cubo.filtrar(filtros[0])
+        if self.casamentos is not None:
+            # Só as grafias com publicações no período
+            presentes = self.cubo.pesquisadores.select(normalizar_texto_expr("pesquisador_dados").unique())
+            self.casamentos = self.casamentos.filter(
+                (pl.col("confianca") >= limiar_nomes) & normalizar_texto_expr("pesquisador").is_in(presentes.to_series().implode())
+            )
+        self.cubo = self.cubo.com_limiar(limiar_nomes)
+        if pesquisador:
+            termo = normalizar_texto(pesquisador)
+            filtros.append(normalizar_texto_expr("pesquisador").str.contains(termo, literal=True))
+        if pesquisador:
+            self.cubo = self.cubo.filtrar(filtros[-1])
+        if filtros:
+            # Erros de leitura e avisos sem pesquisador/ano continuam no relatório, como no processamento filtrado
+            self.excluidos = versao.excluidos.filter(
+                pl.all_horizontal([f.fill_null(True) for f in filtros]) | pl.col("motivo").str.starts_with(MOTIVO_ERRO_LEITURA)
+            )
+        proprias = [t for t, compartilhada in ((self.cubo, versao.cubo), (self.excluidos, versao.excluidos)) if t is not compartilhada]
+        self.bytes_proprios = _tamanho(*proprias)
+
+    def memoria(self):
+        """Memória desta sessão: dados próprios (visão filtrada) e a parte da versão compartilhada."""
+        sessoes = max(1, len(self.versao.sessoes))
+        return {
+            "proprios_mb": round(self.bytes_proprios / MB, 3),
+            "compartilhados_mb": round(self.versao.tamanho / MB, 3),
+            "sessoes_na_versao": sessoes,
+            "por_sessao_mb": round((self.bytes_proprios + self.versao.tamanho / sessoes) / MB, 3),
+        }
+
+
+class SessaoDados:
+    """Marcador guardado no estado da sessão: registra qual versão compartilhada ela está usando."""
+
+    def __init__(self):
+        self.visao = None
+
+    def usar(self, versao, pesquisador=None, anos=None, limiar_nomes=LIMIAR_SIMILARIDADE_NOMES):
+        if self.visao is not None and self.visao.versao is not versao:
+            self.visao.versao.sessoes.discard(self)
+        versao.sessoes.add(self)
+        parametros = (pesquisador, anos and tuple(anos), limiar_nomes)
+        if self.visao is None or self.visao.versao is not versao or \
+                (self.visao.pesquisador, self.visao.anos, self.visao.limiar_nomes) != parametros:
+            self.visao = VisaoSessao(versao, pesquisador, anos, limiar_nomes)
+        return self.visao
+
+
+# Instância compartilhada por todas as sessões do servidor
+dados_compartilhados = DadosCompartilhados()
@@ -0,0 +1,161 @@
+import random
+import polars as pl
+from .config import LIMIAR_SIMILARIDADE_TITULOS
+from .utils import normalizar_texto_expr
+
+# Deduplicação de publicações em coautoria: o mesmo artigo aparece no CSV de cada coautor.
+# Chave exata: DOI, se houver; senão título normalizado + issn_limpo + ano. Títulos quase iguais
+# (erros de digitação, encoding) são agrupados com MinHash-LSH sobre 3-gramas de caracteres,
+# com baldes por ISSN e ano: só pares que caem no mesmo balde são comparados.
+
+COLUNAS_PUBLICACAO = ["titulo", "issn_limpo", "doi"]
+TAMANHO_SHINGLE = 3
+NUM_PERMUTACOES = 64
+LINHAS_POR_BANDA = 4
+# Máscaras XOR sobre o hash de cada 3-grama: uma "permutação" do MinHash por máscara (determinísticas)
+_MASCARAS = [random.Random(i).getrandbits(64) for i in range(NUM_PERMUTACOES)]
+
+
+def titulo_normalizado_expr(coluna):
+    """Título sem acentos, em minúsculas, só letras/dígitos e espaços simples."""
+    return normalizar_texto_expr(coluna).str.replace_all(r"[^a-z0-9]+", " ").str.strip_chars()
+
+
+def _texto(df, coluna, expr):
+    return expr if coluna in df.columns else pl.lit("")
+
+
+def _chave_doi_expr(df):
+    doi = _texto(df, "doi", normalizar_texto_expr("doi").str.replace(r"^(https?://)?(dx\.)?doi\.org/", "").str.strip_chars())
+    return pl.when(doi.fill_null("") != "").then(pl.format("doi:{}", doi))
+
+
+def _chave_titulo_expr(df):
+    titulo = _texto(df, "titulo", titulo_normalizado_expr("titulo"))
+    issn = _texto(df, "issn_limpo", pl.col("issn_limpo").cast(pl.Utf8))
+    return pl.when(titulo.fill_null("") != "").then(pl.format("{}|{}|{}", titulo, issn.fill_null(""), pl.col("ano_publicacao")))
+
+
+def chave_publicacao_expr(df):
+    """Chave exata de cada linha: 'doi:<doi>' ou 'titulo|issn|ano'; linhas sem DOI nem título ficam únicas."""
+    return pl.coalesce(_chave_doi_expr(df), _chave_titulo_expr(df), pl.format("linha:{}", pl.int_range(pl.len())))
+
+
+def assinaturas_minhash(titulos):
+    """
+    Assinatura MinHash (m0..m63) de cada título a partir dos seus 3-gramas.
+    titulos: DataFrame com 'chave' e 'titulo' (normalizado). Retorna chave + colunas m*.
+    """
+    return (
+        titulos.with_columns(
+            pl.int_ranges(0, pl.max_horizontal(pl.col("titulo").str.len_chars().cast(pl.Int64) - TAMANHO_SHINGLE + 1, 1)).alias("_pos")
+        )
+        .explode("_pos")
+        .select("chave", pl.col("titulo").str.slice(pl.col("_pos"), TAMANHO_SHINGLE).hash().alias("_h"))
+        .group_by("chave", maintain_order=True)
+        .agg([(pl.col("_h") ^ mascara).min().alias(f"m{i}") for i, mascara in enumerate(_MASCARAS)])
+    )
+
+
+def pares_candidatos(assinaturas, blocos):
+    """
+    Pares (chave, chave_b) que coincidem em alguma banda do LSH dentro do mesmo bloco (ISSN + ano).
+    Cada balde liga seus membros ao primeiro deles, sem gerar todos os pares.
+    """
+    bandas = []
+    for inicio in range(0, NUM_PERMUTACOES, LINHAS_POR_BANDA):
+        colunas = [f"m{i}" for i in range(inicio, inicio + LINHAS_POR_BANDA)]
+        bandas.append(assinaturas.join(blocos, on="chave").select(
+            "chave", pl.struct(["bloco", *colunas]).hash(seed=inicio).alias("balde")
+        ))
+    return (
+        pl.concat(bandas)
+        .group_by("balde", maintain_order=True)
+        .agg(pl.col("chave").unique(maintain_order=True))
+        .filter(pl.col("chave").list.len() > 1)
+        .select(pl.col("chave").list.first().alias("chave_b"), pl.col("chave").list.slice(1).alias("chave"))
+        .explode("chave")
+        .unique(maintain_order=True)
+    )
+
+
+def similaridade_estimada(pares, assinaturas):
+    """Fração de componentes iguais das assinaturas (estimativa da similaridade de Jaccard dos 3-gramas)."""
+    b = assinaturas.rename({c: f"{c}_b" for c in assinaturas.columns})
+    juntos = pares.join(assinaturas, on="chave").join(b, on="chave_b")
+    iguais = pl.sum_horizontal([(pl.col(f"m{i}") == pl.col(f"m{i}_b")).cast(pl.UInt8) for i in range(NUM_PERMUTACOES)])
+    return juntos.select("chave", "chave_b", (iguais / NUM_PERMUTACOES).alias("similaridade"))
+
+
+def _representantes(arestas, dois=None):
+    """
+    Union-find: cada chave -> a menor chave do seu componente. Com `dois` ({chave: doi}), dois
+    componentes com DOIs diferentes nunca se unem (ex: editoriais de mesmo título no mesmo número).
+    """
+    pai = {}
+    doi = dict(dois or {})
+
+    def raiz(x):
+        while pai.setdefault(x, x) != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+
+    for a, b in arestas:
+        ra, rb = raiz(a), raiz(b)
+        if ra == rb or (doi.get(ra) and doi.get(rb) and doi[ra] != doi[rb]):
+            continue
+        menor, maior = min(ra, rb), max(ra, rb)
+        pai[maior] = menor
+        doi[menor] = doi.get(menor) or doi.get(maior)
+    return {x: raiz(x) for x in pai}
+
+
+def identificar_publicacoes(df, limiar=LIMIAR_SIMILARIDADE_TITULOS):
+    """
+    Adiciona 'id_publicacao' (UInt64): linhas da mesma publicação recebem o mesmo id. Une mesmo DOI,
+    mesma chave de título (título normalizado + ISSN + ano) e títulos com similaridade >= limiar no
+    mesmo ISSN e ano; uma linha com DOI e título liga as duas chaves, então o coautor que informou o
+    DOI e o que não informou caem na mesma publicação.
+
+    >>> df = pl.DataFrame({"titulo": ["Deep Learning for Crops", "Deep learning for crops"],
+    ...                    "issn_limpo": ["12345678", "12345678"], "ano_publicacao": [2020, 2020],
+    ...                    "doi": ["10.1000/xyz", None]})
+    >>> identificar_publicacoes(df)["id_publicacao"].n_unique()
+    1
+    """
+    chaves = df.select(
+        chave_publicacao_expr(df).alias("chave"),
+        _chave_doi_expr(df).alias("chave_doi"),
+        _chave_titulo_expr(df).alias("chave_titulo"),
+        _texto(df, "titulo", titulo_normalizado_expr("titulo")).fill_null("").alias("titulo"),
+        pl.format("{}|{}", _texto(df, "issn_limpo", pl.col("issn_limpo").cast(pl.Utf8)).fill_null(""),
+                  pl.col("ano_publicacao")).alias("bloco"),
+    )
+    # Linhas com DOI e título: aresta entre as duas chaves
+    ligacoes = chaves.filter(pl.col("chave_doi").is_not_null() & pl.col("chave_titulo").is_not_null()).select(
+        "chave_doi", "chave_titulo"
+    ).unique(maintain_order=True)
+    arestas = list(ligacoes.iter_rows())
+
+    distintas = chaves.filter(pl.col("chave_titulo").is_not_null()).unique(subset="chave_titulo", maintain_order=True).select(
+        pl.col("chave_titulo").alias("chave"), "titulo", "bloco"
+    )
+    if len(distintas) > 1:
+        assinaturas = assinaturas_minhash(distintas.select("chave", "titulo"))
+        pares = pares_candidatos(assinaturas, distintas.select("chave", "bloco"))
+        similares = similaridade_estimada(pares, assinaturas).filter(pl.col("similaridade") >= limiar)
+        arestas += list(similares.select("chave", "chave_b").iter_rows())
+
+    representante = pl.DataFrame(schema={"chave": pl.Utf8, "representante": pl.Utf8})
+    mapa = _representantes(arestas, {d: d for d in ligacoes["chave_doi"]})
+    if mapa:
+        representante = pl.DataFrame({"chave": list(mapa), "representante": list(mapa.values())},
+                                     schema=representante.schema)
+
+    ids = (
+        chaves.select("chave")
+        .join(representante, on="chave", how="left", maintain_order="left")
+        .select(pl.coalesce("representante", "chave").hash().alias("id_publicacao"))
+    )
+    return df.with_columns(ids["id_publicacao"])
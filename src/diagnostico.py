@@ -0,0 +1,154 @@
+import contextvars
+import json
+import logging
+import resource
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Execução instrumentada corrente (None = diagnóstico desligado: etapa() não mede nada)
+_execucao = contextvars.ContextVar("execucao_diagnostico", default=None)
+# Fonte (programa) em processamento: herdada pelas etapas internas
+_fonte = contextvars.ContextVar("fonte_diagnostico", default=None)
+
+logger = logging.getLogger("dashboard_ciencia.diagnostico")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _rss_max_mb():
+    # ru_maxrss: KB no Linux, bytes no macOS (pico de memória do processo até o momento)
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == "darwin" else maximo / 1024
+
+
+class _EtapaNula:
+    """Etapa usada com o diagnóstico desligado: não mede nem guarda nada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def linhas(self, entrada=None, saida=None):
+        pass
+
+    def info(self, **dados):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+class Etapa:
+    """Mede tempo de parede e crescimento do pico de memória (RSS) de um trecho."""
+
+    def __init__(self, execucao, nome, fonte=None):
+        self.execucao = execucao
+        self.fonte = fonte
+        self.registro = {"etapa": nome}
+        if fonte is not None:
+            self.registro["fonte"] = fonte
+
+    def __enter__(self):
+        self._token = _fonte.set(self.fonte) if self.fonte is not None else None
+        self._rss = _rss_max_mb()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *exc):
+        self.registro["tempo_s"] = round(time.perf_counter() - self._inicio, 6)
+        rss = _rss_max_mb()
+        self.registro["rss_max_mb"] = round(rss, 1)
+        self.registro["delta_rss_max_mb"] = round(rss - self._rss, 1)
+        if tipo is not None:
+            self.registro["erro"] = tipo.__name__
+        if self._token is not None:
+            _fonte.reset(self._token)
+        self.execucao.adicionar(self.registro)
+        return False
+
+    def linhas(self, entrada=None, saida=None):
+        if entrada is not None:
+            self.registro["linhas_entrada"] = entrada
+        if saida is not None:
+            self.registro["linhas_saida"] = saida
+
+    def info(self, **dados):
+        self.registro.update(dados)
+
+
+class Execucao:
+    """Etapas medidas durante uma execução do app (compartilhada entre as threads de processamento)."""
+
+    def __init__(self, **contexto):
+        self.id = uuid.uuid4().hex[:12]
+        self.inicio = datetime.now()
+        self._t0 = time.perf_counter()
+        self.contexto = contexto
+        self.etapas = []
+        self._lock = threading.Lock()
+
+    def adicionar(self, registro):
+        with self._lock:
+            self.etapas.append(registro)
+
+    def resumo(self):
+        with self._lock:
+            etapas = list(self.etapas)
+        return {
+            "evento": "execucao_dashboard",
+            "id": self.id,
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "duracao_s": round(time.perf_counter() - self._t0, 6),
+            "rss_max_mb": round(_rss_max_mb(), 1),
+            **self.contexto,
+            "etapas": etapas,
+        }
+
+
+def etapa(nome, fonte=None):
+    """
+    Context manager de uma etapa instrumentada. Sem execução ativa (diagnóstico desligado)
+    retorna um objeto nulo compartilhado: custo de uma leitura de ContextVar.
+    """
+    execucao = _execucao.get()
+    if execucao is None:
+        return _ETAPA_NULA
+    return Etapa(execucao, nome, fonte if fonte is not None else _fonte.get())
+
+
+def iniciar_execucao(**contexto):
+    """Ativa o diagnóstico para a execução corrente (substitui uma execução anterior não finalizada)."""
+    execucao = Execucao(**contexto)
+    _execucao.set(execucao)
+    return execucao
+
+
+def finalizar_execucao():
+    """Desativa o diagnóstico e emite uma linha JSON com o resumo da execução. Retorna o resumo."""
+    execucao = _execucao.get()
+    if execucao is None:
+        return None
+    _execucao.set(None)
+    resumo = execucao.resumo()
+    logger.info(json.dumps(resumo, ensure_ascii=False, default=str))
+    return resumo
+
+
+def propagar_contexto(funcao):
+    """
+    Envolve `funcao` para rodar no contexto de quem chamou (as threads de um executor não herdam
+    ContextVars); assim as etapas medidas nas threads entram na mesma execução.
+    """
+    if _execucao.get() is None:
+        return funcao
+    contexto = contextvars.copy_context()
+    return lambda *args, **kwargs: contexto.copy().run(funcao, *args, **kwargs)
@@ -0,0 +1,117 @@
+from io import BytesIO
+import polars as pl
+
+# Tabela de exclusões: uma linha por publicação descartada no cruzamento com o Qualis
+SCHEMA_EXCLUSOES = {
+    "programa": pl.Utf8,
+    "pesquisador": pl.Utf8,
+    "ano_publicacao": pl.Int64,
+    "issn": pl.Utf8,
+    "titulo": pl.Utf8,
+    "qualis_original": pl.Utf8,
+    "motivo": pl.Utf8,
+}
+
+MOTIVO_SEM_ISSN = "ISSN ausente"
+MOTIVO_FORA_QUALIS = "ISSN fora da lista Qualis"
+MOTIVO_NAO_PONTUAVEL = "Estrato não pontuável"
+MOTIVO_ERRO_LEITURA = "Erro de leitura"
+MOTIVO_SEM_COLUNA_ISSN = "Coluna ISSN não encontrada nos dados brutos"
+
+FORMATOS = {
+    "csv": ("text/csv", "relatorio_filtragem.csv"),
+    "parquet": ("application/octet-stream", "relatorio_filtragem.parquet"),
+    "txt": ("text/plain", "relatorio_filtragem.txt"),
+}
+
+
+def tabela_exclusoes(linhas=None):
+    """Tabela de exclusões (vazia ou a partir de dicionários) com o esquema padrão."""
+    return pl.DataFrame(linhas or [], schema=SCHEMA_EXCLUSOES)
+
+
+def selecionar_exclusoes(lf, origens, motivo):
+    """
+    Projeta um LazyFrame de publicações descartadas no esquema de exclusões (sem o programa,
+    preenchido por quem agrega as fontes). origens mapeia pesquisador/ano_publicacao/titulo/
+    qualis_original para a coluna de origem (nome ou expressão; None, se ausente); motivo é uma
+    expressão ou texto.
+    """
+    def coluna(alias):
+        origem = origens.get(alias)
+        if origem is None:
+            origem = pl.lit(None)
+        elif not isinstance(origem, pl.Expr):
+            origem = pl.col(origem)
+        return origem.cast(SCHEMA_EXCLUSOES[alias]).alias(alias)
+
+    return lf.select(
+        pl.lit(None, dtype=pl.Utf8).alias("programa"),
+        coluna("pesquisador"),
+        coluna("ano_publicacao"),
+        pl.when(pl.col("issn_temp") != "").then(pl.col("issn_temp")).alias("issn"),
+        coluna("titulo"),
+        coluna("qualis_original"),
+        (motivo if isinstance(motivo, pl.Expr) else pl.lit(motivo)).cast(pl.Utf8).alias("motivo"),
+    )
+
+
+def filtrar_exclusoes(excluidos, programas=None, motivos=None, termo=None):
+    """Filtra a tabela por programa, motivo e termo (contido no pesquisador, título ou ISSN)."""
+    filtros = []
+    if programas:
+        filtros.append(pl.col("programa").is_in(programas))
+    if motivos:
+        filtros.append(pl.col("motivo").is_in(motivos))
+    if termo:
+        t = termo.strip().lower()
+        filtros.append(pl.any_horizontal(
+            pl.col(c).fill_null("").str.to_lowercase().str.contains(t, literal=True)
+            for c in ("pesquisador", "titulo", "issn")
+        ))
+    return excluidos.filter(*filtros) if filtros else excluidos
+
+
+def resumo_exclusoes(excluidos):
+    """Quantidade de exclusões por programa e motivo."""
+    return excluidos.group_by(["programa", "motivo"]).len("quantidade").sort(["programa", "quantidade"], descending=[False, True])
+
+
+def exclusoes_para_texto(excluidos):
+    """
+    Relatório em texto no formato do log original (bloco por programa e por pesquisador),
+    montado com expressões vetorizadas em vez de escrever linha a linha.
+    """
+    linhas = excluidos.with_columns(
+        pl.format(
+            "  [X] REMOVIDO: ISSN {} (Qualis Orig: {}) - {} [{}]",
+            pl.col("issn").fill_null("S/N"),
+            pl.col("qualis_original").fill_null("N/A"),
+            pl.col("titulo").fill_null("Título não identificado"),
+            pl.col("motivo"),
+        ).alias("linha"),
+        # Cabeçalho na primeira publicação de cada pesquisador (dentro do programa)
+        (pl.col("pesquisador") != pl.col("pesquisador").shift(1).over("programa")).fill_null(True).alias("novo_pesquisador"),
+    )
+    partes = ["RELATÓRIO DE PUBLICAÇÕES EXCLUÍDAS (FILTRO QUALIS)\n", "===================================================\n\n"]
+    for (programa,), bloco in linhas.partition_by("programa", as_dict=True, maintain_order=True).items():
+        texto = bloco.select(
+            pl.when(pl.col("novo_pesquisador"))
+            .then(pl.format("PESQUISADOR: {}\n{}", pl.col("pesquisador").fill_null(""), pl.col("linha")))
+            .otherwise(pl.col("linha"))
+        ).to_series().str.join("\n").item()
+        partes.append(f"=== LOG: {programa} ===\n{texto}\n" + "-" * 50 + "\n\n")
+    return "".join(partes)
+
+
+def exportar_exclusoes(excluidos, formato):
+    """Conteúdo do arquivo de download (gerado só quando o usuário pede)."""
+    if formato == "csv":
+        return excluidos.write_csv().encode("utf-8")
+    if formato == "parquet":
+        buffer = BytesIO()
+        excluidos.write_parquet(buffer)
+        return buffer.getvalue()
+    if formato == "txt":
+        return exclusoes_para_texto(excluidos).encode("utf-8")
+    raise ValueError(f"Formato de exportação não suportado: {formato}")
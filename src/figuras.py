@@ -0,0 +1,140 @@
+import polars as pl
+import plotly.graph_objects as go
+from .config import PESOS, ALTURA_MAXIMA_HEATMAP
+from .ranking import rankings_participacao, rankings_media
+from .render import classe_scatter, top_k_com_outros, top_k_nomes
+from .analytics import ESTRATOS, ANO, matriz_calor, por_entidade
+from .clustering import agrupar
+
+# Construtores puros das figuras: recebem apenas agregados (src/analytics.py) e parâmetros
+# de visualização, sem acessar o Streamlit. Assim podem ser memorizados por cache_figuras.
+
+MARCADOR = dict(line=dict(width=1, color='DarkSlateGrey'))
+
+
+def _template_hover(titulo, i):
+    return f"<b>Ano %{{x}}</b><br><br><b>{titulo}</b><br>%{{customdata[{i}]}}<extra></extra>"
+
+
+def _menu_visibilidade(n, rotulos, titulos):
+    """Menu que alterna entre as séries anuais e as acumuladas; no trace de hover, troca só o hovertemplate."""
+    return [dict(buttons=[
+        dict(label=rotulos[0], method="update", args=[{"visible": [True]*n + [False]*n + [True], "hovertemplate": [None]*2*n + [_template_hover(titulos[0], 0)]}]),
+        dict(label=rotulos[1], method="update", args=[{"visible": [False]*n + [True]*n + [True], "hovertemplate": [None]*2*n + [_template_hover(titulos[1], 1)]}]),
+    ], direction="down", x=0.01, y=1.12)]
+
+
+def _trace_hover(fig, Scatter, anos, anual, acumulado, titulos):
+    """
+    Trace invisível que carrega o ranking do ano no hover unificado. Os rankings anual e acumulado
+    de cada ano ficam num único customdata ([anual, acumulado]), compartilhado pelos dois modos.
+    """
+    fig.add_trace(Scatter(x=anos, y=[0]*len(anos), mode="markers", marker=dict(opacity=0), customdata=[[anual.get(a, ""), acumulado.get(a, "")] for a in anos], hovertemplate=_template_hover(titulos[0], 0), showlegend=False))
+
+
+def figura_linha_tempo(total, entidade, titulo, rotulo_ranking="", grande=False, top_k_hover=None, top_k_series=None):
+    """Linha do tempo (anual/acumulado) com o ranking de participação de cada ano no hover."""
+    Scatter = classe_scatter(grande)
+    ranking_anual, ranking_acumulado = rankings_participacao(total, entidade, top_k=top_k_hover)
+    total_plot = top_k_com_outros(total, entidade, top_k_series) if top_k_series else total
+    series = por_entidade(total_plot, entidade)
+
+    fig = go.Figure()
+    for nome, d in series.items():
+        fig.add_trace(Scatter(x=d[ANO].to_numpy(), y=d["peso"].to_numpy(), mode="lines+markers", name=nome, hoverinfo="skip", visible=True))
+    for nome, d in series.items():
+        fig.add_trace(Scatter(x=d[ANO].to_numpy(), y=d["acumulado"].to_numpy(), mode="lines", name=f"{nome} (Acumulado)", hoverinfo="skip", visible=False))
+
+    anos = total[ANO].unique().sort().to_list()
+    titulos = (f"Ranking Anual{rotulo_ranking}", f"Ranking Acumulado{rotulo_ranking}")
+    _trace_hover(fig, Scatter, anos, ranking_anual, ranking_acumulado, titulos)
+    fig.update_layout(title=titulo, height=800, hovermode="x unified", updatemenus=_menu_visibilidade(len(series), ("Total Anual", "Acumulado"), titulos))
+    return fig
+
+
+def figura_radar(contagem, total, entidade, titulo, top_k=None):
+    """Perfil Qualis (contagem por estrato) de cada entidade; com top_k, só as de maior pontuação em total."""
+    if top_k is not None:
+        contagem = contagem.filter(pl.col(entidade).is_in(top_k_nomes(total, entidade, top_k).implode()))
+    fig = go.Figure()
+    for row in contagem.iter_rows(named=True):
+        vals = [row[e] for e in ESTRATOS]
+        fig.add_trace(go.Scatterpolar(r=vals+[vals[0]], theta=ESTRATOS+[ESTRATOS[0]], name=row[entidade], fill='toself', opacity=0.35))
+    fig.update_layout(title=titulo, polar=dict(radialaxis=dict(visible=True)))
+    return fig
+
+
+def figura_ternario(proporcoes, entidade, grande=False):
+    """Distribuição proporcional A/B/C; no modo grande, um único trace com o nome no hover."""
+    fig = go.Figure()
+    if grande:
+        t = proporcoes.filter(pl.col("sum") > 0)
+        fig.add_trace(go.Scatterternary(a=(t["A"]/t["sum"]).to_numpy(), b=(t["B"]/t["sum"]).to_numpy(), c=(t["C"]/t["sum"]).to_numpy(), text=t[entidade].to_list(), mode="markers", showlegend=False, marker=dict(size=8, **MARCADOR), hovertemplate="<b>%{text}</b><br>A: %{a:.1%}<br>B: %{b:.1%}<br>C: %{c:.1%}<extra></extra>"))
+    else:
+        for r in proporcoes.iter_rows(named=True):
+            p = r[entidade]
+            if r["sum"] == 0: continue
+            fig.add_trace(go.Scatterternary(a=[r["A"]/r["sum"]], b=[r["B"]/r["sum"]], c=[r["C"]/r["sum"]], mode="markers", name=p, marker=dict(size=14, **MARCADOR), hovertemplate=f"<b>{p}</b><br>A: %{{a:.1%}}<br>B: %{{b:.1%}}<br>C: %{{c:.1%}}<extra></extra>"))
+    fig.update_layout(title="Distribuição Proporcional", ternary=dict(aaxis=dict(title="A"), baxis=dict(title="B"), caxis=dict(title="C")))
+    return fig
+
+
+def figura_calor(total, entidade):
+    """Mapa de calor entidade x ano, com altura proporcional ao número de linhas (limitada)."""
+    nomes, anos, valores = matriz_calor(total, entidade)
+    fig = go.Figure(data=go.Heatmap(z=valores, x=anos, y=nomes, colorscale="Viridis", colorbar=dict(title="Pontos")))
+    fig.update_layout(title="Mapa de Calor (Intensidade)", height=min(max(400, len(nomes)*30), ALTURA_MAXIMA_HEATMAP))
+    return fig
+
+
+def figura_cluster(contagem, entidade, titulo, grande=False, altura=None, contexto=None, subconjunto=False, referencia=None):
+    """
+    Cluster de similaridade (KMeans sobre as contagens por estrato, projetado em 2D com PCA).
+    O modelo vem de src/clustering.py: k pela silhueta e reaproveitado para subconjuntos filtrados.
+    referencia: clustering.referencia(contexto) num subconjunto; não é usada aqui, mas entra na
+    chave do cache_figuras (a figura de um subconjunto muda quando o modelo de referência aparece).
+    """
+    Scatter = classe_scatter(grande)
+    clusters, coords, modelo = agrupar(contagem.select(PESOS.keys()).to_numpy(), contexto=contexto, subconjunto=subconjunto)
+    nomes = contagem[entidade].to_numpy()
+
+    fig = go.Figure()
+    for c in sorted(set(clusters)):
+        m = clusters == c
+        # No modo grande os rótulos ficam só no hover (texto sobre centenas de pontos não é legível)
+        fig.add_trace(Scatter(x=coords[m, 0], y=coords[m, 1], mode="markers" if grande else "markers+text", text=nomes[m].tolist(), name=f"Grupo {int(c)+1}", marker=dict(size=12, **MARCADOR), hovertemplate="<b>%{text}</b><br>Grupo: %{name}<extra></extra>"))
+    detalhe = f"k={modelo.k}" + (f", silhueta {modelo.silhueta:.2f}" if modelo.silhueta is not None else "")
+    fig.update_layout(title=f"{titulo}<br><sup>{detalhe}</sup>")
+    if altura:
+        fig.update_layout(height=altura)
+    return fig
+
+
+def figura_eficiencia(total_g, entidade):
+    """Pontos por membro (anual/acumulado) com o ranking de eficiência no hover."""
+    ranking_anual, ranking_acumulado = rankings_media(total_g, entidade, valor="peso_medio")
+    series = por_entidade(total_g, entidade)
+
+    fig = go.Figure()
+    for g, d in series.items():
+        fig.add_trace(go.Scatter(x=d[ANO].to_numpy(), y=d["peso_medio"].to_numpy(), mode="lines+markers", name=f"{g} (n={d['n_membros'][0]})", hoverinfo="skip", visible=True))
+    for g, d in series.items():
+        fig.add_trace(go.Scatter(x=d[ANO].to_numpy(), y=d["acumulado_medio"].to_numpy(), mode="lines", name=f"{g} (Acumulado)", hoverinfo="skip", visible=False))
+
+    anos = total_g[ANO].unique().sort().to_list()
+    titulos = ("Ranking Eficiência", "Ranking Eficiência Acum.")
+    _trace_hover(fig, go.Scatter, anos, ranking_anual, ranking_acumulado, titulos)
+    fig.update_layout(title="Eficiência (Pontos por Membro)", height=600, hovermode="x unified", yaxis_title="Pontos/Membro", updatemenus=_menu_visibilidade(len(series), ("Média Anual", "Média Acumulada"), titulos))
+    return fig
+
+
+def figura_bolhas(total_g, entidade):
+    """Volume total por ano com o tamanho da bolha proporcional ao número de membros."""
+    fig = go.Figure()
+    for g, d in por_entidade(total_g, entidade).items():
+        n_membros = d["n_membros"][0]
+        fig.add_trace(go.Scatter(x=d[ANO].to_numpy(), y=d["peso"].to_numpy(), mode="lines+markers", name=f"{g} (n={n_membros})",
+                                 marker=dict(size=n_membros * 3, **MARCADOR),
+                                 hovertemplate=f"<b>{g}</b><br>Ano: %{{x}}<br>Pontos: %{{y}}<br>Membros: {n_membros}<extra></extra>"))
+    fig.update_layout(title="Volume Total (Tamanho da bolha = Tamanho do Grupo)", height=600, yaxis_title="Pontuação Total")
+    return fig
@@ -0,0 +1,109 @@
+import polars as pl
+from functools import lru_cache
+from .config import LIMIAR_SIMILARIDADE_NOMES
+from .nomes import indice_nomes
+from .utils import normalizar_texto_expr
+
+SCHEMA_GRUPOS = {"nome_norm": pl.Utf8, "pesquisador_canonico": pl.Utf8, "linha_pesquisa": pl.Utf8}
+
+
+def compilar_grupos(grupos_pesquisa):
+    """
+    Compila o dicionário {grupo: [membros]} em uma tabela Polars normalizada
+    (nome_norm, pesquisador_canonico, linha_pesquisa), pronta para join.
+    """
+    return _compilar_grupos_cache(_chave_grupos(grupos_pesquisa))
+
+
+def _chave_grupos(grupos_pesquisa):
+    # Representação imutável (hashable) do dicionário, preservando a ordem
+    return tuple((g, tuple(membros)) for g, membros in grupos_pesquisa.items())
+
+
+@lru_cache(maxsize=16)
+def _compilar_grupos_cache(itens):
+    registros = [(membro, grupo) for grupo, membros in itens for membro in membros]
+    if not registros:
+        return pl.DataFrame(schema=SCHEMA_GRUPOS)
+
+    return pl.DataFrame(
+        {
+            "pesquisador_canonico": [m for m, _ in registros],
+            "linha_pesquisa": [g for _, g in registros],
+        },
+        schema={"pesquisador_canonico": pl.Utf8, "linha_pesquisa": pl.Utf8},
+    ).select(
+        normalizar_texto_expr("pesquisador_canonico").alias("nome_norm"),
+        "pesquisador_canonico",
+        "linha_pesquisa",
+    )
+
+
+def _correcao(tabela_grupos):
+    # Correção de nomes: em caso de grafias diferentes para o mesmo nome, prevalece a última
+    return tabela_grupos.unique(subset="nome_norm", keep="last", maintain_order=True).select(
+        "nome_norm", "pesquisador_canonico"
+    )
+
+
+def _casar_nomes(nomes_norm, tabela_grupos, limiar):
+    # Índice (e tabela de casamentos) reaproveitado por lista de grupos
+    indice = indice_nomes(tuple(tabela_grupos["nome_norm"].unique(maintain_order=True).to_list()))
+    return indice.casar(nomes_norm, limiar)
+
+
+def casamentos_grupos(data, tabela_grupos, limiar=LIMIAR_SIMILARIDADE_NOMES):
+    """
+    Grafias dos dados que casam com a lista de grupos: (pesquisador, pesquisador_canonico, confianca),
+    com confiança 1.0 para nomes iguais após a normalização e a similaridade nos casamentos aproximados.
+    """
+    nomes = data.select("pesquisador", normalizar_texto_expr("pesquisador").alias("nome_norm_dados")).unique(
+        subset="nome_norm_dados", maintain_order=True
+    )
+    casamentos = _casar_nomes(nomes["nome_norm_dados"].to_list(), tabela_grupos, limiar)
+    return (
+        nomes.join(casamentos, on="nome_norm_dados", how="inner", maintain_order="left")
+        .join(_correcao(tabela_grupos), on="nome_norm", how="left", maintain_order="left")
+        .select(pl.col("pesquisador").str.to_titlecase(), "pesquisador_canonico", "confianca")
+    )
+
+
+def aplicar_grupos(data, tabela_grupos, limiar=LIMIAR_SIMILARIDADE_NOMES, confianca=False):
+    """
+    Cruza as publicações com a tabela de grupos em um único join pela chave normalizada; nomes
+    sem correspondência exata usam o casamento aproximado (similaridade >= limiar, ver src/nomes.py).
+    Retorna (data, df_grupos):
+      - data: nomes corrigidos para a grafia canônica da lista (ou Title Case, se ausentes).
+      - df_grupos: uma linha por publicação x grupo (pesquisadores em vários grupos se repetem).
+    Com confianca=True, as duas tabelas levam também 'pesquisador_dados' (grafia dos dados, em
+    Title Case) e 'confianca' (similaridade do casamento; nula sem correspondência), para que os
+    casamentos abaixo de um limiar maior possam ser desfeitos depois (CuboContagens.com_limiar).
+    """
+    data = data.with_columns(normalizar_texto_expr("pesquisador").alias("_nome_norm"))
+    if confianca:
+        data = data.with_columns(pl.col("pesquisador").str.to_titlecase().alias("pesquisador_dados"))
+    casamentos = _casar_nomes(data["_nome_norm"].unique(maintain_order=True).to_list(), tabela_grupos, limiar)
+    data = data.join(
+        casamentos.select(pl.col("nome_norm_dados").alias("_nome_norm"), pl.col("nome_norm").alias("_nome_lista"),
+                          *(["confianca"] if confianca else [])),
+        on="_nome_norm",
+        how="left",
+        maintain_order="left",
+    ).with_columns(pl.coalesce("_nome_lista", "_nome_norm").alias("_nome_norm")).drop("_nome_lista")
+
+    correcao = _correcao(tabela_grupos).rename({"nome_norm": "_nome_norm"})
+
+    df_grupos = data.join(
+        tabela_grupos.rename({"nome_norm": "_nome_norm"}),
+        on="_nome_norm",
+        how="inner",
+        maintain_order="left_right",
+    ).with_columns(
+        pl.col("pesquisador_canonico").alias("pesquisador")
+    ).drop(["_nome_norm", "pesquisador_canonico"])
+
+    data = data.join(correcao, on="_nome_norm", how="left", maintain_order="left").with_columns(
+        pl.coalesce("pesquisador_canonico", pl.col("pesquisador").str.to_titlecase()).alias("pesquisador")
+    ).drop(["_nome_norm", "pesquisador_canonico"])
+
+    return data, df_grupos
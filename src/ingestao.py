@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+import zipfile
+from datetime import datetime
+import polars as pl
+from .cache import hash_conteudo
+from .processor import ler_csv_zip, normalizar_dados_brutos
+
+# Ingestão incremental: o Parquet de um programa é atualizado só com os CSVs de pesquisadores
+# que mudaram. Um manifesto (JSON ao lado do Parquet) guarda o hash de cada CSV de origem.
+# Programas do repositório particionado guardam o manifesto dentro do próprio diretório.
+VERSAO_MANIFESTO = 1
+LINHAS_POR_ROW_GROUP = 64_000
+ARQUIVO_MANIFESTO_DIRETORIO = "_manifesto.json"
+
+
+def caminho_manifesto(destino):
+    if os.path.isdir(destino):
+        return os.path.join(destino, ARQUIVO_MANIFESTO_DIRETORIO)
+    return destino + ".manifesto.json"
+
+
+def ler_manifesto(destino):
+    """Manifesto do Parquet `destino` (None se ausente, ilegível ou de outra versão)."""
+    try:
+        with open(caminho_manifesto(destino), encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifesto if manifesto.get("versao") == VERSAO_MANIFESTO else None
+
+
+def gravar_manifesto(destino, manifesto):
+    caminho = caminho_manifesto(destino)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def _hash_bytes(conteudo):
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+
+def ler_membros(origem):
+    """CSVs de pesquisadores da origem (ZIP ou diretório), como pares (nome, bytes)."""
+    if os.path.isdir(origem):
+        for nome in sorted(a for a in os.listdir(origem) if a.lower().endswith(".csv")):
+            with open(os.path.join(origem, nome), "rb") as f:
+                yield nome, f.read()
+        return
+    with zipfile.ZipFile(origem) as z:
+        for nome in z.namelist():
+            if nome.lower().endswith(".csv") and not nome.startswith("__MACOSX"):
+                yield nome, z.read(nome)
+
+
+def _colunas(anteriores, novos):
+    """União ordenada das colunas (issn_limpo e pesquisador sempre no fim, como no converter_dados.py)."""
+    colunas = [c for c in anteriores if c not in ("issn_limpo", "pesquisador")]
+    for df in novos:
+        colunas += [c for c in df.columns if c not in colunas and c not in ("issn_limpo", "pesquisador")]
+    if any("issn" in c for c in colunas):
+        colunas.append("issn_limpo")
+    return colunas + ["pesquisador"]
+
+
+def ingerir_incremental(origem, destino, forcar=False):
+    """
+    Atualiza o Parquet `destino` a partir dos CSVs de `origem` (ZIP ou diretório), relendo só os
+    arquivos novos ou alterados (pelo hash do conteúdo) e descartando os pesquisadores removidos.
+    As linhas dos demais pesquisadores são copiadas do Parquet atual, sem novo parse.
+    Sem manifesto (ou com forcar=True) todos os CSVs são lidos.
+    Retorna um resumo {adicionados, alterados, removidos, inalterados, erros, linhas}.
+    """
+    manifesto = None if forcar or not os.path.exists(destino) else ler_manifesto(destino)
+    if manifesto is not None and manifesto.get("hash_dataset") != hash_conteudo(destino):
+        # Parquet alterado por fora (ex: conversão completa): o manifesto não vale mais
+        manifesto = None
+    anteriores = manifesto["arquivos"] if manifesto else {}
+
+    arquivos, relidos, erros = {}, [], []
+    for nome, conteudo in ler_membros(origem):
+        h = _hash_bytes(conteudo)
+        if nome in anteriores and anteriores[nome]["hash"] == h and "erro" not in anteriores[nome]:
+            arquivos[nome] = anteriores[nome]
+            continue
+        _, df, erro = ler_csv_zip(nome, conteudo)
+        if erro is not None:
+            erros.append(f"{nome}: {erro}")
+            arquivos[nome] = {"hash": h, "pesquisador": None, "linhas": 0, "erro": str(erro)}
+        else:
+            df = normalizar_dados_brutos(df)
+            relidos.append(df)
+            arquivos[nome] = {"hash": h, "pesquisador": df["pesquisador"][0] if len(df) else None, "linhas": len(df)}
+
+    removidos = [n for n in anteriores if n not in arquivos]
+    adicionados = [n for n in arquivos if n not in anteriores]
+    alterados = [n for n in arquivos if n in anteriores and arquivos[n] is not anteriores[n]]
+    # Pesquisadores cujas linhas são substituídas ou retiradas do Parquet atual
+    afetados = sorted(({anteriores[n]["pesquisador"] for n in removidos + alterados}
+                       | {arquivos[n]["pesquisador"] for n in adicionados + alterados}) - {None})
+
+    resumo = {"adicionados": len(adicionados), "alterados": len(alterados), "removidos": len(removidos),
+              "inalterados": len(arquivos) - len(adicionados) - len(alterados), "erros": erros}
+    if manifesto is not None and not (adicionados or alterados or removidos):
+        resumo["linhas"] = sum(a["linhas"] for a in arquivos.values())
+        return resumo
+
+    colunas = _colunas(manifesto["colunas"] if manifesto else [], relidos)
+    tipos = {c: (pl.Int64 if c == "ano_publicacao" else pl.Utf8) for c in colunas}
+    partes = [df.select([pl.col(c) if c in df.columns else pl.lit(None).alias(c) for c in colunas]).cast(tipos)
+              for df in relidos]
+    hash_anterior = None
+    if manifesto is not None:
+        hash_anterior = manifesto["hash_dataset"]
+        mantidos = pl.scan_parquet(destino).filter(~pl.col("pesquisador").is_in(afetados))
+        mantidos = mantidos.select([pl.col(c) if c in manifesto["colunas"] else pl.lit(None).alias(c) for c in colunas])
+        partes.insert(0, mantidos.collect().cast(tipos))
+
+    df_final = pl.concat(partes) if partes else pl.DataFrame(schema=tipos)
+    df_final.write_parquet(destino + ".tmp", compression="zstd", statistics=True, row_group_size=LINHAS_POR_ROW_GROUP)
+    os.replace(destino + ".tmp", destino)
+
+    resumo["linhas"] = len(df_final)
+    gravar_manifesto(destino, {
+        "versao": VERSAO_MANIFESTO,
+        "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+        "colunas": colunas,
+        "hash_dataset": hash_conteudo(destino),
+        # Permite ao processador atualizar um resultado em cache da versão anterior (delta_dataset)
+        "atualizacao": {"hash_anterior": hash_anterior, "pesquisadores": afetados} if hash_anterior else None,
+        "arquivos": arquivos,
+    })
+    return resumo
+
+
+def delta_dataset(caminho):
+    """
+    (hash da versão anterior, pesquisadores afetados) se o Parquet (ou o programa do repositório)
+    `caminho` veio de uma atualização incremental ainda válida; None caso contrário.
+    """
+    manifesto = ler_manifesto(caminho)
+    if not manifesto or not manifesto.get("atualizacao"):
+        return None
+    if manifesto["hash_dataset"] != hash_conteudo(caminho):
+        return None
+    return manifesto["atualizacao"]["hash_anterior"], manifesto["atualizacao"]["pesquisadores"]
@@ -0,0 +1,146 @@
+import re
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+import polars as pl
+
+# Casamento aproximado de nomes de pesquisadores (ex: "Pedro Rogério" x "Pedro Rogerio da Silva").
+# A lista de referência (membros dos grupos) vira um índice de blocagem por prefixo de token;
+# cada nome dos dados só é comparado com os candidatos dos seus blocos, nunca com a lista toda.
+
+PARTICULAS = {"da", "de", "do", "das", "dos", "e", "di", "del", "van", "von"}
+TAMANHO_BLOCO = 3
+# Tokens com similaridade abaixo disso não contam (evita "Marcos" ~ "Marcio")
+SIMILARIDADE_MINIMA_TOKEN = 0.8
+SCHEMA_CASAMENTOS = {"nome_norm_dados": pl.Utf8, "nome_norm": pl.Utf8, "confianca": pl.Float64}
+
+
+def tokens_nome(nome_norm):
+    """Tokens de um nome já normalizado, sem partículas (da, de, dos...)."""
+    return tuple(t for t in re.split(r"[^a-z0-9]+", nome_norm) if t and t not in PARTICULAS)
+
+
+def distancia_edicao(a, b, limite=None):
+    """Distância de Levenshtein; com `limite`, para assim que ela certamente passa dele (devolve limite + 1)."""
+    # Prefixo e sufixo comuns não alteram a distância
+    inicio = 0
+    while inicio < min(len(a), len(b)) and a[inicio] == b[inicio]:
+        inicio += 1
+    a, b = a[inicio:], b[inicio:]
+    fim = 0
+    while fim < min(len(a), len(b)) and a[-1 - fim] == b[-1 - fim]:
+        fim += 1
+    a, b = a[:len(a) - fim], b[:len(b) - fim]
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    # Sobrou diferença nas duas pontas: distância 1 só se restar um caractere de cada lado
+    if limite is not None and limite <= 1:
+        return 1 if len(a) == 1 else limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if limite is not None and min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1]
+
+
+@lru_cache(maxsize=65536)
+def similaridade_token(a, b):
+    """Similaridade por distância de edição; 0 abaixo de SIMILARIDADE_MINIMA_TOKEN. Memoizada (nomes repetem tokens)."""
+    if a == b:
+        return 1.0
+    maior = max(len(a), len(b))
+    limite = int(maior * (1 - SIMILARIDADE_MINIMA_TOKEN) + 1e-9)
+    # Diferença de tamanho já garante similaridade baixa: evita calcular a distância
+    if abs(len(a) - len(b)) > limite:
+        return 0.0
+    distancia = distancia_edicao(a, b, limite)
+    return 1 - distancia / maior if distancia <= limite else 0.0
+
+
+def similaridade_nomes(tokens_a, tokens_b):
+    """
+    Similaridade entre 0 e 1: cobertura dos tokens do nome mais curto no mais longo (tolerando
+    erros de digitação) com peso 0.7, e razão entre os números de tokens com peso 0.3.
+    Nomes de um só token só casam se forem idênticos.
+    """
+    if tokens_a == tokens_b:
+        return 1.0
+    menor, maior = sorted((tokens_a, tokens_b), key=len)
+    if len(menor) < 2:
+        return 0.0
+    cobertura = sum(max(similaridade_token(t, u) for u in maior) for t in menor) / len(menor)
+    return 0.7 * cobertura + 0.3 * len(menor) / len(maior)
+
+
+class IndiceNomes:
+    """
+    Índice de blocagem de uma lista de nomes normalizados. Guarda a tabela de casamentos já
+    calculados (nome dos dados -> melhor nome da lista e similaridade), reaproveitada entre execuções.
+    """
+
+    def __init__(self, nomes_lista):
+        self.nomes = list(dict.fromkeys(nomes_lista))
+        self._posicao = {n: i for i, n in enumerate(self.nomes)}
+        self._tokens = {n: tokens_nome(n) for n in self.nomes}
+        self._blocos = defaultdict(set)
+        for nome, tokens in self._tokens.items():
+            for t in tokens:
+                self._blocos[t[:TAMANHO_BLOCO]].add(nome)
+        self._casamentos = {}
+        self._lock = threading.Lock()
+
+    def candidatos(self, tokens):
+        """Nomes da lista que dividem ao menos dois blocos com o nome (menos que isso nunca atinge o limiar)."""
+        contagem = Counter()
+        for bloco in {t[:TAMANHO_BLOCO] for t in tokens}:
+            contagem.update(self._blocos.get(bloco, ()))
+        return [nome for nome, n in contagem.items() if n >= 2]
+
+    def melhor(self, nome_norm):
+        """(nome da lista mais parecido, similaridade) ou (None, 0.0)."""
+        with self._lock:
+            if nome_norm in self._casamentos:
+                return self._casamentos[nome_norm]
+        if nome_norm in self._tokens:
+            resultado = (nome_norm, 1.0)
+        else:
+            tokens = tokens_nome(nome_norm)
+            resultado = (None, 0.0)
+            # Ordem da lista como desempate (determinístico)
+            for candidato in sorted(self.candidatos(tokens), key=self._posicao.get):
+                sim = similaridade_nomes(tokens, self._tokens[candidato])
+                if sim > resultado[1]:
+                    resultado = (candidato, sim)
+        with self._lock:
+            self._casamentos[nome_norm] = resultado
+        return resultado
+
+    def casar(self, nomes_dados, limiar):
+        """
+        Tabela (nome_norm_dados, nome_norm, confianca) dos nomes dos dados que casam com a lista:
+        exatos com confiança 1.0; aproximados com similaridade >= limiar, exceto para nomes da
+        lista que já aparecem exatamente nos dados (a variante seria outra pessoa).
+        """
+        nomes_dados = [n for n in dict.fromkeys(nomes_dados) if n is not None]
+        exatos = {n for n in nomes_dados if n in self._tokens}
+        linhas = []
+        for nome in nomes_dados:
+            if nome in exatos:
+                linhas.append((nome, nome, 1.0))
+                continue
+            candidato, sim = self.melhor(nome)
+            if candidato is not None and sim >= limiar and candidato not in exatos:
+                linhas.append((nome, candidato, sim))
+        return pl.DataFrame(linhas, schema=SCHEMA_CASAMENTOS, orient="row")
+
+
+@lru_cache(maxsize=16)
+def indice_nomes(nomes_lista):
+    """Índice (com a tabela de casamentos) de uma lista de nomes, um por lista de grupos."""
+    return IndiceNomes(nomes_lista)
@@ -1,161 +1,338 @@
 import polars as pl
-import pandas as pd
 import zipfile
 import os
-from io import StringIO, BytesIO
-import streamlit as st
-from .utils import limpar_issn
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from .utils import limpar_issn, limpar_issn_expr, normalizar_texto, normalizar_texto_expr
+from .cache import cache_resultados
+from .catalogo import scan_dados
+from .qualis import indices_qualis
+from .diagnostico import etapa, propagar_contexto
+from .exclusoes import (tabela_exclusoes, selecionar_exclusoes, MOTIVO_SEM_ISSN, MOTIVO_FORA_QUALIS,
+                        MOTIVO_NAO_PONTUAVEL, MOTIVO_ERRO_LEITURA, MOTIVO_SEM_COLUNA_ISSN)
 
-@st.cache_data
-def processar_dados_com_filtro(origem_dados, df_ref_qualis, is_parquet=False):
+# Número máximo de threads para decodificar os CSVs de um ZIP
+ZIP_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+def processar_dados_com_filtro(origem_dados, df_ref_qualis, is_parquet=False,
+                               pesquisador=None, anos=None, pesos=None, colunas=None):
     """
-    Processa dados (Parquet ou ZIP) usando Polars.
+    Processa dados (Parquet ou ZIP) usando Polars (pipeline Lazy: scan -> join Qualis -> pesos -> filtros).
     origem_dados: Caminho do arquivo (str) ou objeto BytesIO (upload).
-    df_ref_qualis: DataFrame (Polars ou Pandas) com a lista oficial.
+    df_ref_qualis: lista oficial: caminho (Parquet/Excel), upload ou DataFrame (Polars ou Pandas);
+      vira um índice issn_limpo -> estrato compartilhado pelo processo (src/qualis.py).
+    Filtros opcionais (empurrados para o scan do Parquet):
+      pesquisador: termo contido no nome (sem acentos/maiúsculas).
+      anos: tupla (inicio, fim) de ano_publicacao, inclusiva.
+      pesos: dicionário estrato -> pontos; mantém só esses estratos e adiciona 'qualis_norm' e 'peso'.
+      colunas: colunas de interesse (as demais não são lidas).
+    Retorna (df, excluidos): excluidos é a tabela de publicações descartadas (src/exclusoes.py),
+    com o motivo de cada exclusão; em caso de erro, (None, [mensagem]).
+    O resultado é guardado no cache de dois níveis (memória + disco), indexado pelo
+    hash do conteúdo da fonte, da lista Qualis e dos filtros.
     """
-    log_buffer = StringIO()
-    
-    log_buffer.write("RELATÓRIO DE PUBLICAÇÕES EXCLUÍDAS (FILTRO QUALIS)\n")
-    log_buffer.write("===================================================\n\n")
+    filtros = repr((pesquisador and normalizar_texto(pesquisador), anos and tuple(anos),
+                    pesos and sorted(pesos.items()), colunas and tuple(colunas)))
+    with etapa("cache_resultados") as e:
+        chave = cache_resultados.chave(origem_dados, df_ref_qualis, is_parquet, filtros)
+        resultado = cache_resultados.obter(chave)
+        e.info(hit=resultado is not None)
+    if resultado is not None:
+        return resultado
 
-    # 1. Preparar Tabela Qualis (Normalização)
-    # Se vier como Pandas (upload manual), converte para Polars
-    if isinstance(df_ref_qualis, pd.DataFrame):
-        df_qualis = pl.from_pandas(df_ref_qualis)
+    parametros = dict(pesquisador=pesquisador, anos=anos, pesos=pesos, colunas=colunas)
+    resultado = _atualizar_resultado_anterior(origem_dados, df_ref_qualis, filtros, parametros) if is_parquet else None
+    if resultado is not None:
+        df, excluidos = resultado
     else:
-        df_qualis = df_ref_qualis
+        df, excluidos = _processar_dados_com_filtro(origem_dados, df_ref_qualis, is_parquet, **parametros)
+    if df is not None:
+        # Consultas por pesquisador são baratas e muito variadas: ficam só na memória
+        cache_resultados.guardar(chave, df, excluidos, em_disco=not pesquisador)
+    return df, excluidos
 
-    # Normalizar colunas do Qualis (issn, titulo, estrato)
-    df_qualis = df_qualis.select([pl.col(c).alias(c.lower().strip()) for c in df_qualis.columns])
 
-    if 'issn' not in df_qualis.columns or 'estrato' not in df_qualis.columns:
-        return None, ["Erro: O arquivo Qualis deve conter colunas 'ISSN' e 'Estrato'."]
-    
-    # Limpeza do ISSN no Qualis e Seleção de Colunas Chave
-    df_qualis = df_qualis.with_columns(
-        pl.col("issn").cast(pl.Utf8).fill_null("").str.to_uppercase().str.replace_all(r"[^0-9X]", "").alias("issn_limpo")
-    ).select(["issn_limpo", "estrato"]).unique(subset=["issn_limpo"]) 
-    # .unique garante que não duplique registros se a lista tiver ISSN repetido
-
-    # 2. Carregar Dados (Parquet ou ZIP)
-    df_raw = None
+def _atualizar_resultado_anterior(origem_dados, df_ref_qualis, filtros, parametros):
+    """
+    Se o Parquet veio de uma ingestão incremental (src/ingestao.py) e o resultado da versão
+    anterior está em cache, reprocessa só as linhas dos pesquisadores afetados e as substitui
+    no resultado anterior (dados e exclusões). Retorna None quando não há como aproveitar.
+    """
+    if not isinstance(origem_dados, (str, os.PathLike)):
+        return None
+    from .ingestao import delta_dataset
+    delta = delta_dataset(os.fspath(origem_dados))
+    if delta is None:
+        return None
+    hash_anterior, afetados = delta
+    anterior = cache_resultados.obter(cache_resultados.chave(origem_dados, df_ref_qualis, True, filtros, hash_origem=hash_anterior))
+    if anterior is None:
+        return None
+
+    with etapa("delta_resultados") as e:
+        df_delta, excluidos_delta = _processar_dados_com_filtro(origem_dados, df_ref_qualis, True,
+                                                                pesquisadores=afetados, **parametros)
+        if df_delta is None:
+            return None
+        df_anterior, excluidos_anterior = anterior
+        fora = ~pl.col("pesquisador").is_in(afetados).fill_null(False)
+        df = pl.concat([df_anterior.filter(fora), df_delta], how="diagonal_relaxed")
+        excluidos = pl.concat([excluidos_anterior.filter(fora), excluidos_delta]).sort("pesquisador", maintain_order=True)
+        e.linhas(entrada=len(df_delta), saida=len(df))
+        e.info(pesquisadores=len(afetados))
+    return df, excluidos
+
+
+def normalizar_nomes_colunas(df):
+    """Nomes de colunas em minúsculas e sem espaços nas bordas."""
+    return df.select([pl.col(c).alias(c.lower().strip()) for c in df.columns])
+
+
+def _expr_ano_publicacao():
+    return pl.col("ano_publicacao").cast(pl.Utf8, strict=False).str.replace(r"\.0*$", "").cast(pl.Int64, strict=False).fill_null(0)
+
+
+def padronizar_tipos(df):
+    """
+    Padronização de tipos (evita erro de Schema no concat):
+    ano_publicacao como Int64 e as demais colunas como String (Utf8).
+    """
+    # 1. Ano de Publicação: Converter para Int64
+    if "ano_publicacao" in df.columns:
+        df = df.with_columns(_expr_ano_publicacao())
+
+    # 2. Demais colunas: Converter para String (Utf8) para evitar conflitos (ex: volume 1.0 vs "v1")
+    cols_to_string = [c for c in df.columns if c != "ano_publicacao"]
+    if cols_to_string:
+        df = df.with_columns([pl.col(c).cast(pl.Utf8) for c in cols_to_string])
+    return df
+
+
+def normalizar_dados_brutos(df):
+    """
+    Esquema canônico dos dados brutos (usado pelo converter_dados.py): colunas normalizadas,
+    tipos padronizados e 'issn_limpo' pré-calculado para o cruzamento com o Qualis.
+    """
+    df = normalizar_nomes_colunas(df)
+    col_issn = next((c for c in df.columns if "issn" in c and c != "issn_limpo"), None)
+    if col_issn:
+        df = df.with_columns(limpar_issn_expr(col_issn).alias("issn_limpo"))
+    return padronizar_tipos(df)
+
+
+def ler_csv_zip(arquivo, conteudo):
+    """
+    Decodifica um CSV de pesquisador extraído do ZIP.
+    Tenta o leitor nativo do Polars e recorre ao Pandas (engine='python', mais tolerante
+    a erros de aspas/escape em CSVs manuais) apenas se o nativo falhar.
+    Retorna (arquivo, DataFrame, erro).
+    """
+    try:
+        try:
+            # infer_schema=False: tudo lido como texto, evitando erros de tipo
+            df_temp = pl.read_csv(BytesIO(conteudo), infer_schema=False)
+            # Campos vazios ("") como nulos, como no Pandas e nos Parquets (ex: título ausente)
+            df_temp = df_temp.with_columns(pl.when(pl.col(pl.Utf8) != "").then(pl.col(pl.Utf8)))
+        except (pl.exceptions.ComputeError, pl.exceptions.NoDataError, UnicodeDecodeError):
+            import pandas as pd
+            df_pd = pd.read_csv(BytesIO(conteudo), on_bad_lines='skip', engine='python', dtype=str)
+            df_temp = pl.from_pandas(df_pd)
+
+        # Correção de encoding para nomes de arquivos em ZIP (CP437 -> UTF-8)
+        nome_arquivo_corrigido = arquivo
+        try:
+            nome_arquivo_corrigido = arquivo.encode('cp437').decode('utf-8')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+
+        nome_pesquisador = os.path.splitext(os.path.basename(nome_arquivo_corrigido))[0].replace("_", " ")
+        df_temp = df_temp.with_columns(pl.lit(nome_pesquisador).alias("pesquisador"))
+        return arquivo, df_temp, None
+    except Exception as e:
+        return arquivo, None, e
+
+
+def _processar_dados_com_filtro(origem_dados, df_ref_qualis, is_parquet=False,
+                                pesquisador=None, anos=None, pesos=None, colunas=None, pesquisadores=None):
+    # pesquisadores: nomes exatos a processar (atualização incremental); None = todos
+    erros_leitura = []
+
+    # 1. Índice Qualis (issn_limpo -> estrato): lido e normalizado uma vez por conteúdo, no processo todo
+    try:
+        df_qualis = indices_qualis.obter(df_ref_qualis)
+    except ValueError as erro:
+        return None, [str(erro)]
+
+    # 2. Carregar Dados (Parquet ou ZIP) como LazyFrame
+    lf_raw = None
     
     if is_parquet:
-        # Leitura otimizada de Parquet
-        df_raw = pl.read_parquet(origem_dados)
+        # Scan Lazy do Parquet (ou do programa particionado por ano no repositório):
+        # projeção e filtros são empurrados para a leitura
+        lf_raw = scan_dados(origem_dados) if isinstance(origem_dados, (str, os.PathLike)) else pl.scan_parquet(origem_dados)
     else:
-        # Processamento legado de ZIP (Upload Manual) -> Convertendo para Polars
-        dfs_temp = []
-        with zipfile.ZipFile(origem_dados) as z:
-            for arquivo in z.namelist():
-                if arquivo.lower().endswith(".csv") and not arquivo.startswith("__MACOSX"):
-                    try:
-                        with z.open(arquivo) as f:
-                            # Lê com Pandas (engine='python') para maior robustez contra erros de aspas/escape em CSVs manuais
-                            # dtype=str garante que tudo seja lido como texto, evitando erros de tipo
-                            df_pd = pd.read_csv(f, on_bad_lines='skip', engine='python', dtype=str)
-                            df_temp = pl.from_pandas(df_pd)
-                            
-                            # Correção de encoding para nomes de arquivos em ZIP (CP437 -> UTF-8)
-                            nome_arquivo_corrigido = arquivo
-                            try:
-                                nome_arquivo_corrigido = arquivo.encode('cp437').decode('utf-8')
-                            except:
-                                pass
-                            
-                            nome_pesquisador = os.path.splitext(os.path.basename(nome_arquivo_corrigido))[0].replace("_", " ")
-                            df_temp = df_temp.with_columns(pl.lit(nome_pesquisador).alias("pesquisador"))
+        # Processamento de ZIP (Upload Manual): leitura dos membros em sequência e
+        # decodificação/parse de cada CSV em paralelo (Polars libera o GIL durante o parse)
+        with etapa("parse_zip") as e:
+            with zipfile.ZipFile(origem_dados) as z:
+                membros = [(arquivo, z.read(arquivo)) for arquivo in z.namelist()
+                           if arquivo.lower().endswith(".csv") and not arquivo.startswith("__MACOSX")]
+
+            dfs_temp = []
+            if membros:
+                with ThreadPoolExecutor(max_workers=min(ZIP_MAX_WORKERS, len(membros))) as executor:
+                    # map preserva a ordem do ZIP: concat e relatório determinísticos
+                    for arquivo, df_temp, erro in executor.map(lambda m: ler_csv_zip(*m), membros):
+                        if erro is not None:
+                            erros_leitura.append({"pesquisador": arquivo, "motivo": f"{MOTIVO_ERRO_LEITURA}: {erro}"})
+                        else:
                             dfs_temp.append(df_temp)
-                    except Exception as e:
-                        log_buffer.write(f"ERRO ao ler {arquivo}: {e}\n")
-        if dfs_temp:
-            df_raw = pl.concat(dfs_temp, how="diagonal")
+            if dfs_temp:
+                df_raw = pl.concat(dfs_temp, how="diagonal")
+                if not df_raw.is_empty():
+                    lf_raw = df_raw.lazy()
+                e.linhas(saida=len(df_raw))
+            e.info(arquivos=len(membros), erros=len(erros_leitura))
 
-    if df_raw is None or df_raw.is_empty():
+    if lf_raw is None:
         return None, ["Nenhum dado carregado."]
 
-    # 3. Normalizar colunas e Filtrar
-    df_raw = df_raw.select([pl.col(c).alias(c.lower().strip()) for c in df_raw.columns])
-    
-    # Encontrar coluna ISSN
-    col_issn = next((c for c in df_raw.columns if "issn" in c), None)
+    # 3. Normalizar colunas, Projeção e Filtros (pushdown)
+    tipos_raw = lf_raw.collect_schema()
+    esquema = tipos_raw.names()
+    renomear = {c: c.lower().strip() for c in esquema if c != c.lower().strip()}
+    if renomear:
+        lf_raw = lf_raw.rename(renomear)
+    esquema = [renomear.get(c, c) for c in esquema]
+
+    # Encontrar colunas de ISSN e de título (ex: 'titulo_publicacao' nos dados do Lattes)
+    col_issn = next((c for c in esquema if "issn" in c), None)
+    col_titulo = "titulo" if "titulo" in esquema else next((c for c in esquema if c.startswith("titulo")), None)
+
+    if colunas is not None:
+        # Lê apenas as colunas pedidas + as necessárias para o cruzamento e o relatório de exclusões
+        necessarias = set(colunas) | {"pesquisador", "ano_publicacao", "qualis", "estrato", "issn_limpo", col_issn, col_titulo}
+        lf_raw = lf_raw.select([c for c in esquema if c in necessarias])
+        if "titulo" in colunas and col_titulo not in (None, "titulo"):
+            # Título com nome padronizado (usado na deduplicação de publicações em coautoria)
+            lf_raw = lf_raw.rename({col_titulo: "titulo"})
+            col_titulo = "titulo"
+
+    if pesquisador:
+        termo = normalizar_texto(pesquisador)
+        lf_raw = lf_raw.filter(normalizar_texto_expr("pesquisador").str.contains(termo, literal=True))
+    if pesquisadores is not None:
+        lf_raw = lf_raw.filter(pl.col("pesquisador").is_in(pesquisadores))
+    if anos is not None and "ano_publicacao" in esquema:
+        # Ano já inteiro (Parquets do repositório): comparação direta, que poda as partições por ano
+        ano = pl.col("ano_publicacao") if tipos_raw.get("ano_publicacao", pl.Utf8).is_integer() else _expr_ano_publicacao()
+        lf_raw = lf_raw.filter(ano.is_between(anos[0], anos[1]))
     
     if col_issn:
         # Criar coluna temporária limpa
+        # Parquets gerados pelo converter_dados.py já trazem 'issn_limpo' pré-calculado
         # FIX: Cast para string, fill_null e upper para evitar erros se a coluna for lida como Int ou tiver Nones
-        df_raw = df_raw.with_columns(
-            pl.col(col_issn).cast(pl.Utf8).fill_null("").str.to_uppercase().str.replace_all(r"[^0-9X]", "").alias("issn_temp")
-        )
+        if "issn_limpo" in esquema:
+            lf_raw = lf_raw.with_columns(pl.col("issn_limpo").alias("issn_temp"))
+        else:
+            lf_raw = lf_raw.with_columns(limpar_issn_expr(col_issn).alias("issn_temp"))
         
         # CRUZAMENTO (JOIN) COM A LISTA OFICIAL
         # Renomear coluna do Qualis para evitar colisão com dados do pesquisador
         df_qualis_join = df_qualis.rename({"estrato": "estrato_oficial"})
         
         # Left Join para identificar o que casou e o que não casou
-        df_joined = df_raw.join(df_qualis_join, left_on="issn_temp", right_on="issn_limpo", how="left")
+        lf_joined = lf_raw.join(df_qualis_join.lazy(), left_on="issn_temp", right_on="issn_limpo", how="left")
         
-        # Identificar excluídos (onde 'estrato_oficial' é nulo)
-        df_excluidos = df_joined.filter(pl.col("estrato_oficial").is_null())
+        # Identificar excluídos (sem correspondência no Qualis), já no esquema do relatório
+        origens = {"pesquisador": "pesquisador", "titulo": col_titulo, "qualis_original": "qualis" if "qualis" in esquema else None,
+                   "ano_publicacao": _expr_ano_publicacao() if "ano_publicacao" in esquema else None}
+        sem_estrato = pl.col("estrato_oficial").is_null()
+        lf_excluidos = [selecionar_exclusoes(
+            lf_joined.filter(sem_estrato), origens,
+            pl.when(pl.col("issn_temp") == "").then(pl.lit(MOTIVO_SEM_ISSN)).otherwise(pl.lit(MOTIVO_FORA_QUALIS)),
+        )]
         
-        # Identificar mantidos
-        df_mantidos = df_joined.filter(pl.col("estrato_oficial").is_not_null())
+        # Identificar mantidos (e, se houver pesos, apenas os estratos pontuáveis)
+        lf_mantidos = lf_joined.filter(~sem_estrato)
+        if pesos is not None:
+            pontuavel = pl.col("estrato_oficial").cast(pl.Utf8).str.to_uppercase().str.strip_chars().is_in(list(pesos.keys()))
+            lf_excluidos.append(selecionar_exclusoes(
+                lf_mantidos.filter(~pontuavel), origens,
+                pl.format("{} ({})", pl.lit(MOTIVO_NAO_PONTUAVEL), pl.col("estrato_oficial").cast(pl.Utf8)),
+            ))
+            lf_mantidos = lf_mantidos.filter(pontuavel)
 
-        # Gerar Log de Exclusões
-        if not df_excluidos.is_empty():
-            df_excluidos = df_excluidos.sort("pesquisador")
-            
-            # Verifica colunas disponíveis para o log
-            cols_disp = df_excluidos.columns
-            col_titulo = "titulo" if "titulo" in cols_disp else None
-            col_qualis_orig = "qualis" if "qualis" in cols_disp else None
-            
-            # Seleciona dados para iteração
-            rows = df_excluidos.select([
-                pl.col("pesquisador"),
-                pl.col("issn_temp"),
-                pl.col(col_titulo).alias("titulo") if col_titulo else pl.lit("Título não identificado").alias("titulo"),
-                pl.col(col_qualis_orig).alias("qualis_orig") if col_qualis_orig else pl.lit("N/A").alias("qualis_orig")
-            ]).iter_rows(named=True)
-            
-            current_pesq = None
-            for row in rows:
-                p = row["pesquisador"]
-                if p != current_pesq:
-                    log_buffer.write(f"PESQUISADOR: {p}\n")
-                    current_pesq = p
-                
-                t = row["titulo"] or "Título não identificado"
-                i = row["issn_temp"] or "S/N"
-                q = row["qualis_orig"] or "N/A"
-                log_buffer.write(f"  [X] REMOVIDO: ISSN {i} (Qualis Orig: {q}) - {t}\n")
-            
-            log_buffer.write("-" * 50 + "\n")
-
-        # Preparar DataFrame Final (apenas mantidos)
-        # Substituir o Qualis do pesquisador pelo Oficial ('estrato_oficial')
-        cols_to_drop = ["issn_temp", "issn_limpo"]
-        if "qualis" in df_mantidos.columns:
-            cols_to_drop.append("qualis")
-        if "estrato" in df_mantidos.columns:
-            cols_to_drop.append("estrato")
+        # O scan e o join são compartilhados entre os ramos
+        # (o plano é lazy: leitura, filtros e join com o Qualis acontecem todos aqui)
+        with etapa("scan_join_qualis") as e:
+            df_mantidos, df_excluidos = pl.collect_all([lf_mantidos, pl.concat(lf_excluidos)])
+            e.linhas(saida=len(df_mantidos))
+            e.info(excluidos=len(df_excluidos))
+
+        if df_mantidos.is_empty() and df_excluidos.is_empty() and not (pesquisador or anos is not None or pesquisadores is not None):
+            return None, ["Nenhum dado carregado."]
+
+        # Relatório de exclusões: erros de leitura + publicações descartadas, por pesquisador
+        excluidos = pl.concat([tabela_exclusoes(erros_leitura), df_excluidos.sort("pesquisador", maintain_order=True)])
+
+        with etapa("tipos_e_pesos") as e:
+            # Preparar DataFrame Final (apenas mantidos)
+            # Substituir o Qualis do pesquisador pelo Oficial ('estrato_oficial')
+            # issn_limpo só segue no resultado se pedido em `colunas` (chave de publicação)
+            manter_issn = colunas is not None and "issn_limpo" in colunas
+            if manter_issn:
+                df_mantidos = df_mantidos.with_columns(pl.col("issn_temp").alias("issn_limpo"))
+            cols_to_drop = ["issn_temp"] if manter_issn else ["issn_temp", "issn_limpo"]
+            if "qualis" in df_mantidos.columns:
+                cols_to_drop.append("qualis")
+            if "estrato" in df_mantidos.columns:
+                cols_to_drop.append("estrato")
+            if colunas is not None:
+                # Colunas lidas apenas para o cruzamento/relatório
+                cols_to_drop += [c for c in df_mantidos.columns if c not in colunas and c not in ("pesquisador", "ano_publicacao", "estrato_oficial")]
             
-        df_final = df_mantidos.drop([c for c in cols_to_drop if c in df_mantidos.columns])
-        df_final = df_final.rename({"estrato_oficial": "qualis"})
+            df_final = df_mantidos.drop([c for c in set(cols_to_drop) if c in df_mantidos.columns])
+            df_final = df_final.rename({"estrato_oficial": "qualis"})
         
-        # PADRONIZAÇÃO DE TIPOS (Evita erro de Schema no concat)
-        # 1. Ano de Publicação: Converter para Int64
-        if "ano_publicacao" in df_final.columns:
-            df_final = df_final.with_columns(
-                pl.col("ano_publicacao").cast(pl.Utf8, strict=False).str.replace(r"\.0*$", "").cast(pl.Int64, strict=False).fill_null(0)
-            )
-            
-        # 2. Demais colunas: Converter para String (Utf8) para evitar conflitos (ex: volume 1.0 vs "v1")
-        cols_to_string = [c for c in df_final.columns if c != "ano_publicacao"]
-        if cols_to_string:
-            df_final = df_final.with_columns([
-                pl.col(c).cast(pl.Utf8) for c in cols_to_string
-            ])
+            # PADRONIZAÇÃO DE TIPOS (Evita erro de Schema no concat)
+            df_final = padronizar_tipos(df_final)
+
+            # Mapeamento de pesos (estrato normalizado -> pontuação)
+            if pesos is not None:
+                df_final = df_final.with_columns(
+                    pl.col("qualis").str.to_uppercase().str.strip_chars().alias("qualis_norm")
+                ).with_columns(pl.col("qualis_norm").replace_strict(pesos, default=0).alias("peso"))
         
-        return df_final, log_buffer.getvalue()
+            e.linhas(entrada=len(df_mantidos), saida=len(df_final))
+
+        return df_final, excluidos
     else:
-        return df_raw, "Aviso: Coluna ISSN não encontrada nos dados brutos."
+        aviso = {"motivo": f"{MOTIVO_SEM_COLUNA_ISSN} (nenhuma publicação foi cruzada com o Qualis)"}
+        return lf_raw.collect(), tabela_exclusoes(erros_leitura + [aviso])
+
+
+def _processar_fonte(fonte, filtros):
+    try:
+        with etapa("processar_fonte", fonte=fonte["nome"]) as e:
+            is_pq = (fonte["tipo"] == "parquet")
+            # A lista Qualis vai como origem: só é lida se o índice dela ainda não existir
+            d, l = processar_dados_com_filtro(fonte["path"], fonte["qualis"], is_parquet=is_pq, **filtros)
+            e.linhas(saida=len(d) if d is not None else 0)
+        return d, l, None
+    except Exception as e:
+        return None, None, e
+
+
+def processar_fontes(fontes, max_workers=None, **filtros):
+    """
+    Processa vários programas em paralelo (threads; o Polars libera o GIL).
+    fontes: lista de dicionários {"nome", "qualis", "path", "tipo"}.
+    filtros: repassados para processar_dados_com_filtro.
+    Retorna [(fonte, df, excluidos, erro)] na mesma ordem de `fontes`; erros ficam isolados por programa.
+    """
+    if not fontes:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or len(fontes)) as executor:
+        resultados = list(executor.map(propagar_contexto(lambda f: _processar_fonte(f, filtros)), fontes))
+    return [(fonte, d, l, erro) for fonte, (d, l, erro) in zip(fontes, resultados)]
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+import polars as pl
+from .cache import hash_conteudo
+from .config import CACHE_DIR, QUALIS_MAX_ITENS
+from .diagnostico import etapa
+from .utils import limpar_issn_expr, para_polars
+
+# Índice Qualis compartilhado pelo processo: uma tabela compacta (issn_limpo -> estrato) por lista,
+# construída uma vez por hash do conteúdo (Parquet do repositório ou planilha enviada), persistida
+# em Arrow IPC sem compressão e lida com memory map. Todas as sessões e joins usam a mesma tabela.
+
+ERRO_COLUNAS = "Erro: O arquivo Qualis deve conter colunas 'ISSN' e 'Estrato'."
+
+
+def ler_qualis(origem_qualis):
+    """Lê a lista Qualis (Parquet do repositório ou Excel enviado pelo usuário)."""
+    if str(origem_qualis).endswith(".parquet"):
+        return pl.read_parquet(origem_qualis)
+    import pandas as pd
+    return pd.read_excel(origem_qualis)
+
+
+def construir_indice(df_qualis):
+    """
+    Tabela (issn_limpo, estrato) ordenada por ISSN, um estrato por ISSN (o primeiro da lista),
+    com o estrato dicionarizado (Categorical). ValueError se faltar ISSN ou Estrato.
+    """
+    df = para_polars(df_qualis)
+    df = df.select([pl.col(c).alias(str(c).lower().strip()) for c in df.columns])
+    if "issn" not in df.columns or "estrato" not in df.columns:
+        raise ValueError(ERRO_COLUNAS)
+    return (
+        df.select(limpar_issn_expr("issn").alias("issn_limpo"), pl.col("estrato").cast(pl.Utf8))
+        .unique(subset=["issn_limpo"], keep="first", maintain_order=True)
+        .sort("issn_limpo")
+        .with_columns(pl.col("estrato").cast(pl.Categorical))
+    )
+
+
+class IndicesQualis:
+    """Índices Qualis por hash de conteúdo: LRU em memória + arquivos Arrow IPC (memory map) em disco."""
+
+    def __init__(self, diretorio=CACHE_DIR, max_itens=QUALIS_MAX_ITENS):
+        self.diretorio = diretorio
+        self.max_itens = max_itens
+        self._indices = OrderedDict()
+        self._lock = threading.Lock()
+        self.construidos = 0
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"qualis_{chave}.arrow")
+
+    def obter(self, origem):
+        """
+        Índice de uma lista Qualis: caminho (Parquet/Excel), upload (BytesIO) ou DataFrame.
+        A lista só é lida e normalizada quando o conteúdo ainda não foi visto por este servidor.
+        """
+        chave = hash_conteudo(origem)
+        with etapa("indice_qualis") as e:
+            with self._lock:
+                if chave in self._indices:
+                    self._indices.move_to_end(chave)
+                    e.info(origem="memoria")
+                    return self._indices[chave]
+
+            indice = self._ler_disco(chave)
+            e.info(origem="disco" if indice is not None else "construido")
+            if indice is None:
+                lido = isinstance(origem, (str, os.PathLike)) or hasattr(origem, "read")
+                indice = construir_indice(ler_qualis(origem) if lido else origem)
+                indice = self._gravar_disco(chave, indice)
+                with self._lock:
+                    self.construidos += 1
+            e.linhas(saida=len(indice))
+
+        with self._lock:
+            self._indices[chave] = indice
+            self._indices.move_to_end(chave)
+            while len(self._indices) > self.max_itens:
+                self._indices.popitem(last=False)
+        return indice
+
+    def _ler_disco(self, chave):
+        caminho = self._caminho(chave)
+        if not self.diretorio or not os.path.exists(caminho):
+            return None
+        try:
+            return pl.read_ipc(caminho)
+        except Exception:
+            return None
+
+    def _gravar_disco(self, chave, indice):
+        """
+        Grava o IPC sem compressão e devolve a versão lida do disco (o Polars mapeia arquivos IPC
+        locais não comprimidos em memória, sem cópia); em erro, devolve a tabela em memória.
+        """
+        if not self.diretorio:
+            return indice
+        caminho = self._caminho(chave)
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            indice.write_ipc(caminho + ".tmp", compression="uncompressed")
+            os.replace(caminho + ".tmp", caminho)
+            return pl.read_ipc(caminho)
+        except OSError:
+            return indice
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "itens_memoria": len(self._indices),
+                "construidos": self.construidos,
+                "bytes_memoria": sum(i.estimated_size() for i in self._indices.values()),
+            }
+
+
+# Instância compartilhada pelo app (todas as sessões do servidor)
+indices_qualis = IndicesQualis()
+
@@ -0,0 +1,104 @@
+import polars as pl
+from .utils import para_polars
+
+
+def tabela_ranking(total, entidade, valor="peso", ano="ano_publicacao"):
+    """
+    Calcula, em uma única passada (funções de janela), os rankings de todos os anos.
+    total: tabela (Polars ou Pandas) com uma linha por ano x entidade e a coluna `valor`.
+    Retorna uma linha por entidade x ano (a partir do primeiro ano da entidade) com:
+      valor, acumulado, presente (teve linha no ano), perc_ano, perc_acumulado,
+      perc_global, pos_ano e pos_acumulado.
+    """
+    total = para_polars(total)
+
+    base = total.group_by([ano, entidade]).agg(pl.col(valor).sum()).with_columns(pl.lit(True).alias("presente"))
+    anos = base.select(pl.col(ano).unique().sort())
+    entidades = base.select(pl.col(entidade).unique())
+
+    soma_global = base[valor].sum()
+    soma_global = soma_global if soma_global else None
+
+    # Grade entidade x ano: necessária para que o acumulado "carregue" os anos sem publicação
+    grade = (
+        entidades.join(anos, how="cross")
+        .join(base, on=[entidade, ano], how="left")
+        .with_columns(pl.col(valor).fill_null(0), pl.col("presente").fill_null(False))
+        .sort([entidade, ano])
+        .with_columns(
+            pl.col(valor).cum_sum().over(entidade).alias("acumulado"),
+            pl.col("presente").cum_max().over(entidade).alias("_iniciado"),
+            pl.col(valor).sum().over(entidade).alias("_total_entidade"),
+        )
+        .filter(pl.col("_iniciado"))
+    )
+
+    soma_ano = pl.col(valor).sum().over(ano)
+    grade = grade.with_columns(
+        pl.when(soma_ano > 0).then(100 * pl.col(valor) / soma_ano).otherwise(0.0).alias("perc_ano"),
+        (100 * pl.col("acumulado") / soma_global).alias("perc_acumulado"),
+        (100 * pl.col("_total_entidade") / soma_global).alias("perc_global"),
+    )
+
+    # Posições: ordenação descendente dentro de cada ano (empate resolvido pelo nome)
+    pos_ano = (
+        grade.filter(pl.col("presente"))
+        .sort([ano, valor, entidade], descending=[False, True, False])
+        .with_columns(pl.int_range(1, pl.len() + 1).over(ano).alias("pos_ano"))
+        .select([ano, entidade, "pos_ano"])
+    )
+    grade = (
+        grade.sort([ano, "acumulado", entidade], descending=[False, True, False])
+        .with_columns(pl.int_range(1, pl.len() + 1).over(ano).alias("pos_acumulado"))
+        .join(pos_ano, on=[ano, entidade], how="left")
+    )
+
+    return grade.drop(["_iniciado", "_total_entidade"])
+
+
+def _hover_por_ano(tabela, entidade, posicao, texto, ano, top_k):
+    """Monta o dicionário {ano: "1. X — ...<br>2. Y — ..."} a partir de uma coluna de posição."""
+    t = tabela.filter(pl.col(posicao).is_not_null())
+    if top_k is not None:
+        t = t.filter(pl.col(posicao) <= top_k)
+    linhas = (
+        t.sort([ano, posicao])
+        .with_columns((pl.col(posicao).cast(pl.Utf8) + ". " + pl.col(entidade).cast(pl.Utf8) + " — " + texto).alias("_linha"))
+        .group_by(ano, maintain_order=True)
+        .agg(pl.col("_linha").str.join("<br>"))
+    )
+    return dict(zip(linhas[ano].to_list(), linhas["_linha"].to_list()))
+
+
+def _fmt1(col):
+    # Equivalente exato a f"{x:.1f}"; aplicado só às linhas que vão para o hover (top_k)
+    return pl.col(col).map_batches(
+        lambda s: pl.Series([f"{v:.1f}" for v in s.cast(pl.Float64).to_list()], dtype=pl.Utf8),
+        return_dtype=pl.Utf8,
+    )
+
+
+def rankings_participacao(total, entidade, valor="peso", ano="ano_publicacao", top_k=None):
+    """
+    Rankings de participação (volume) para o hover das linhas do tempo.
+    Retorna (ranking_anual, ranking_acumulado), dicionários {ano: texto}.
+    """
+    tabela = tabela_ranking(total, entidade, valor=valor, ano=ano)
+    texto_anual = _fmt1("perc_ano") + pl.lit("% (global: ") + _fmt1("perc_global") + pl.lit("%)")
+    texto_acc = _fmt1("perc_acumulado") + pl.lit("% (global: ") + _fmt1("perc_global") + pl.lit("%)")
+    ranking_anual = _hover_por_ano(tabela, entidade, "pos_ano", texto_anual, ano, top_k)
+    ranking_acumulado = _hover_por_ano(tabela, entidade, "pos_acumulado", texto_acc, ano, top_k)
+    return ranking_anual, ranking_acumulado
+
+
+def rankings_media(total, entidade, valor="peso_medio", ano="ano_publicacao", top_k=None):
+    """
+    Rankings de eficiência (pontos por membro) para o hover das linhas do tempo.
+    Retorna (ranking_anual, ranking_acumulado), dicionários {ano: texto}.
+    """
+    tabela = tabela_ranking(total, entidade, valor=valor, ano=ano)
+    texto_anual = _fmt1(valor) + pl.lit(" pts/pesq")
+    texto_acc = _fmt1("acumulado") + pl.lit(" pts/pesq (acum)")
+    ranking_anual = _hover_por_ano(tabela, entidade, "pos_ano", texto_anual, ano, top_k)
+    ranking_acumulado = _hover_por_ano(tabela, entidade, "pos_acumulado", texto_acc, ano, top_k)
+    return ranking_anual, ranking_acumulado
@@ -0,0 +1,229 @@
+import os
+import json
+import html
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import polars as pl
+from plotly.offline import get_plotlyjs_version
+from .config import PESOS, COLUNAS_ANALISE, GRUPOS_POR_PROGRAMA, TOP_K_MODO_GRANDE, TOP_K_HOVER_MODO_GRANDE
+from .cache import VERSAO_PROCESSAMENTO
+from .catalogo import CATALOGO, fontes_do_catalogo, slug
+from .processor import processar_fontes
+from .grupos import compilar_grupos, aplicar_grupos
+from .cubo import construir_cubo
+from .ranking import tabela_ranking
+from .analytics import totais_por_ano, contagem_estratos, proporcoes_abc, totais_grupos
+from .render import modo_grande
+from .figuras import figura_linha_tempo, figura_radar, figura_calor, figura_cluster, figura_eficiencia, figura_bolhas
+from .exclusoes import resumo_exclusoes
+
+# Geração em lote (sem Streamlit) das tabelas e relatórios HTML de todos os programas do catálogo.
+# O processamento usa os mesmos filtros do app (PESOS, COLUNAS_ANALISE): o cache em disco de
+# resultados fica aquecido e a primeira visita ao dashboard não precisa reprocessar.
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "relatorios")
+TOP_TABELA_HTML = 20
+
+
+def tabelas_individuais(celulas):
+    """Tabelas por pesquisador (a partir das células do cubo): totais por ano, rankings, contagens por estrato e proporções A/B/C."""
+    total = totais_por_ano(celulas, "pesquisador")
+    return {
+        "pesquisador_ano": total,
+        "ranking_pesquisador": tabela_ranking(total, "pesquisador"),
+        "estratos_pesquisador": contagem_estratos(celulas, "pesquisador"),
+        "abc_pesquisador": proporcoes_abc(celulas, "pesquisador"),
+    }
+
+
+def tabelas_grupos(celulas, entidade="linha_pesquisa", sufixo="grupo"):
+    """Tabelas por linha de pesquisa (ou programa, no comparativo), a partir das células do cubo."""
+    if celulas.is_empty():
+        return {}
+    total_g = totais_grupos(celulas)
+    return {
+        f"{sufixo}_ano": total_g,
+        f"ranking_{sufixo}": tabela_ranking(total_g, entidade),
+        f"estratos_{sufixo}": contagem_estratos(celulas, entidade),
+    }
+
+
+def _figuras_individuais(tabelas):
+    total, contagem = tabelas["pesquisador_ano"], tabelas["estratos_pesquisador"]
+    grande = modo_grande(total["pesquisador"].n_unique())
+    figs = [
+        figura_linha_tempo(total, "pesquisador", "Linha do Tempo (Individual)", grande=grande,
+                           top_k_hover=TOP_K_HOVER_MODO_GRANDE if grande else 50, top_k_series=TOP_K_MODO_GRANDE if grande else None),
+        figura_radar(contagem, total, "pesquisador", "Perfil Qualis (Individual)", top_k=TOP_K_MODO_GRANDE if grande else None),
+        figura_calor(total, "pesquisador"),
+    ]
+    if len(contagem) > 1:
+        figs.append(figura_cluster(contagem, "pesquisador", "Cluster de Similaridade (Individual)", grande=grande))
+    return figs
+
+
+def _figuras_grupos(tabelas, sufixo, titulo):
+    if f"{sufixo}_ano" not in tabelas:
+        return []
+    total_g, contagem_g = tabelas[f"{sufixo}_ano"], tabelas[f"estratos_{sufixo}"]
+    figs = [
+        figura_linha_tempo(total_g, "linha_pesquisa", titulo, rotulo_ranking=" (Volume)"),
+        figura_eficiencia(total_g, "linha_pesquisa"),
+        figura_bolhas(total_g, "linha_pesquisa"),
+    ]
+    if len(contagem_g) > 1:
+        figs.append(figura_cluster(contagem_g, "linha_pesquisa", "Cluster de Similaridade (Grupos)", altura=600))
+    return figs
+
+
+def _tabela_html(df):
+    return df.to_pandas().to_html(index=False, border=0, classes="tabela", float_format=lambda v: f"{v:.1f}")
+
+
+def _ranking_final(ranking, entidade):
+    """Posição acumulada no último ano (top TOP_TABELA_HTML), para a tabela do relatório."""
+    ultimo = ranking["ano_publicacao"].max()
+    return (
+        ranking.filter(pl.col("ano_publicacao") == ultimo)
+        .sort("pos_acumulado")
+        .head(TOP_TABELA_HTML)
+        .select(pl.col("pos_acumulado").alias("posição"), pl.col(entidade), pl.col("acumulado").alias("pontos"),
+                pl.col("perc_global").alias("% do total"))
+    )
+
+
+def pagina_html(titulo, resumo, blocos):
+    """
+    Página HTML estática; blocos: lista de (subtítulo, [figuras], [tabelas HTML]).
+    O plotly.js vem do CDN na versão que o plotly instalado gera (as figuras seguem o esquema dela).
+    """
+    partes = [f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>{html.escape(titulo)}</title>",
+              f"<script src='https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'></script>",
+              "<style>body{font-family:sans-serif;margin:2em}.tabela{border-collapse:collapse}"
+              ".tabela td,.tabela th{padding:4px 8px;border-bottom:1px solid #ddd}</style></head><body>",
+              f"<h1>{html.escape(titulo)}</h1><p>{html.escape(resumo)}</p>"]
+    for subtitulo, figs, tabelas in blocos:
+        partes.append(f"<h2>{html.escape(subtitulo)}</h2>")
+        partes += tabelas
+        partes += [f.to_html(full_html=False, include_plotlyjs=False) for f in figs]
+    partes.append("</body></html>")
+    return "\n".join(partes)
+
+
+def _gravar(tabelas, diretorio):
+    os.makedirs(diretorio, exist_ok=True)
+    arquivos = {}
+    for nome, df in tabelas.items():
+        caminho = os.path.join(diretorio, f"{nome}.parquet")
+        df.write_parquet(caminho + ".tmp", compression="zstd")
+        os.replace(caminho + ".tmp", caminho)
+        arquivos[nome] = {"arquivo": os.path.relpath(caminho, os.path.dirname(diretorio)), "linhas": len(df)}
+    return arquivos
+
+
+def relatorio_programa(fonte, diretorio, grupos_pesquisa=None):
+    """
+    Processa um programa (como o app, no modo de um programa) e grava as tabelas Parquet
+    e o relatório HTML em diretorio/<slug>. Retorna (resumo, células pesquisador x ano x estrato do cubo).
+    Os grupos padrão são os do próprio programa (GRUPOS_POR_PROGRAMA); sem grupos, o relatório
+    não tem as tabelas nem a seção de análise por grupos.
+    """
+    if grupos_pesquisa is None:
+        grupos_pesquisa = GRUPOS_POR_PROGRAMA.get(fonte["nome"], {})
+    destino = os.path.join(diretorio, slug(fonte["nome"]))
+    [(_, df, excluidos, erro)] = processar_fontes([fonte], pesos=PESOS, colunas=COLUNAS_ANALISE)
+    if erro is not None or df is None:
+        return {"programa": fonte["nome"], "erro": str(erro if erro is not None else excluidos)}, None
+
+    data = df.sort("ano_publicacao").with_columns(pl.lit(fonte["nome"]).alias("programa_origem"))
+    data, df_grupos = aplicar_grupos(data, compilar_grupos(grupos_pesquisa))
+    cubo = construir_cubo(data, df_grupos)
+    tabelas = tabelas_individuais(cubo.pesquisadores)
+    tabelas.update(tabelas_grupos(cubo.grupos))
+    tabelas["excluidos"] = excluidos.with_columns(pl.lit(fonte["nome"]).alias("programa"))
+    arquivos = _gravar(tabelas, destino)
+
+    resumo = {
+        "programa": fonte["nome"],
+        "diretorio": os.path.basename(destino),
+        "registros": cubo.registros,
+        "pesquisadores": cubo.pesquisadores["pesquisador"].n_unique(),
+        "excluidos": len(excluidos),
+        "tabelas": arquivos,
+    }
+    blocos = [
+        ("Ranking acumulado (pesquisadores)", [], [_tabela_html(_ranking_final(tabelas["ranking_pesquisador"], "pesquisador"))]),
+        ("Análise Individual", _figuras_individuais(tabelas), []),
+    ]
+    if "grupo_ano" in tabelas:
+        blocos.append(("Análise por Grupos", _figuras_grupos(tabelas, "grupo", "Volume Total de Produção"), []))
+    blocos.append(("Exclusões", [], [_tabela_html(resumo_exclusoes(tabelas["excluidos"]))]))
+    texto = f"{resumo['registros']} registros pontuáveis, {resumo['pesquisadores']} pesquisadores, {resumo['excluidos']} publicações excluídas."
+    with open(os.path.join(destino, "relatorio.html"), "w", encoding="utf-8") as f:
+        f.write(pagina_html(fonte["nome"], texto, blocos))
+    return resumo, cubo.pesquisadores
+
+
+def relatorio_comparativo(dados, diretorio):
+    """
+    Comparativo entre programas (como o modo de comparação do app): tabelas + HTML em diretorio/comparativo.
+    dados: células pesquisador x ano x estrato de cada programa (o programa vira a linha de pesquisa).
+    """
+    destino = os.path.join(diretorio, "comparativo")
+    celulas = pl.concat(dados, how="diagonal")
+    celulas_programas = celulas.with_columns(pl.col("programa_origem").alias("linha_pesquisa"), pl.col("pesquisador").str.to_titlecase())
+    tabelas = tabelas_grupos(celulas_programas, sufixo="programa")
+    arquivos = _gravar(tabelas, destino)
+    blocos = [
+        ("Ranking acumulado (programas)", [], [_tabela_html(_ranking_final(tabelas["ranking_programa"], "linha_pesquisa"))]),
+        ("Análise por Programas", _figuras_grupos(tabelas, "programa", "Volume Total de Produção"), []),
+    ]
+    with open(os.path.join(destino, "relatorio.html"), "w", encoding="utf-8") as f:
+        f.write(pagina_html("Comparativo entre Programas", f"{len(dados)} programas, {celulas['n'].sum()} registros pontuáveis.", blocos))
+    return {"diretorio": "comparativo", "tabelas": arquivos}
+
+
+def _indice_html(indice):
+    linhas = []
+    for p in indice["programas"]:
+        if "erro" in p:
+            linhas.append(f"<tr><td>{html.escape(p['programa'])}</td><td colspan='3'>Erro: {html.escape(p['erro'])}</td></tr>")
+        else:
+            linhas.append(f"<tr><td><a href='{p['diretorio']}/relatorio.html'>{html.escape(p['programa'])}</a></td>"
+                          f"<td>{p['registros']}</td><td>{p['pesquisadores']}</td><td>{p['excluidos']}</td></tr>")
+    comparativo = "<p><a href='comparativo/relatorio.html'>Comparativo entre programas</a></p>" if indice.get("comparativo") else ""
+    return ("<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>Relatórios</title></head><body>"
+            f"<h1>Relatórios de Produção Científica</h1><p>Gerado em {indice['gerado_em']}.</p>"
+            "<table><tr><th>Programa</th><th>Registros</th><th>Pesquisadores</th><th>Excluídos</th></tr>"
+            + "".join(linhas) + f"</table>{comparativo}</body></html>")
+
+
+def gerar_relatorios(diretorio=DIRETORIO_PADRAO, programas=None, catalogo=CATALOGO, max_workers=None):
+    """
+    Gera os relatórios de todos os programas do catálogo (ou dos escolhidos) em paralelo
+    (um processo por programa), o comparativo e um índice (indice.json + index.html).
+    """
+    fontes = fontes_do_catalogo(programas, catalogo)
+    os.makedirs(diretorio, exist_ok=True)
+    resultados = []
+    if fontes:
+        with ProcessPoolExecutor(max_workers=max(1, min(len(fontes), max_workers or os.cpu_count() or 1))) as executor:
+            futuros = [executor.submit(relatorio_programa, fonte, diretorio) for fonte in fontes]
+            for fonte, futuro in zip(fontes, futuros):
+                try:
+                    resultados.append(futuro.result())
+                except Exception as e:
+                    resultados.append(({"programa": fonte["nome"], "erro": str(e)}, None))
+
+    dados = [d for _, d in resultados if d is not None]
+    indice = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "versao_processamento": VERSAO_PROCESSAMENTO,
+        "programas": [r for r, _ in resultados],
+        "comparativo": relatorio_comparativo(dados, diretorio) if len(dados) > 1 else None,
+    }
+    with open(os.path.join(diretorio, "indice.json"), "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(diretorio, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_indice_html(indice))
+    return indice
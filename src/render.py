@@ -0,0 +1,57 @@
+import polars as pl
+from .config import LIMIAR_MODO_GRANDE
+
+NOME_OUTROS = "Outros"
+
+
+def modo_grande(n_entidades, limiar=LIMIAR_MODO_GRANDE):
+    """Ativa o modo de renderização para dados grandes acima do limiar de pesquisadores."""
+    return n_entidades > limiar
+
+
+def classe_scatter(grande):
+    """Scattergl (WebGL) no modo grande; Scatter (SVG) caso contrário."""
+    import plotly.graph_objects as go
+    return go.Scattergl if grande else go.Scatter
+
+
+def top_k_nomes(total, entidade, k):
+    """As k entidades de maior pontuação total (empates por nome)."""
+    ranking = total.group_by(entidade).agg(pl.col("peso").sum()).sort(["peso", entidade], descending=[True, False])
+    return ranking[entidade].head(k)
+
+
+def top_k_com_outros(total, entidade, k):
+    """
+    Mantém as k entidades de maior pontuação total e agrega as demais em uma única
+    série "Outros (n)" por ano, recalculando o acumulado.
+    """
+    n_entidades = total[entidade].n_unique()
+    if n_entidades <= k:
+        return total
+    manter = top_k_nomes(total, entidade, k)
+    n_outros = n_entidades - k
+    topo = total.filter(pl.col(entidade).is_in(manter.implode()))
+    outros = (
+        total.filter(~pl.col(entidade).is_in(manter.implode()))
+        .group_by("ano_publicacao")
+        .agg(pl.col("peso").sum())
+        .with_columns(pl.lit(f"{NOME_OUTROS} ({n_outros})").alias(entidade))
+    )
+    return (
+        pl.concat([topo.select(["ano_publicacao", entidade, "peso"]), outros.select(["ano_publicacao", entidade, "peso"])])
+        .sort(["ano_publicacao", entidade])
+        .with_columns(pl.col("peso").cum_sum().over(entidade).alias("acumulado"))
+    )
+
+
+def tamanho_payload(fig):
+    """
+    Tamanho (bytes) do JSON da figura enviado ao navegador. Calculado uma vez por figura: as
+    figuras do cache_figuras são reaproveitadas entre reruns e não mudam depois de construídas.
+    """
+    tamanho = getattr(fig, "_tamanho_payload", None)
+    if tamanho is None:
+        tamanho = len(fig.to_json().encode("utf-8"))
+        fig._tamanho_payload = tamanho
+    return tamanho
@@ -1,4 +1,6 @@
+import sys
 import unicodedata
+import polars as pl
 
 def normalizar_texto(texto):
     """Remove acentos, coloca em minúsculas e padroniza espaços."""
@@ -12,3 +14,30 @@ def limpar_issn(valor):
     if valor is None:
         return ""
     return str(valor).replace("-", "").replace(".", "").strip().upper()
+
+def limpar_issn_expr(coluna):
+    """Versão vetorizada (Polars) da limpeza de ISSN: mantém apenas dígitos e 'X'."""
+    expr = pl.col(coluna) if isinstance(coluna, str) else coluna
+    return expr.cast(pl.Utf8).fill_null("").str.to_uppercase().str.replace_all(r"[^0-9X]", "")
+
+def normalizar_texto_expr(coluna):
+    """Versão vetorizada (Polars) de normalizar_texto para uso em expressões."""
+    expr = pl.col(coluna) if isinstance(coluna, str) else coluna
+    return (
+        expr.cast(pl.Utf8)
+        .str.normalize("NFKD")
+        .str.replace_all(r"[^\x00-\x7F]", "")
+        .str.replace_all("_", " ")
+        .str.strip_chars()
+        .str.to_lowercase()
+    )
+
+def para_polars(df):
+    """
+    Converte um DataFrame Pandas (upload manual) para Polars; outros objetos passam intactos.
+    Não importa o Pandas: se ele ainda não foi carregado, `df` não pode ser um DataFrame Pandas.
+    """
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(df, pd.DataFrame):
+        return pl.from_pandas(df)
+    return df
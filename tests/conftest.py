@@ -0,0 +1,12 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+# Cache em disco isolado (o cache de resultados e os índices Qualis leem DASHBOARD_CACHE_DIR na importação)
+_CACHE = tempfile.mkdtemp(prefix="dashboard_testes_")
+os.environ["DASHBOARD_CACHE_DIR"] = _CACHE
+atexit.register(shutil.rmtree, _CACHE, ignore_errors=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+from collections import defaultdict
+import polars as pl
+from src.config import PESOS
+from src.utils import normalizar_texto
+from src.grupos import compilar_grupos, aplicar_grupos
+from src.cubo import construir_cubo
+from src.analytics import totais_por_ano, contagem_estratos, totais_grupos
+
+GRUPOS = {
+    "Grupo A": ["José da Silva", "Maria Souza"],
+    "Grupo B": ["Maria Souza", "Carlos Lima"],
+}
+PUBLICACOES = [
+    # (pesquisador como no CSV, ano, estrato)
+    ("jose da silva", 2020, "A1"),
+    ("jose da silva", 2020, "B2"),
+    ("jose da silva", 2021, "A3"),
+    ("maria souza", 2020, "A2"),
+    ("maria souza", 2021, "A2"),
+    ("maria souza", 2021, "B4"),
+    ("carlos lima", 2021, "A1"),
+    ("pedro alves", 2020, "B1"),
+    ("pedro alves", 2021, "A4"),
+]
+
+
+def _dados():
+    return pl.DataFrame(
+        {
+            "programa_origem": ["P"] * len(PUBLICACOES),
+            "pesquisador": [p for p, _, _ in PUBLICACOES],
+            "ano_publicacao": [a for _, a, _ in PUBLICACOES],
+            "qualis_norm": [e for _, _, e in PUBLICACOES],
+            "peso": [PESOS[e] for _, _, e in PUBLICACOES],
+        }
+    )
+
+
+def _agregacao_original():
+    """Agregação anterior ao cubo: casamento exato linha a linha e somas sobre as publicações."""
+    correcao, linhas_grupos = {}, []
+    for nome, ano, estrato in PUBLICACOES:
+        for grupo, membros in GRUPOS.items():
+            for membro in membros:
+                if normalizar_texto(nome) == normalizar_texto(membro):
+                    correcao[nome] = membro
+                    linhas_grupos.append((membro, grupo, ano, PESOS[estrato]))
+    individual, estratos = defaultdict(int), defaultdict(int)
+    for nome, ano, estrato in PUBLICACOES:
+        pesquisador = correcao.get(nome, nome.title())
+        individual[(ano, pesquisador)] += PESOS[estrato]
+        estratos[(pesquisador, estrato)] += 1
+    grupos, membros = defaultdict(int), defaultdict(set)
+    for pesquisador, grupo, ano, peso in linhas_grupos:
+        grupos[(ano, grupo)] += peso
+        membros[grupo].add(pesquisador)
+    return individual, estratos, grupos, {g: len(m) for g, m in membros.items()}
+
+
+def _cubo(confianca=False):
+    data, df_grupos = aplicar_grupos(_dados(), compilar_grupos(GRUPOS), confianca=confianca)
+    return construir_cubo(data, df_grupos)
+
+
+def test_cubo_reproduz_agregacao_original():
+    individual, estratos, grupos, n_membros = _agregacao_original()
+    cubo = _cubo()
+
+    assert cubo.registros == len(PUBLICACOES)
+    total = totais_por_ano(cubo.pesquisadores, "pesquisador")
+    assert {(a, p): s for a, p, s in total.select("ano_publicacao", "pesquisador", "peso").iter_rows()} == individual
+
+    contagem = contagem_estratos(cubo.pesquisadores, "pesquisador")
+    obtido = {(linha["pesquisador"], e): linha[e] for linha in contagem.iter_rows(named=True) for e in PESOS if linha[e]}
+    assert obtido == estratos
+
+    total_g = totais_grupos(cubo.grupos)
+    assert {(a, g): s for a, g, s in total_g.select("ano_publicacao", "linha_pesquisa", "peso").iter_rows()} == grupos
+    assert dict(total_g.select("linha_pesquisa", "n_membros").unique().iter_rows()) == n_membros
+
+
+def test_cubo_com_confianca_no_limiar_padrao_equivale_ao_cubo_simples():
+    simples, com_limiar = _cubo(), _cubo(confianca=True).com_limiar(0.85)
+    chaves_p = ["pesquisador", "ano_publicacao", "qualis_norm"]
+    chaves_g = ["linha_pesquisa", *chaves_p]
+    assert com_limiar.pesquisadores.sort(chaves_p).equals(simples.pesquisadores.sort(chaves_p))
+    assert com_limiar.grupos.sort(chaves_g).equals(simples.grupos.sort(chaves_g))
+
+
+def test_pesquisador_fora_dos_grupos_fica_so_na_analise_individual():
+    cubo = _cubo()
+    assert "Pedro Alves" in cubo.pesquisadores["pesquisador"].to_list()
+    assert "Pedro Alves" not in cubo.grupos["pesquisador"].to_list()
+    # Membro de dois grupos: as publicações contam em ambos, mas uma vez só na análise individual
+    maria = cubo.grupos.filter(pl.col("pesquisador") == "Maria Souza")
+    assert sorted(maria["linha_pesquisa"].unique().to_list()) == ["Grupo A", "Grupo B"]
+    assert cubo.pesquisadores.filter(pl.col("pesquisador") == "Maria Souza")["n"].sum() == 3
@@ -0,0 +1,58 @@
+import polars as pl
+from src.deduplicacao import identificar_publicacoes
+
+
+def _ids(linhas):
+    df = pl.DataFrame(linhas, schema={"titulo": pl.Utf8, "issn_limpo": pl.Utf8, "ano_publicacao": pl.Int64, "doi": pl.Utf8},
+                      orient="row")
+    return identificar_publicacoes(df)["id_publicacao"].to_list()
+
+
+def test_mesmo_doi_une_titulos_diferentes():
+    a, b = _ids([
+        ("Formação docente no Ceará", "12345678", 2020, "10.1000/abc"),
+        ("Formacao de docentes no Ceara", "12345678", 2020, "https://doi.org/10.1000/ABC"),
+    ])
+    assert a == b
+
+
+def test_coautor_sem_doi_une_pelo_titulo():
+    a, b, c = _ids([
+        ("Avaliação educacional em larga escala", "12345678", 2021, "10.1000/xyz"),
+        ("Avaliacao Educacional em Larga Escala", "12345678", 2021, None),
+        ("Avaliação educacional em larga escala", "12345678", 2021, ""),
+    ])
+    assert a == b == c
+
+
+def test_titulo_com_erro_de_digitacao_une_no_mesmo_issn_e_ano():
+    a, b = _ids([
+        ("Políticas públicas de educação integral no nordeste brasileiro", "12345678", 2019, None),
+        ("Politicas publicas de educacao integral no nordeste brasilero", "12345678", 2019, None),
+    ])
+    assert a == b
+
+
+def test_mesmo_titulo_em_ano_ou_issn_diferente_nao_une():
+    a, b, c = _ids([
+        ("Editorial", "12345678", 2020, None),
+        ("Editorial", "12345678", 2021, None),
+        ("Editorial", "87654321", 2020, None),
+    ])
+    assert len({a, b, c}) == 3
+
+
+def test_dois_diferentes_nunca_se_unem():
+    # Editoriais de mesmo título no mesmo número: a linha sem DOI liga-se a um deles, não funde os dois
+    a, b, c = _ids([
+        ("Editorial", "12345678", 2020, "10.1000/ed.1"),
+        ("Editorial", "12345678", 2020, "10.1000/ed.2"),
+        ("Editorial", "12345678", 2020, None),
+    ])
+    assert a != b
+    assert c in (a, b)
+
+
+def test_linhas_sem_doi_nem_titulo_ficam_separadas():
+    a, b = _ids([(None, "12345678", 2020, None), ("", "12345678", 2020, None)])
+    assert a != b
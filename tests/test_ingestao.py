@@ -0,0 +1,88 @@
+import csv
+import polars as pl
+import src.processor as processor
+from src.config import PESOS
+from src.cache import hash_conteudo
+from src.ingestao import ingerir_incremental, delta_dataset
+
+QUALIS = pl.DataFrame({"ISSN": ["1111-1111", "2222-2222", "3333-3333"], "Estrato": ["A1", "B2", "C"]})
+COLUNAS = ["nome", "ano_publicacao", "titulo_publicacao", "periodico", "issn", "qualis"]
+
+
+def _gravar_csv(caminho, publicacoes):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUNAS)
+        escritor.writerows(publicacoes)
+
+
+def _programa(origem):
+    _gravar_csv(origem / "ana_lima.csv", [
+        ("Ana Lima", 2020, "Artigo 1", "Revista X", "1111-1111", "A1"),
+        ("Ana Lima", 2021, "Artigo 2", "Revista Y", "2222-2222", "B2"),
+        ("Ana Lima", 2022, "Artigo 7", "Revista W", "9999-9999", "A2"),
+    ])
+    _gravar_csv(origem / "bruno_costa.csv", [
+        ("Bruno Costa", 2020, "Artigo 3", "Revista X", "1111-1111", "A1"),
+        ("Bruno Costa", 2022, "Artigo 4", "Revista Z", "3333-3333", "C"),
+    ])
+
+
+def _ordenado(df):
+    return df.sort(df.columns)
+
+
+def test_ingestao_incremental_rele_so_os_csvs_alterados(tmp_path):
+    origem, destino = tmp_path / "csvs", str(tmp_path / "programa.parquet")
+    origem.mkdir()
+    _programa(origem)
+
+    primeira = ingerir_incremental(str(origem), destino)
+    assert (primeira["adicionados"], primeira["linhas"]) == (2, 5)
+    assert delta_dataset(destino) is None
+
+    sem_mudanca = ingerir_incremental(str(origem), destino)
+    assert (sem_mudanca["inalterados"], sem_mudanca["linhas"]) == (2, 5)
+    assert delta_dataset(destino) is None
+
+    hash_anterior = hash_conteudo(destino)
+    _gravar_csv(origem / "bruno_costa.csv", [("Bruno Costa", 2023, "Artigo 5", "Revista Y", "2222-2222", "B2")])
+    _gravar_csv(origem / "carla_dias.csv", [("Carla Dias", 2021, "Artigo 6", "Revista X", "1111-1111", "A1")])
+    segunda = ingerir_incremental(str(origem), destino)
+    assert (segunda["adicionados"], segunda["alterados"], segunda["inalterados"]) == (1, 1, 1)
+    assert delta_dataset(destino) == (hash_anterior, ["bruno costa", "carla dias"])
+
+    # O Parquet atualizado é o mesmo de uma conversão completa
+    completo = str(tmp_path / "completo.parquet")
+    ingerir_incremental(str(origem), completo, forcar=True)
+    assert _ordenado(pl.read_parquet(destino)).equals(_ordenado(pl.read_parquet(completo)))
+
+
+def test_processamento_atualiza_so_os_pesquisadores_do_delta(tmp_path, monkeypatch):
+    origem, destino = tmp_path / "csvs", str(tmp_path / "programa.parquet")
+    origem.mkdir()
+    _programa(origem)
+    ingerir_incremental(str(origem), destino)
+    processor.processar_dados_com_filtro(destino, QUALIS, is_parquet=True, pesos=PESOS)
+
+    _gravar_csv(origem / "bruno_costa.csv", [
+        ("Bruno Costa", 2020, "Artigo 3", "Revista X", "1111-1111", "A1"),
+        ("Bruno Costa", 2023, "Artigo 5", "Revista Y", "2222-2222", "B2"),
+    ])
+    ingerir_incremental(str(origem), destino)
+
+    chamadas = []
+    original = processor._processar_dados_com_filtro
+
+    def espiao(*args, **kwargs):
+        chamadas.append(kwargs.get("pesquisadores"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(processor, "_processar_dados_com_filtro", espiao)
+    df, excluidos = processor.processar_dados_com_filtro(destino, QUALIS, is_parquet=True, pesos=PESOS)
+    assert chamadas == [["bruno costa"]]
+    assert len(excluidos) == 1
+
+    df_completo, excluidos_completo = original(destino, QUALIS, True, pesos=PESOS)
+    assert _ordenado(df).equals(_ordenado(df_completo))
+    assert _ordenado(excluidos).equals(_ordenado(excluidos_completo))